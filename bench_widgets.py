@@ -0,0 +1,275 @@
+"""Headless rendering benchmarks for the custom widgets in flip_timer.py.
+
+Every scenario renders a widget into a QImage frame by frame and records how
+long each render takes. Results are written as JSON and can be compared with a
+stored baseline:
+
+    QT_QPA_PLATFORM=offscreen python bench_widgets.py --output bench_results.json
+    python bench_widgets.py --baseline bench_baseline.json --threshold 0.15
+    python bench_widgets.py --save-baseline bench_baseline.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+# Benchmarks always run headless, even if the caller forgot to set it
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QTime, QSize, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+import flip_timer
+
+
+DEFAULT_DPRS = (1.0, 2.0)
+DEFAULT_FRAMES = 120
+DEFAULT_WARMUP = 10
+DEFAULT_THRESHOLD = 0.15 # 15% slower than baseline counts as a regression
+FRAME_MS = 16 # Virtual frame period for scripted animations
+RESULTS_VERSION = 1
+
+
+# --- Scenario setup ---
+# Each factory gets the requested size and returns (widget, step) where
+# step(frame_index) advances the scripted state before the frame is rendered.
+
+def _static(widget_cls, *args):
+    def factory(size):
+        widget = widget_cls(*args)
+        widget.resize(size)
+
+        def step(i):
+            widget.update()
+        return widget, step
+    return factory
+
+
+def _picker_fling(size):
+    wheel = flip_timer.PickerWheel((0, 59), "min")
+    wheel.resize(size)
+    direction = [1]
+
+    def step(i):
+        # Re-fling in the opposite direction each time the wheel comes to rest
+        if not wheel.is_animating():
+            direction[0] = -direction[0]
+            wheel._velocity = 60.0 * direction[0]
+            wheel._start_inertia()
+        flip_timer.AnimationDriver.instance().advance(FRAME_MS)
+    return wheel, step
+
+
+def _toggle_animation(size):
+    switch = flip_timer.IOSToggleSwitch()
+    period = 14 # 200 ms animation plus two resting frames at 60 FPS
+
+    def step(i):
+        if i % period == 0:
+            switch.toggle()
+        flip_timer.AnimationDriver.instance().advance(FRAME_MS)
+    return switch, step
+
+
+def _start_timer_app(size, total=QTime(0, 25, 0)):
+    app_widget = flip_timer.TimerApp()
+    app_widget.resize(size)
+    app_widget.time_picker_widget.set_time(total)
+    app_widget.toggle_timer()
+    # The benchmark drives frames itself, the app's own timers must stay quiet
+    app_widget.seconds_timer.stop()
+    app_widget.blink_timer.stop()
+    return app_widget
+
+
+def _running_ring(size):
+    app_widget = _start_timer_app(size)
+    total = app_widget.total_seconds_at_start
+
+    def step(i):
+        app_widget.progress = 1.0 - (i % 600) / 600.0
+        if i % 60 == 0:
+            remaining = int(total * app_widget.progress)
+            app_widget.colon_visible = not app_widget.colon_visible
+            sep = ":" if app_widget.colon_visible else " "
+            app_widget.timer_display_widget.update_time_display(
+                f"{remaining // 60:02}{sep}{remaining % 60:02}", "1:41 pm")
+        app_widget.update()
+    return app_widget, step
+
+
+def _resize_drag(size):
+    app_widget = _start_timer_app(size)
+    base_w, base_h = size.width(), size.height()
+
+    def step(i):
+        # Triangle wave between the requested size and +40%
+        phase = i % 60
+        grow = phase if phase < 30 else 60 - phase
+        factor = 1.0 + 0.4 * grow / 30.0
+        app_widget.resize(int(base_w * factor), int(base_h * factor))
+    return app_widget, step
+
+
+SCENARIOS = {
+    "picker_wheel": (_static(flip_timer.PickerWheel, (0, 59), "min"), [QSize(80, 200), QSize(120, 320)]),
+    "time_picker": (_static(flip_timer.TimePickerWidget), [QSize(300, 220), QSize(480, 360)]),
+    "timer_display": (_static(flip_timer.TimerDisplayWidget), [QSize(300, 280), QSize(480, 440)]),
+    "toggle_switch": (_static(flip_timer.IOSToggleSwitch), [QSize(51, 31)]),
+    "timer_app": (_static(flip_timer.TimerApp), [QSize(380, 480), QSize(570, 720)]),
+    "picker_fling": (_picker_fling, [QSize(80, 200), QSize(120, 320)]),
+    "running_ring": (_running_ring, [QSize(380, 480), QSize(570, 720)]),
+    "resize_drag": (_resize_drag, [QSize(380, 480)]),
+    "toggle_animation": (_toggle_animation, [QSize(51, 31)]),
+}
+
+
+# --- Measurement ---
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def render_frames(widget, step, dpr, frames, warmup):
+    """Renders warmup + frames frames and returns per-frame render times in ns."""
+    images = {} # One image per widget size, resize_drag changes it every frame
+    timings = []
+    for i in range(warmup + frames):
+        step(i)
+        size = widget.size()
+        image = images.get((size.width(), size.height()))
+        if image is None:
+            image = QImage(max(1, int(size.width() * dpr)), max(1, int(size.height() * dpr)),
+                           QImage.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(dpr)
+            images[(size.width(), size.height())] = image
+        image.fill(Qt.transparent)
+        QApplication.processEvents() # Deliver pending resize/layout events outside the timed region
+        start = time.perf_counter_ns()
+        widget.render(image)
+        elapsed = time.perf_counter_ns() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def summarize(timings_ns):
+    timings_ms = sorted(t / 1e6 for t in timings_ns)
+    total_s = sum(timings_ns) / 1e9
+    return {
+        "frames": len(timings_ms),
+        "paints_per_sec": round(len(timings_ms) / total_s, 2) if total_s > 0 else 0.0,
+        "mean_ms": round(sum(timings_ms) / len(timings_ms), 4) if timings_ms else 0.0,
+        "p50_ms": round(percentile(timings_ms, 0.50), 4),
+        "p90_ms": round(percentile(timings_ms, 0.90), 4),
+        "p99_ms": round(percentile(timings_ms, 0.99), 4),
+        "max_ms": round(timings_ms[-1], 4) if timings_ms else 0.0,
+    }
+
+
+def run_benchmarks(names, dprs, frames, warmup):
+    results = {}
+    for name in names:
+        factory, sizes = SCENARIOS[name]
+        for size in sizes:
+            for dpr in dprs:
+                widget, step = factory(size)
+                widget.show()
+                QApplication.processEvents()
+                timings = render_frames(widget, step, dpr, frames, warmup)
+                widget.close()
+                widget.deleteLater()
+                QApplication.processEvents()
+                key = f"{name}@{size.width()}x{size.height()}@{dpr:g}x"
+                results[key] = summarize(timings)
+                print(f"{key:<40} {results[key]['paints_per_sec']:>10.1f} paints/s  "
+                      f"p50 {results[key]['p50_ms']:.3f} ms  p99 {results[key]['p99_ms']:.3f} ms")
+    return results
+
+
+# --- Baseline comparison ---
+def compare_with_baseline(results, baseline, threshold):
+    """Returns a list of (key, metric, baseline_value, current_value) regressions."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p90_ms"):
+            if previous.get(metric, 0) > 0 and current[metric] > previous[metric] * (1.0 + threshold):
+                regressions.append((key, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless rendering benchmarks for flip_timer widgets.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--dpr", type=float, nargs="+", default=list(DEFAULT_DPRS),
+                        help="Device pixel ratios to render at")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against (required to exist when given)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown relative to the baseline (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also store the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    # Scenarios step animations themselves, one virtual frame per rendered frame
+    flip_timer.AnimationDriver.instance().set_manual(True)
+    names = args.scenario or list(SCENARIOS)
+    results = run_benchmarks(names, args.dpr, args.frames, args.warmup)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM", ""),
+            "frames": args.frames,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+        return 0
+
+    if args.baseline is None:
+        print("No --baseline given, skipping comparison.")
+        return 0
+    if not os.path.exists(args.baseline):
+        # A CI job pointing at a baseline must not pass just because the file went missing
+        print(f"Error: baseline '{args.baseline}' not found (create one with --save-baseline).")
+        return 2
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for key, metric, before, after in regressions:
+            print(f"  {key} {metric}: {before:.3f} ms -> {after:.3f} ms")
+        return 1
+    print(f"No regressions over {args.threshold:.0%} against '{args.baseline}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,26 +3,61 @@ import math
 import datetime # Для расчета времени срабатывания будильника
 import time # Для получения текущего текущего времени
 import os
+import io
+import csv
+import mmap
+import struct
+import socket
+import ipaddress
+import argparse
+import subprocess
+import queue
+import threading
+import functools
+import json
+from array import array # Компактное хранение кругов секундомера
+import heapq
+import bisect
+from collections import deque, OrderedDict
 
 # PyQt imports
 from PyQt5.QtCore import (
     Qt, QTimer, QRectF, QPoint, QTime, QSize, QRect,
-    QEasingCurve, QPropertyAnimation, QVariantAnimation, QAbstractAnimation,
-    pyqtProperty, QDateTime, pyqtSignal, QEvent # Добавлен QEvent
+    QEasingCurve, pyqtProperty, QDateTime, pyqtSignal, QEvent, QObject, # Добавлен QEvent
+    QAbstractListModel, QModelIndex, QThread, QThreadPool, QRunnable, QSettings, QByteArray,
+    QBuffer, QIODevice, QAbstractEventDispatcher
 )
 from PyQt5.QtGui import (
     QPainter, QColor, QFont, QPen, QPainterPath, QIcon,
-    QFontDatabase, QFontMetrics, QPixmap
+    QFontDatabase, QFontMetrics, QPixmap, QRegion, QImage, QKeySequence
 )
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
     QLabel, QSizePolicy, QSpacerItem, QFrame, QStackedWidget,
-    QMessageBox # Для сообщений
+    QMessageBox, # Для сообщений
+    QListView, QAbstractItemView, QProgressBar, QFileDialog, QMenu, QSystemTrayIcon, QShortcut,
+    QScrollBar
 )
+from PyQt5.QtNetwork import QTcpServer, QLocalServer, QHostAddress
+from PyQt5 import sip
 
 # Pygame import for sound
 import pygame
 
+# Optional: NumPy is only needed for the synthesized alarm tones
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Startup timings and fallback notes are only printed with --verbose
+VERBOSE = False
+
+
+def debug_log(message):
+    if VERBOSE:
+        print(message)
+
 # --- Define Timer States ---
 class TimerState:
     IDLE = 0      # Setting time (Picker view)
@@ -31,6 +66,1566 @@ class TimerState:
     FINISHED = 3  # Timer has finished (Display view)
 
 
+# --- Define App Modes ---
+class TimerMode:
+    COUNTDOWN = 0 # Classic countdown timer with alarm
+    STOPWATCH = 1 # Stopwatch with laps (uses TimerState IDLE/RUNNING/PAUSED)
+
+
+# --- Deadline Clock ---
+# CLOCK_BOOTTIME keeps counting while the machine is suspended and, like any
+# monotonic clock, ignores NTP steps, DST and manual clock changes. Elsewhere
+# time.monotonic is the best available source.
+if hasattr(time, "CLOCK_BOOTTIME"):
+    def deadline_clock():
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+else:
+    deadline_clock = time.monotonic
+
+CLOCK_STEP_TOLERANCE = 0.5 # seconds of wall/deadline clock disagreement treated as a step or suspend
+
+
+class ClockWatch:
+    """Notices wall-clock steps and suspend/resume by comparing clock offsets.
+
+    check() is called from ticks that already run (in the tray, a coarse
+    one kept for this) and reports which offset moved since the last call.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        now = deadline_clock()
+        self._wall_offset = time.time() - now
+        self._suspend_offset = now - time.monotonic()
+
+    def check(self):
+        """Returns (wall clock stepped, suspend detected) and re-baselines."""
+        now = deadline_clock()
+        wall_offset = time.time() - now
+        suspend_offset = now - time.monotonic()
+        stepped = abs(wall_offset - self._wall_offset) > CLOCK_STEP_TOLERANCE
+        resumed = suspend_offset - self._suspend_offset > CLOCK_STEP_TOLERANCE
+        self._wall_offset = wall_offset
+        self._suspend_offset = suspend_offset
+        return stepped, resumed
+
+
+# --- Unified Animation Driver ---
+class Tween:
+    """One property transition run by AnimationDriver. Instances are pooled and reused."""
+    __slots__ = ("target", "property_name", "start_value", "end_value", "duration",
+                 "elapsed", "easing", "on_finished", "active")
+
+    def __init__(self):
+        self.easing = QEasingCurve()
+        self.active = False
+
+    def value_at(self, elapsed):
+        progress = min(1.0, elapsed / self.duration) if self.duration > 0 else 1.0
+        eased = self.easing.valueForProgress(progress)
+        return self.start_value + (self.end_value - self.start_value) * eased
+
+
+class AnimationDriver(QObject):
+    """Single frame clock for every animation in the app.
+
+    Property transitions (toggle switch, picker snapping) are pooled Tween
+    objects, continuous effects (picker inertia, the progress ring) are
+    tickers called once per frame with the elapsed milliseconds. The frame
+    timer only runs while at least one tween or ticker is active, at the
+    interactive rate while a tween or an interactive ticker (picker fling)
+    runs and at the ambient rate otherwise (see PowerGovernor).
+    """
+    DEFAULT_FPS = 60
+    MAX_FRAME_MS = 100 # Clamp long gaps (suspend, debugger) so animations don't jump
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = AnimationDriver()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._frame_ms = round(1000 / self.DEFAULT_FPS) # Ambient rate (progress ring, stopwatch)
+        self._interactive_frame_ms = self._frame_ms # Tweens and interactive tickers
+        self._tweens = [] # Active tweens
+        self._pool = [] # Idle tweens ready for reuse
+        self._tickers = [] # Per-frame callbacks taking dt_ms
+        self._interactive_tickers = set()
+        self._last_tick_ns = None
+        self._manual = False # When True the caller drives frames via advance()
+
+    # Frame rate caps (fps <= 0 keeps the current rate); interactive_fps defaults to fps
+    def set_max_fps(self, fps, interactive_fps=None):
+        if fps > 0:
+            self._frame_ms = max(1, round(1000 / fps))
+        interactive_fps = fps if interactive_fps is None else interactive_fps
+        if interactive_fps > 0:
+            self._interactive_frame_ms = max(1, round(1000 / interactive_fps))
+        if self._timer.isActive():
+            self._timer.start(self.frame_interval())
+
+    def frame_interval(self):
+        if self._tweens or self._interactive_tickers:
+            return self._interactive_frame_ms
+        return self._frame_ms
+
+    def set_manual(self, manual):
+        """Stops wall-clock ticking; benchmarks and replays then call advance() themselves."""
+        self._manual = manual
+        if manual:
+            self._timer.stop()
+        else:
+            self._update_timer()
+
+    def animate(self, target, property_name, start_value, end_value, duration,
+                easing=QEasingCurve.Linear, on_finished=None):
+        """Starts a transition of target.<property_name>; returns the Tween (None if it finished at once)."""
+        if duration <= 0:
+            setattr(target, property_name, end_value)
+            if on_finished:
+                on_finished()
+            return None
+        tween = self._pool.pop() if self._pool else Tween()
+        tween.target = target
+        tween.property_name = property_name
+        tween.start_value = start_value
+        tween.end_value = end_value
+        tween.duration = duration
+        tween.elapsed = 0.0
+        tween.easing.setType(easing)
+        tween.on_finished = on_finished
+        tween.active = True
+        self._tweens.append(tween)
+        self._update_timer()
+        return tween
+
+    def cancel(self, tween):
+        """Stops a tween where it is, without calling its on_finished callback."""
+        if tween is not None and tween.active:
+            self._tweens.remove(tween)
+            self._release(tween)
+            self._update_timer()
+
+    def add_ticker(self, callback, interactive=False):
+        if callback not in self._tickers:
+            self._tickers.append(callback)
+            if interactive:
+                self._interactive_tickers.add(callback)
+            self._update_timer()
+
+    def remove_ticker(self, callback):
+        if callback in self._tickers:
+            self._tickers.remove(callback)
+            self._interactive_tickers.discard(callback)
+            self._update_timer()
+
+    def is_active(self):
+        return bool(self._tweens or self._tickers)
+
+    def advance(self, dt_ms):
+        """Moves every tween and ticker forward by dt_ms milliseconds."""
+        for tween in list(self._tweens):
+            if not tween.active:
+                continue
+            tween.elapsed += dt_ms
+            finished = tween.elapsed >= tween.duration
+            try:
+                setattr(tween.target, tween.property_name,
+                        tween.end_value if finished else tween.value_at(tween.elapsed))
+            except RuntimeError:
+                finished = True # Target widget was deleted, drop the tween
+            if finished and tween.active:
+                self._tweens.remove(tween)
+                on_finished = tween.on_finished
+                tween.active = False
+                if on_finished:
+                    try:
+                        on_finished()
+                    except RuntimeError:
+                        pass # Its widget was deleted
+                    except Exception as e:
+                        print(f"Error in animation callback {on_finished!r}: {e}")
+                self._release(tween)
+        for callback in list(self._tickers):
+            if callback not in self._tickers:
+                continue
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, QObject) and sip.isdeleted(owner):
+                self.remove_ticker(callback) # Widget deleted without unregistering
+                continue
+            try:
+                callback(dt_ms)
+            except RuntimeError:
+                self.remove_ticker(callback) # Touched a deleted widget
+            except Exception as e:
+                print(f"Error in animation ticker {callback!r}: {e}")
+                self.remove_ticker(callback) # One broken ticker must not stall every frame
+        self._update_timer()
+
+    def _release(self, tween):
+        tween.active = False
+        tween.target = None
+        tween.on_finished = None
+        self._pool.append(tween)
+
+    def _update_timer(self):
+        if self._manual:
+            return
+        if self.is_active():
+            frame_ms = self.frame_interval()
+            if not self._timer.isActive():
+                self._last_tick_ns = time.monotonic_ns()
+                self._timer.start(frame_ms)
+            elif self._timer.interval() != frame_ms:
+                self._timer.setInterval(frame_ms) # A fling started or ended over an ambient ticker
+        elif self._timer.isActive():
+            self._timer.stop()
+
+    def _on_timeout(self):
+        now_ns = time.monotonic_ns()
+        dt_ms = (now_ns - self._last_tick_ns) / 1e6 if self._last_tick_ns is not None else self.frame_interval()
+        self._last_tick_ns = now_ns
+        self.advance(min(dt_ms, self.MAX_FRAME_MS))
+
+
+# --- Stopwatch and Lap Store ---
+class LapStore:
+    """Lap durations and split times in flat array('d') buffers (16 bytes per lap).
+
+    Min, max, mean and variance are updated incrementally (Welford), so adding
+    a lap and reading the statistics are O(1) even for millions of laps.
+    """
+
+    def __init__(self):
+        self.durations = array('d')
+        self.splits = array('d')
+        self.clear()
+
+    def clear(self):
+        del self.durations[:]
+        del self.splits[:]
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min_index = -1
+        self.max_index = -1
+
+    def __len__(self):
+        return len(self.durations)
+
+    def append(self, duration, split):
+        self.durations.append(duration)
+        self.splits.append(split)
+        count = len(self.durations)
+        delta = duration - self.mean
+        self.mean += delta / count
+        self._m2 += delta * (duration - self.mean)
+        if self.min_index < 0 or duration < self.durations[self.min_index]:
+            self.min_index = count - 1
+        if self.max_index < 0 or duration > self.durations[self.max_index]:
+            self.max_index = count - 1
+
+    @property
+    def min(self):
+        return self.durations[self.min_index] if self.min_index >= 0 else 0.0
+
+    @property
+    def max(self):
+        return self.durations[self.max_index] if self.max_index >= 0 else 0.0
+
+    @property
+    def stdev(self):
+        """Sample standard deviation of the lap durations."""
+        count = len(self.durations)
+        return math.sqrt(self._m2 / (count - 1)) if count > 1 else 0.0
+
+
+class Stopwatch:
+    """Stopwatch with lap recording, on deadline_clock like the countdowns. Independent of Qt."""
+
+    def __init__(self, clock=deadline_clock):
+        self._clock = clock
+        self.laps = LapStore()
+        self.reset()
+
+    def reset(self):
+        self._started_at = None # Clock value when the current run started
+        self._accumulated = 0.0 # Seconds from previous runs (before pauses)
+        self._last_split = 0.0 # Elapsed time at the previous lap mark
+        self.laps.clear()
+
+    @property
+    def running(self):
+        return self._started_at is not None
+
+    def start(self):
+        if self._started_at is None:
+            self._started_at = self._clock()
+
+    def pause(self):
+        if self._started_at is not None:
+            self._accumulated += self._clock() - self._started_at
+            self._started_at = None
+
+    def elapsed(self):
+        if self._started_at is None:
+            return self._accumulated
+        return self._accumulated + self._clock() - self._started_at
+
+    def current_lap(self):
+        return self.elapsed() - self._last_split
+
+    def lap(self):
+        """Closes the current lap and returns its duration."""
+        split = self.elapsed()
+        duration = split - self._last_split
+        self._last_split = split
+        self.laps.append(duration, split)
+        return duration
+
+
+def format_stopwatch_time(seconds):
+    """Formats seconds as MM:SS.cc (or H:MM:SS.cc from one hour on)."""
+    centis = int(seconds * 100)
+    h, rem = divmod(centis, 360000)
+    m, rem = divmod(rem, 6000)
+    s, cs = divmod(rem, 100)
+    if h:
+        return f"{h}:{m:02}:{s:02}.{cs:02}"
+    return f"{m:02}:{s:02}.{cs:02}"
+
+
+# --- Timer Programs (back-to-back interval sequences) ---
+class TimerProgram:
+    """Named sequence of (label, seconds) segments, e.g. pomodoro or HIIT intervals."""
+
+    def __init__(self, name, segments):
+        self.name = name
+        self.segments = tuple(segments)
+
+    def compile(self, start):
+        return CompiledSchedule(self.segments, start)
+
+
+class CompiledSchedule:
+    """Program compiled once into cumulative segment end offsets from a single start instant.
+
+    Every deadline is start + ends[i] on deadline_clock, so segments never
+    pick up drift from restarting timers, and pausing only moves the start.
+    """
+
+    def __init__(self, segments, start):
+        self.labels = [label for label, _ in segments]
+        self.durations = array('d', (float(seconds) for _, seconds in segments))
+        self.ends = array('d')
+        total = 0.0
+        for duration in self.durations:
+            total += duration
+            self.ends.append(total)
+        self.start = start
+
+    def __len__(self):
+        return len(self.durations)
+
+    @property
+    def total(self):
+        return self.ends[-1] if self.ends else 0.0
+
+    def segment_at(self, now):
+        """Index of the segment running at monotonic time now (len(self) once finished)."""
+        return bisect.bisect_right(self.ends, now - self.start)
+
+    def segment_start(self, index):
+        return self.start + (self.ends[index - 1] if index > 0 else 0.0)
+
+    def deadline(self, index):
+        return self.start + self.ends[index]
+
+    def shift(self, seconds):
+        """Moves the whole remaining schedule, e.g. by the time spent paused."""
+        self.start += seconds
+
+
+BUILTIN_PROGRAMS = (
+    TimerProgram("Pomodoro", [("Focus", 25 * 60), ("Break", 5 * 60)] * 4 + [("Long break", 15 * 60)]),
+    TimerProgram("Tabata", [("Work", 20), ("Rest", 10)] * 8),
+    TimerProgram("HIIT 30/30", [("Warm-up", 5 * 60)] + [("Work", 30), ("Rest", 30)] * 10 + [("Cool-down", 5 * 60)]),
+)
+
+
+# --- Wall-clock Alarms (recurring, indexed by next occurrence) ---
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAY_SETS = {"daily": range(7), "weekdays": range(5), "weekend": (5, 6)}
+ALARM_RECHECK_MS = 60000 # Longest single wait, so wall clock steps and suspends are noticed within a minute
+
+
+class AlarmRule:
+    """When a wall-clock alarm rings; occurrences are computed one at a time by next_after.
+
+    kind "weekly": at a time of day on a set of weekdays (0 = Monday);
+    "interval": every `every` (timedelta) from an anchor datetime;
+    "dates": a sorted list of specific datetimes. All times are naive local time.
+    """
+
+    def __init__(self, kind, at=None, weekdays=(), anchor=None, every=None, dates=()):
+        if kind == "weekly" and (at is None or not weekdays):
+            raise ValueError("weekly alarms need a time and at least one weekday")
+        if kind == "interval" and (anchor is None or every is None or every.total_seconds() <= 0):
+            raise ValueError("interval alarms need a start and a positive interval")
+        if kind == "dates" and not dates:
+            raise ValueError("date alarms need at least one date")
+        if kind not in ("weekly", "interval", "dates"):
+            raise ValueError(f"unknown alarm rule '{kind}'")
+        self.kind = kind
+        self.at = at
+        self.weekdays = frozenset(weekdays)
+        self.anchor = anchor
+        self.every = every
+        self.dates = sorted(dates)
+
+    def next_after(self, moment):
+        """First occurrence strictly after moment, or None when the rule has run out."""
+        if self.kind == "weekly":
+            for days in range(8):
+                day = moment.date() + datetime.timedelta(days=days)
+                if day.weekday() in self.weekdays:
+                    candidate = datetime.datetime.combine(day, self.at)
+                    if candidate > moment:
+                        return candidate
+            return None
+        if self.kind == "interval":
+            if moment < self.anchor:
+                return self.anchor
+            periods = (moment - self.anchor) // self.every + 1
+            return self.anchor + periods * self.every
+        index = bisect.bisect_right(self.dates, moment)
+        return self.dates[index] if index < len(self.dates) else None
+
+    @classmethod
+    def from_dict(cls, data):
+        """{"at": "07:00", "days": "weekdays" | ["mon", ...]}, {"every_hours": 2, "start": ISO}
+        or {"dates": [ISO, ...]}."""
+        if "dates" in data:
+            return cls("dates", dates=[datetime.datetime.fromisoformat(d) for d in data["dates"]])
+        if "every_hours" in data:
+            start = data.get("start")
+            anchor = datetime.datetime.fromisoformat(start) if start else datetime.datetime.now().replace(second=0, microsecond=0)
+            return cls("interval", anchor=anchor, every=datetime.timedelta(hours=float(data["every_hours"])))
+        days = data.get("days", "daily")
+        if isinstance(days, str):
+            if days not in WEEKDAY_SETS:
+                raise ValueError(f"unknown day set '{days}'")
+            weekdays = WEEKDAY_SETS[days]
+        else:
+            weekdays = [WEEKDAY_NAMES.index(str(day).lower()[:3]) for day in days]
+        return cls("weekly", at=datetime.time.fromisoformat(data["at"]), weekdays=weekdays)
+
+
+class WallAlarm:
+    """One labelled alarm; next_fire is its pending occurrence (None when disabled or exhausted)."""
+    __slots__ = ("label", "rule", "enabled", "next_fire", "due")
+
+    def __init__(self, label, rule, enabled=True):
+        self.label = label
+        self.rule = rule
+        self.enabled = enabled
+        self.next_fire = None # datetime
+        self.due = None # next_fire as a timestamp, the heap key
+
+
+def load_alarms(path):
+    """Reads a JSON list of alarm definitions, skipping (and reporting) invalid entries."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    alarms = []
+    for index, data in enumerate(entries):
+        try:
+            alarms.append(WallAlarm(data.get("label") or f"Alarm {index + 1}", AlarmRule.from_dict(data),
+                                    data.get("enabled", True)))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            print(f"Skipping alarm #{index} in '{path}': {e}")
+    return alarms
+
+
+class AlarmScheduler(QObject):
+    """Fires wall-clock alarms from a min-heap keyed by each alarm's next occurrence.
+
+    Only the next occurrence of every rule is expanded. One single-shot timer
+    waits for the earliest alarm (at most ALARM_RECHECK_MS, so wall clock
+    changes are picked up); adding, disabling or firing an alarm is a heap
+    push, and outdated heap entries are skipped when they surface, so no
+    tick ever walks all rules. Occurrences missed while suspended fire once.
+    """
+    alarm_fired = pyqtSignal(object, object) # WallAlarm, scheduled datetime
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.alarms = []
+        self._heap = [] # (due timestamp, index); stale when it no longer matches the alarm's due
+        self._wakeup = QTimer(self)
+        self._wakeup.setSingleShot(True)
+        self._wakeup.setTimerType(Qt.PreciseTimer)
+        self._wakeup.timeout.connect(self._on_wakeup)
+
+    def add_alarm(self, alarm):
+        index = len(self.alarms)
+        self.alarms.append(alarm)
+        self._expand(alarm, datetime.datetime.now())
+        if alarm.due is not None:
+            heapq.heappush(self._heap, (alarm.due, index))
+        self._schedule()
+        return index
+
+    def add_alarms(self, alarms):
+        """Adds alarms with one heap rebuild; returns the index of the first one."""
+        first = len(self.alarms)
+        now = datetime.datetime.now()
+        for alarm in alarms:
+            self.alarms.append(alarm)
+            self._expand(alarm, now)
+        self._heap.extend((a.due, i) for i, a in enumerate(self.alarms[first:], first) if a.due is not None)
+        heapq.heapify(self._heap)
+        self._schedule()
+        return first
+
+    def set_enabled(self, index, enabled):
+        alarm = self.alarms[index]
+        alarm.enabled = enabled
+        if enabled:
+            self._expand(alarm, datetime.datetime.now())
+            if alarm.due is not None:
+                heapq.heappush(self._heap, (alarm.due, index))
+        else:
+            alarm.next_fire = alarm.due = None # Its heap entry is now stale
+        self._schedule()
+
+    def next_alarm(self):
+        """(alarm, datetime) of the earliest pending alarm, or None."""
+        while self._heap:
+            due, index = self._heap[0]
+            alarm = self.alarms[index]
+            if alarm.due == due:
+                return alarm, alarm.next_fire
+            heapq.heappop(self._heap) # Drop stale entries on the way
+        return None
+
+    def reschedule(self):
+        """Re-arms the wakeup, e.g. after a wall clock step."""
+        self._schedule()
+
+    def _expand(self, alarm, after):
+        alarm.next_fire = alarm.rule.next_after(after) if alarm.enabled else None
+        alarm.due = alarm.next_fire.timestamp() if alarm.next_fire is not None else None
+
+    def _schedule(self):
+        pending = self.next_alarm()
+        if pending is None:
+            self._wakeup.stop()
+            return
+        delay_ms = max(0, int(math.ceil((pending[0].due - time.time()) * 1000)))
+        self._wakeup.start(min(delay_ms, ALARM_RECHECK_MS))
+
+    def _on_wakeup(self):
+        now = datetime.datetime.now()
+        now_ts = now.timestamp()
+        while self._heap and self._heap[0][0] <= now_ts:
+            due, index = heapq.heappop(self._heap)
+            alarm = self.alarms[index]
+            if alarm.due != due:
+                continue # Stale (disabled or already rescheduled)
+            fired_at = alarm.next_fire
+            # Next occurrence after now: a long suspend rings once, not once per missed occurrence
+            self._expand(alarm, now)
+            if alarm.due is not None:
+                heapq.heappush(self._heap, (alarm.due, index))
+            self.alarm_fired.emit(alarm, fired_at)
+        self._schedule()
+
+
+# --- Streaming Export of Timer History and Laps ---
+EXPORT_FIELDS = ("kind", "index", "duration_s", "split_s", "set_s", "started_at", "outcome")
+EXPORT_CHUNK_ROWS = 10000 # Rows formatted and written per chunk (and per progress update)
+HISTORY_LIMIT = 100000 # Finished/cancelled countdowns kept for export
+
+
+def iter_export_rows(history, durations, splits):
+    """Yields one tuple per countdown in history, then one per lap. Never materializes the output."""
+    for index, (started_at, total_seconds, elapsed_seconds, outcome) in enumerate(history, 1):
+        yield ("timer", index, round(elapsed_seconds, 3), "", total_seconds, started_at, outcome)
+    for index in range(len(durations)):
+        yield ("lap", index + 1, round(durations[index], 3), round(splits[index], 3), "", "", "")
+
+
+def _jsonl_line(row):
+    """One JSON object per row; empty fields are left out, only strings go through json.dumps."""
+    parts = []
+    for name, value in zip(EXPORT_FIELDS, row):
+        if value == "":
+            continue
+        parts.append(f'"{name}": {json.dumps(value) if isinstance(value, str) else value}')
+    return "{" + ", ".join(parts) + "}\n"
+
+
+class ExportWorker(QObject):
+    """Writes export rows to disk in chunks; lives in a QThread, reports back via queued signals."""
+    progress = pyqtSignal(int, int) # rows written, total rows
+    finished = pyqtSignal(str) # path
+    failed = pyqtSignal(str) # error message
+
+    def __init__(self, path, fmt, rows, total_rows, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.fmt = fmt # "csv" or "jsonl"
+        self.rows = rows # Generator from iter_export_rows
+        self.total_rows = total_rows
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        written = 0
+        try:
+            with open(self.path, "w", encoding="utf-8", newline="") as f:
+                if self.fmt == "csv":
+                    writer = csv.writer(f)
+                    writer.writerow(EXPORT_FIELDS)
+                while not self._cancelled:
+                    chunk = []
+                    for row in self.rows:
+                        chunk.append(row)
+                        if len(chunk) == EXPORT_CHUNK_ROWS:
+                            break
+                    if not chunk:
+                        break
+                    if self.fmt == "csv":
+                        writer.writerows(chunk)
+                    else:
+                        f.write("".join(_jsonl_line(row) for row in chunk))
+                    written += len(chunk)
+                    self.progress.emit(written, self.total_rows)
+        except Exception as e: # Bad rows or encoding errors too: the UI must always hear back
+            self.failed.emit(f"Export to '{self.path}' failed: {e}")
+            return
+        if self._cancelled:
+            self.failed.emit("Export cancelled.")
+        else:
+            self.finished.emit(self.path)
+
+
+# --- Plugin Hooks on Timer Events ---
+HOOK_EVENTS = ("start", "pause", "resume", "finish", "cancel", "every")
+HOOK_ACTIONS = ("command", "file", "socket")
+HOOK_DEFAULT_TIMEOUT = 5.0 # seconds before a command is killed or a socket gives up
+HOOK_MAX_THREADS = 4
+HOOK_MAX_PENDING = 16 # queued + running hooks; further events are dropped, not queued
+
+
+class TimerHook:
+    """One configured action for a timer event: run a command, append to a file or write to a local socket.
+
+    "every" hooks fire each interval seconds of running time.
+    """
+
+    def __init__(self, event, action, target, interval=0.0, timeout=HOOK_DEFAULT_TIMEOUT, name=None):
+        if event not in HOOK_EVENTS:
+            raise ValueError(f"unknown hook event '{event}'")
+        if action not in HOOK_ACTIONS:
+            raise ValueError(f"unknown hook action '{action}'")
+        if event == "every" and interval <= 0:
+            raise ValueError("'every' hooks need a positive interval")
+        if action == "socket":
+            hook_socket_address(target) # Raises for anything but a local socket
+        self.event = event
+        self.action = action
+        self.target = target
+        self.interval = float(interval)
+        self.timeout = float(timeout)
+        self.name = name or f"{event}:{action}"
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["event"], data["action"], data["target"], data.get("interval", 0.0),
+                   data.get("timeout", HOOK_DEFAULT_TIMEOUT), data.get("name"))
+
+
+def load_hooks(path):
+    """Reads a JSON list of hook definitions, skipping (and reporting) invalid entries."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    hooks = []
+    for index, data in enumerate(entries):
+        try:
+            hooks.append(TimerHook.from_dict(data))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Skipping hook #{index} in '{path}': {e}")
+    return hooks
+
+
+def hook_socket_address(target):
+    """Parses a socket hook target into (family, address): "unix:/path" or a loopback "host:port".
+
+    Hooks carry timer state, so they are only ever written to this machine.
+    """
+    if target.startswith("unix:"):
+        return socket.AF_UNIX, target[5:]
+    host, _, port = target.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    if host != "localhost":
+        try:
+            loopback = ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise ValueError(f"socket hooks only accept unix: paths or loopback addresses, not '{host}'")
+    return (socket.AF_INET6 if ":" in host else socket.AF_INET), (host, int(port))
+
+
+def append_hook_line(path, line, timeout):
+    """Appends line to path, giving up after timeout seconds.
+
+    The write runs on a helper thread, so a hung filesystem only strands that
+    thread, and O_NONBLOCK keeps a FIFO without a reader from blocking open().
+    """
+    outcome = []
+
+    def write():
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_NONBLOCK", 0), 0o644)
+            with open(fd, "a", encoding="utf-8") as f:
+                f.write(line)
+        except Exception as e:
+            outcome.append(e)
+        else:
+            outcome.append(None)
+
+    writer = threading.Thread(target=write, name="HookFileWriter", daemon=True)
+    writer.start()
+    writer.join(timeout)
+    if writer.is_alive():
+        raise TimeoutError(f"timed out after {timeout:g} s")
+    if outcome[0] is not None:
+        raise outcome[0]
+
+
+def run_hook_action(hook, payload):
+    """Runs one hook on a pool thread. Returns a short result text, raises on failure."""
+    line = json.dumps(payload) + "\n"
+    if hook.action == "command":
+        # The event is passed as one JSON line on stdin
+        completed = subprocess.run(hook.target, shell=isinstance(hook.target, str), input=line,
+                                   capture_output=True, text=True, timeout=hook.timeout)
+        if completed.returncode != 0:
+            raise RuntimeError(f"exit code {completed.returncode}: {completed.stderr.strip()[:200]}")
+        return completed.stdout.strip()[:200]
+    if hook.action == "file":
+        append_hook_line(hook.target, line, hook.timeout)
+        return hook.target
+    # socket: "unix:/path" or a loopback "host:port"
+    family, address = hook_socket_address(hook.target)
+    if family == socket.AF_UNIX:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(hook.timeout)
+            sock.connect(address)
+            sock.sendall(line.encode("utf-8"))
+    else:
+        with socket.create_connection(address, timeout=hook.timeout) as sock:
+            sock.sendall(line.encode("utf-8"))
+    return hook.target
+
+
+class _SignalTask(QRunnable):
+    """Thread pool job that reports its result() through a signal of the object that queued it."""
+
+    def __init__(self, signal):
+        super().__init__()
+        self.signal = signal
+
+    def result(self):
+        raise NotImplementedError
+
+    def run(self):
+        values = self.result()
+        # The owner lives on the GUI thread, so its slot runs there (queued)
+        try:
+            self.signal.emit(*values)
+        except RuntimeError:
+            pass # Owner destroyed while the job ran (app closed)
+
+
+class _HookTask(_SignalTask):
+    def __init__(self, dispatcher, hook, payload):
+        super().__init__(dispatcher._task_done)
+        self.hook = hook
+        self.payload = payload
+
+    def result(self):
+        try:
+            ok, message = True, run_hook_action(self.hook, self.payload)
+        except subprocess.TimeoutExpired:
+            ok, message = False, f"timed out after {self.hook.timeout:g} s"
+        except Exception as e: # A failing hook is reported in hook_finished, never raised
+            ok, message = False, str(e)
+        return self.hook, self.payload["event"], ok, message
+
+
+class HookDispatcher(QObject):
+    """Runs hooks for timer events on a bounded thread pool; the GUI thread only enqueues.
+
+    A hook that is still running is not started again, and once
+    HOOK_MAX_PENDING hooks are queued or running new events are dropped
+    (counted in dropped), so a slow hook can never back up into the timer.
+    """
+    hook_finished = pyqtSignal(str, str, bool, str) # hook name, event, ok, message
+    _task_done = pyqtSignal(object, str, bool, str)
+
+    def __init__(self, hooks=(), parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(HOOK_MAX_THREADS)
+        self.hooks = []
+        self._in_flight = set()
+        self._every_counts = {}
+        self.dropped = 0
+        self._task_done.connect(self._on_task_done)
+        self.set_hooks(hooks)
+
+    def set_hooks(self, hooks):
+        self.hooks = list(hooks)
+        self.every_hooks = [hook for hook in self.hooks if hook.event == "every"]
+        self.reset_intervals()
+
+    def reset_intervals(self):
+        self._every_counts = dict.fromkeys(self.every_hooks, 0)
+
+    def emit_event(self, event, **info):
+        for hook in self.hooks:
+            if hook.event == event:
+                self._submit(hook, dict(info, event=event))
+
+    def tick(self, elapsed_seconds, **info):
+        """Fires "every" hooks whose interval boundary was crossed (called from the 1 Hz logic).
+
+        elapsed_seconds is running time since start, across all segments of a program.
+        """
+        for hook in self.every_hooks:
+            count = int(elapsed_seconds // hook.interval)
+            if count > self._every_counts[hook]:
+                self._every_counts[hook] = count
+                self._submit(hook, dict(info, event="every", elapsed=elapsed_seconds))
+
+    def _submit(self, hook, payload):
+        if hook in self._in_flight or len(self._in_flight) >= HOOK_MAX_PENDING:
+            self.dropped += 1
+            return
+        self._in_flight.add(hook)
+        self.pool.start(_HookTask(self, hook, payload))
+
+    def _on_task_done(self, hook, event, ok, message):
+        self._in_flight.discard(hook)
+        self.hook_finished.emit(hook.name, event, ok, message)
+
+    def shutdown(self, wait_ms=1000):
+        """Drops queued hooks and gives running ones a moment to finish."""
+        self.pool.clear()
+        self.pool.waitForDone(wait_ms)
+
+
+# --- Resource Pack (font and sounds resolved once) ---
+RESOURCE_PACK_NAME = "flip_timer.pack"
+RESOURCE_PACK_MAGIC = b"FTRP"
+RESOURCE_PACK_VERSION = 1
+RESOURCE_PACK_HEADER = struct.Struct("<4sHI") # magic, version, index length
+FONT_RESOURCE = "SF-Pro-Display-Regular.otf"
+ALARM_RESOURCE = "alarm.wav"
+RESOURCE_FILES = (FONT_RESOURCE, ALARM_RESOURCE)
+
+
+def resource_base_dir():
+    """Directory of the script, or of the unpacked bundle in frozen builds."""
+    if getattr(sys, 'frozen', False):
+        # If running as a bundled executable (e.g., PyInstaller)
+        return sys._MEIPASS
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def build_resource_pack(path, directory=None, names=RESOURCE_FILES):
+    """Writes the assets found in directory into one indexed pack file and returns the packed names.
+
+    Layout: header, JSON index {name: [offset, size]} with offsets relative
+    to the end of the index, then the raw files back to back.
+    """
+    directory = directory or resource_base_dir()
+    blobs = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), "rb") as f:
+                blobs.append((name, f.read()))
+        except OSError:
+            print(f"Skipping missing resource '{name}'")
+    index, offset = {}, 0
+    for name, blob in blobs:
+        index[name] = [offset, len(blob)]
+        offset += len(blob)
+    index_bytes = json.dumps(index).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(RESOURCE_PACK_HEADER.pack(RESOURCE_PACK_MAGIC, RESOURCE_PACK_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for _, blob in blobs:
+            f.write(blob)
+    return [name for name, _ in blobs]
+
+
+class ResourcePack:
+    """Font and sounds resolved once at startup.
+
+    Prefers a memory-mapped flip_timer.pack (a single file, nothing to
+    unpack in frozen builds) and falls back to loose files next to the
+    script or in the CWD. Lookups after construction never probe the
+    filesystem.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, directories=None):
+        self._mmap = None
+        self._packed = {} # name -> (offset, size) in the mapped pack
+        self._files = {} # name -> path of a loose file
+        directories = directories or [resource_base_dir(), os.getcwd()]
+        for directory in directories:
+            pack_path = os.path.join(directory, RESOURCE_PACK_NAME)
+            if self._mmap is None and os.path.exists(pack_path):
+                self._open_pack(pack_path)
+        for name in RESOURCE_FILES:
+            if name in self._packed:
+                continue
+            for directory in directories:
+                candidate = os.path.join(directory, name)
+                if os.path.exists(candidate):
+                    self._files[name] = candidate
+                    break
+
+    def _open_pack(self, path):
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_size = RESOURCE_PACK_HEADER.unpack_from(self._mmap, 0)
+            if magic != RESOURCE_PACK_MAGIC or version != RESOURCE_PACK_VERSION:
+                raise ValueError(f"not a version {RESOURCE_PACK_VERSION} resource pack")
+            start = RESOURCE_PACK_HEADER.size + index_size
+            index = json.loads(self._mmap[RESOURCE_PACK_HEADER.size:start])
+            self._packed = {name: (start + offset, size) for name, (offset, size) in index.items()}
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Ignoring resource pack '{path}': {e}")
+            self._mmap = None
+            self._packed = {}
+
+    def __contains__(self, name):
+        return name in self._packed or name in self._files
+
+    def path(self, name):
+        """Filesystem path of a loose resource, None if it is packed or missing."""
+        return self._files.get(name)
+
+    def data(self, name):
+        """Contents of a resource as bytes, or None if it is not available."""
+        if name in self._packed:
+            offset, size = self._packed[name]
+            return self._mmap[offset:offset + size]
+        path = self._files.get(name)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def load_app_font(resources, point_size=9):
+    """Application font registered straight from the resource bytes, or a system fallback."""
+    data = resources.data(FONT_RESOURCE)
+    if data is not None:
+        font_id = QFontDatabase.addApplicationFontFromData(QByteArray(data))
+        families = QFontDatabase.applicationFontFamilies(font_id) if font_id != -1 else []
+        if families:
+            # Widget-specific sizes are applied later
+            font = QFont(families[0])
+            font.setPointSize(point_size)
+            debug_log(f"Font '{families[0]}' loaded and set.")
+            return font
+        debug_log(f"Error: Could not get font families from '{FONT_RESOURCE}'.")
+    else:
+        debug_log(f"Note: Font file '{FONT_RESOURCE}' not found.")
+    debug_log("Using system fallback font.")
+    # Fallback to a similar system font
+    if sys.platform == 'darwin':
+        return QFont('Helvetica Neue', point_size) # macOS
+    if sys.platform.startswith('linux'):
+        return QFont('Roboto', point_size) # Linux
+    return QFont('Segoe UI', point_size) # Windows
+
+
+# --- Audio Worker (owns the pygame mixer) ---
+# Mixer settings per profile: frequency, size, channels, buffer (samples)
+AUDIO_PROFILES = {
+    "low-latency": (48000, -16, 2, 256),  # ~5 ms buffer
+    "balanced": (44100, -16, 2, 1024),    # ~23 ms buffer
+    "low-power": (22050, -16, 1, 4096),   # ~186 ms buffer, fewest wakeups
+}
+DEFAULT_AUDIO_PROFILE = "balanced"
+LATENCY_PROBE_SECONDS = 0.05
+LATENCY_REPEATS = 5
+
+
+def app_settings():
+    return QSettings("FlipTimer", "flip_timer")
+
+
+def saved_audio_profile():
+    """Profile stored by the last audio self-test, or the default."""
+    profile = app_settings().value("audio/profile", DEFAULT_AUDIO_PROFILE)
+    return profile if profile in AUDIO_PROFILES else DEFAULT_AUDIO_PROFILE
+
+
+def measure_mixer_latency(settings, repeats=LATENCY_REPEATS, device=False):
+    """Median ms between playing a short probe and its last sample being consumed, minus the probe length.
+
+    Opens the mixer with settings on the calling thread (closing it again
+    afterwards), on SDL's dummy driver unless device is True. Returns None
+    when the driver rejects the profile.
+    """
+    if pygame.mixer.get_init():
+        pygame.mixer.quit()
+    driver = os.environ.get("SDL_AUDIODRIVER")
+    if not device:
+        os.environ["SDL_AUDIODRIVER"] = "dummy" # Same result on every machine and CI runner
+    try:
+        pygame.mixer.pre_init(*settings)
+        pygame.mixer.init()
+        frequency, _, channels = pygame.mixer.get_init()
+        probe = pygame.mixer.Sound(buffer=bytes(2 * channels * int(frequency * LATENCY_PROBE_SECONDS)))
+        results = []
+        for _ in range(repeats):
+            channel = probe.play()
+            if channel is None:
+                return None
+            start = time.perf_counter()
+            while channel.get_busy():
+                if time.perf_counter() - start > 2.0:
+                    return None # Device never drained the probe
+                time.sleep(0.0005)
+            results.append((time.perf_counter() - start - LATENCY_PROBE_SECONDS) * 1000.0)
+        results.sort()
+        return max(0.0, results[len(results) // 2])
+    except pygame.error as e:
+        print(f"Audio profile {settings} failed: {e}")
+        return None
+    finally:
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        if driver is None:
+            os.environ.pop("SDL_AUDIODRIVER", None)
+        else:
+            os.environ["SDL_AUDIODRIVER"] = driver
+
+
+def run_audio_selftest(device=False):
+    """Measures every profile and returns the name of the lowest-latency one that works.
+
+    Only a run on the real device (device=True) stores it as the audio profile.
+    """
+    best = None
+    for name, settings in AUDIO_PROFILES.items():
+        latency = measure_mixer_latency(settings, device=device)
+        if latency is None:
+            print(f"{name:<12} unavailable")
+            continue
+        print(f"{name:<12} {latency:7.1f} ms")
+        if best is None or latency < best[1]:
+            best = (name, latency)
+    if best is None:
+        print("No audio profile works on this device.")
+        return None
+    if not device:
+        print("Dummy driver only; --audio-selftest-device measures the real device and saves the best profile.")
+        return best[0]
+    settings = app_settings()
+    settings.setValue("audio/profile", best[0])
+    settings.setValue("audio/latency_ms", round(best[1], 1))
+    print(f"Saved '{best[0]}' as the audio profile.")
+    return best[0]
+
+
+ALARM_TONES = ("beep", "chirp", "escalating")
+DEFAULT_ALARM_TONE = "escalating"
+TONE_FADE_SECONDS = 0.005 # Attack/release of every burst, avoids clicks
+
+
+def _tone_burst(sample_rate, seconds, frequency, end_frequency=None):
+    """Sine burst (a linear chirp if end_frequency is given) with short fades at both ends."""
+    t = np.arange(int(sample_rate * seconds), dtype=np.float64) / sample_rate
+    if end_frequency is None:
+        phase = 2.0 * np.pi * frequency * t
+    else:
+        phase = 2.0 * np.pi * (frequency * t + (end_frequency - frequency) * t * t / (2.0 * seconds))
+    burst = np.sin(phase)
+    fade = min(len(burst) // 2, int(sample_rate * TONE_FADE_SECONDS))
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade)
+        burst[:fade] *= ramp
+        burst[-fade:] *= ramp[::-1]
+    return burst
+
+
+@functools.lru_cache(maxsize=32)
+def synthesize_alarm(pattern, sample_rate=44100, channels=2, frequency=880.0, volume=0.8):
+    """One loop of an alarm pattern as a read-only int16 array, (frames, channels) or (frames,) for mono.
+
+    Cached by parameters, so each pattern is synthesized once per mixer format.
+    """
+    if pattern not in ALARM_TONES:
+        raise ValueError(f"unknown alarm tone '{pattern}'")
+
+    def silence(seconds):
+        return np.zeros(int(sample_rate * seconds))
+
+    if pattern == "beep":
+        parts = [_tone_burst(sample_rate, 0.1, frequency), silence(0.1)] * 4 + [silence(0.6)]
+    elif pattern == "chirp":
+        parts = [_tone_burst(sample_rate, 0.3, frequency * 0.75, frequency * 2.0), silence(0.1)] * 2 + [silence(0.6)]
+    else: # escalating: eight beeps with a volume ramp
+        parts = []
+        for gain in np.linspace(0.25, 1.0, 8):
+            parts += [gain * _tone_burst(sample_rate, 0.1, frequency), silence(0.15)]
+        parts.append(silence(0.5))
+    wave = np.concatenate(parts) * (volume * 32767.0)
+    samples = wave.astype(np.int16)
+    if channels > 1:
+        samples = np.ascontiguousarray(np.repeat(samples[:, None], channels, axis=1))
+    samples.flags.writeable = False # Shared between callers through the cache
+    return samples
+
+
+class AudioWorker(QObject):
+    """Runs every pygame mixer call on its own thread, fed by a command queue.
+
+    One per process (the mixer is global); attach()/detach() count the windows using it.
+    """
+    state_changed = pyqtSignal(str) # "ready", "playing", "stopped", "unavailable"
+    error = pyqtSignal(str)
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls(ResourcePack.instance())
+            cls._instance.error.connect(print)
+        return cls._instance
+
+    def __init__(self, resources, parent=None):
+        super().__init__(parent)
+        self.resources = resources
+        self._users = 0
+        self._thread = None
+        self._lock = threading.Lock() # Guards _users and _thread against the thread quitting
+        self._commands = queue.Queue()
+        self._loaded_name = None
+        self._music_file = None # Keeps a packed sound's buffer alive while it streams
+        self._tones = {} # (pattern, mixer format) -> pygame.mixer.Sound
+        self._volume = 1.0
+        self._settings = AUDIO_PROFILES[DEFAULT_AUDIO_PROFILE]
+
+    # Called from the GUI thread
+    def init_mixer(self, settings):
+        self._commands.put(("init", settings))
+
+    def preload(self, name):
+        self._commands.put(("preload", name))
+
+    def play(self, name, loops=-1):
+        self._commands.put(("play", name, loops))
+
+    def preload_tone(self, pattern):
+        self._commands.put(("preload_tone", pattern))
+
+    def play_tone(self, pattern, loops=-1):
+        self._commands.put(("play_tone", pattern, loops))
+
+    def stop(self):
+        self._commands.put(("stop",))
+
+    def set_volume(self, volume):
+        self._commands.put(("volume", volume))
+
+    def quit(self):
+        self._commands.put(("quit",))
+
+    def attach(self):
+        """Registers one user, starting the thread for the first."""
+        with self._lock:
+            self._users += 1
+            if self._thread is None:
+                # A daemon thread rather than a QThread: it lives as long as the app and
+                # must not abort the process if a window is destroyed without closing
+                self._thread = threading.Thread(target=self.run, name="audio", daemon=True)
+                self._thread.start()
+
+    def detach(self, timeout=1.0):
+        """Drops one user; the last one closes the mixer and ends the thread."""
+        with self._lock:
+            self._users -= 1
+            if self._users > 0 or self._thread is None:
+                return
+            thread = self._thread
+        self.quit()
+        thread.join(timeout)
+        # A thread still closing the mixer stays the process's worker, so no second one
+        # can open the mixer beside it; attach() then keeps it or starts a fresh one
+        if not thread.is_alive() and AudioWorker._instance is self:
+            AudioWorker._instance = None
+
+    # Worker thread
+    def run(self):
+        while True:
+            batch = [self._commands.get()]
+            while True:
+                try:
+                    batch.append(self._commands.get_nowait())
+                except queue.Empty:
+                    break
+            # Anything before the last stop in the batch is already obsolete
+            stops = [i for i, command in enumerate(batch) if command[0] in ("stop", "quit")]
+            if stops:
+                batch = [c for c in batch[:stops[-1]] if c[0] not in ("play", "play_tone")] + batch[stops[-1]:]
+            for command in batch:
+                if command[0] == "quit":
+                    with self._lock:
+                        if self._users > 0:
+                            continue # Attached again while the quit was queued
+                        self._quit_mixer()
+                        self._thread = None
+                    return
+                try:
+                    self._execute(command)
+                except Exception as e: # Keep the audio thread alive whatever a command does
+                    self.error.emit(f"Audio error ({command[0]}): {e}")
+
+    def _ensure_mixer(self):
+        if pygame.mixer.get_init():
+            return True
+        debug_log("Initializing pygame mixer...")
+        try:
+            pygame.mixer.pre_init(*self._settings)
+            pygame.mixer.init()
+        except pygame.error as e:
+            self.error.emit(f"Failed to initialize pygame mixer: {e}")
+            self.state_changed.emit("unavailable")
+            return False
+        self.state_changed.emit("ready")
+        return True
+
+    def _load(self, name):
+        if name == self._loaded_name:
+            return
+        path = self.resources.path(name)
+        if path is not None:
+            pygame.mixer.music.load(path)
+            self._music_file = None
+        else:
+            self._music_file = io.BytesIO(self.resources.data(name))
+            pygame.mixer.music.load(self._music_file, os.path.splitext(name)[1][1:])
+        self._loaded_name = name
+
+    def _tone(self, pattern):
+        mixer_format = pygame.mixer.get_init() # (frequency, size, channels)
+        sound = self._tones.get((pattern, mixer_format))
+        if sound is None:
+            samples = synthesize_alarm(pattern, mixer_format[0], mixer_format[2])
+            sound = pygame.sndarray.make_sound(samples)
+            sound.set_volume(self._volume)
+            self._tones[(pattern, mixer_format)] = sound
+        return sound
+
+    def _execute(self, command):
+        kind = command[0]
+        if kind == "init":
+            if command[1] == self._settings and pygame.mixer.get_init():
+                return # Another window asked for the mixer that is already open
+            if pygame.mixer.get_init():
+                pygame.mixer.quit() # Re-open with the new settings
+                self._loaded_name = None
+                self._tones.clear()
+            self._settings = command[1]
+            self._ensure_mixer()
+        elif kind == "stop":
+            if pygame.mixer.get_init():
+                pygame.mixer.music.stop()
+                pygame.mixer.stop() # Tone channels
+            self.state_changed.emit("stopped")
+        elif not self._ensure_mixer():
+            return
+        elif kind == "preload":
+            self._load(command[1])
+        elif kind == "play":
+            self._load(command[1])
+            pygame.mixer.music.play(loops=command[2])
+            self.state_changed.emit("playing")
+        elif kind == "preload_tone":
+            self._tone(command[1])
+        elif kind == "play_tone":
+            self._tone(command[1]).play(loops=command[2])
+            self.state_changed.emit("playing")
+        elif kind == "volume":
+            self._volume = command[1]
+            pygame.mixer.music.set_volume(command[1])
+            for sound in self._tones.values():
+                sound.set_volume(command[1])
+
+    def _quit_mixer(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
+        # Nothing loaded survives the mixer
+        self._loaded_name = None
+        self._music_file = None
+        self._tones.clear()
+
+
+# --- Power Policy (frame rates, blinking and audio by power source) ---
+# fps: ambient animations (progress ring, stopwatch), fling_fps: tweens and
+# picker flings, audio: mixer profile (None keeps the one chosen by the user)
+POWER_PROFILES = {
+    "performance": {"fps": 60, "fling_fps": 60, "blink": True, "audio": None},
+    "balanced": {"fps": 30, "fling_fps": 60, "blink": True, "audio": None},
+    "saver": {"fps": 5, "fling_fps": 30, "blink": False, "audio": "low-power"},
+}
+POWER_AUTO = "auto"
+POWER_SYSFS_ROOT = "/sys/class/power_supply"
+POWER_POLL_MS = 60000 # Power source re-read interval in auto mode
+POWER_SAVER_CAPACITY = 20 # Battery percent at or below which auto mode picks "saver"
+
+
+class SysfsPowerSource:
+    """Reads AC and battery state from /sys/class/power_supply (Linux)."""
+
+    def __init__(self, root=POWER_SYSFS_ROOT):
+        self.root = root
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                return f.read().strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def read(self):
+        """Returns (on_battery, capacity percent); on_battery is None when nothing is known."""
+        try:
+            supplies = os.listdir(self.root)
+        except OSError:
+            return None, None
+        mains_online = None
+        discharging = False
+        capacities = []
+        for name in supplies:
+            base = os.path.join(self.root, name)
+            kind = self._read(os.path.join(base, "type"))
+            if kind == "Mains":
+                online = self._read(os.path.join(base, "online")) == "1"
+                mains_online = bool(mains_online) or online
+            elif kind == "Battery":
+                if self._read(os.path.join(base, "status")) == "Discharging":
+                    discharging = True
+                capacity = self._read(os.path.join(base, "capacity"))
+                if capacity is not None and capacity.isdigit():
+                    capacities.append(int(capacity))
+        if mains_online is None and not capacities:
+            return None, None # Desktop or no sysfs: treated as mains power
+        on_battery = discharging or mains_online is False
+        return on_battery, (min(capacities) if capacities else None)
+
+
+class FakePowerSource:
+    """Power source with a settable state, for tests and benchmarks."""
+
+    def __init__(self, on_battery=False, capacity=None):
+        self.on_battery = on_battery
+        self.capacity = capacity
+
+    def read(self):
+        return self.on_battery, self.capacity
+
+
+def auto_power_profile(on_battery, capacity):
+    if not on_battery:
+        return "performance"
+    if capacity is not None and capacity <= POWER_SAVER_CAPACITY:
+        return "saver"
+    return "balanced"
+
+
+class PowerGovernor(QObject):
+    """Applies a power profile to the app: frame rates, colon blinking and the audio profile.
+
+    In auto mode the profile follows the power source (mains: performance,
+    battery: balanced, low battery: saver), which is re-read every
+    POWER_POLL_MS on a coarse timer.
+    """
+    profile_changed = pyqtSignal(str)
+
+    def __init__(self, app, source=None, mode=POWER_AUTO, parent=None):
+        super().__init__(parent if parent is not None else app)
+        self.app = app
+        self.source = source or SysfsPowerSource()
+        self.mode = None
+        self.profile = None
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setTimerType(Qt.VeryCoarseTimer)
+        self._poll_timer.timeout.connect(self.refresh)
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        """"auto" or one of POWER_PROFILES."""
+        if mode != POWER_AUTO and mode not in POWER_PROFILES:
+            raise ValueError(f"unknown power profile '{mode}'")
+        self.mode = mode
+        if mode == POWER_AUTO:
+            self._poll_timer.start(POWER_POLL_MS)
+        else:
+            self._poll_timer.stop()
+        self.refresh()
+
+    def refresh(self):
+        if self.mode == POWER_AUTO:
+            profile = auto_power_profile(*self.source.read())
+        else:
+            profile = self.mode
+        if profile != self.profile:
+            self.apply(profile)
+
+    def apply(self, profile):
+        settings = POWER_PROFILES[profile]
+        self.profile = profile
+        AnimationDriver.instance().set_max_fps(settings["fps"], settings["fling_fps"])
+        self.app.set_colon_blinking(settings["blink"])
+        self.app.set_audio_profile(settings["audio"] or self.app.preferred_audio_profile)
+        self.profile_changed.emit(profile)
+
+
+# --- Shared Render Cache (pixmaps per device pixel ratio) ---
+RENDER_CACHE_BUDGET = 8 * 1024 * 1024 # Bytes of cached pixmaps, all screens together
+RENDER_CACHE_SCREENS = 2 # Pixel ratios kept warm: the current screen and the previous one
+
+
+def pixmap_bytes(value):
+    """Memory held by a QPixmap or a list of them."""
+    if isinstance(value, QPixmap):
+        return value.width() * value.height() * max(1, value.depth() // 8)
+    return sum(pixmap_bytes(pixmap) for pixmap in value)
+
+
+class RenderCache(QObject):
+    """Pixmaps rendered once per device pixel ratio and shared by all widgets.
+
+    Only the ratios of recently used screens stay warm; off-screen renders just age out of the byte budget.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = RenderCache()
+        return cls._instance
+
+    def __init__(self, budget=RENDER_CACHE_BUDGET, screens=RENDER_CACHE_SCREENS, parent=None):
+        super().__init__(parent)
+        self.budget = budget
+        self.screens = screens
+        self._entries = OrderedDict() # (dpr, name, key) -> (value, bytes), least recently used first
+        self._recent_dprs = [] # Most recently used first
+        self._watched = [] # QWindows whose screen changes are followed
+        self.bytes_used = 0
+        self.hits = self.misses = self.evicted = 0
+
+    @staticmethod
+    def _dpr(value):
+        return round(float(value), 2) # 1.25 and 1.2500001 share a bucket
+
+    def get(self, name, key, dpr, render):
+        """Cached value for (name, key) at dpr; on a miss render(dpr) builds it (a QPixmap or a list)."""
+        dpr = self._dpr(dpr)
+        cache_key = (dpr, name, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = render(dpr)
+        size = pixmap_bytes(value)
+        self._entries[cache_key] = (value, size)
+        self.bytes_used += size
+        # The entry just added always stays, even if it alone is over budget
+        while self.bytes_used > self.budget and len(self._entries) > 1:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.bytes_used -= old_size
+            self.evicted += 1
+        return value
+
+    def use_dpr(self, dpr):
+        """Marks a screen's pixel ratio as in use; buckets of ratios not on a recent screen are dropped."""
+        dpr = self._dpr(dpr)
+        if self._recent_dprs[:1] == [dpr]:
+            return
+        if dpr in self._recent_dprs:
+            self._recent_dprs.remove(dpr)
+        self._recent_dprs.insert(0, dpr)
+        del self._recent_dprs[self.screens:]
+        recent = set(self._recent_dprs)
+        self._drop(lambda cache_key: cache_key[0] not in recent)
+
+    def invalidate(self, name=None):
+        """Drops every entry of one name (or everything), at all pixel ratios."""
+        self._drop(lambda cache_key: name is None or cache_key[1] == name)
+
+    def _drop(self, predicate):
+        for cache_key in [cache_key for cache_key in self._entries if predicate(cache_key)]:
+            self.bytes_used -= self._entries.pop(cache_key)[1]
+            self.evicted += 1
+
+    def watch(self, widget):
+        """Follows the screen of widget's window (call once it has a native window, e.g. in showEvent)."""
+        window = widget.windowHandle()
+        if window is None:
+            return
+        # Closed windows are pruned here rather than from destroyed: a Python slot run
+        # while Qt tears the windows down at interpreter exit crashes the process
+        self._watched = [watched for watched in self._watched if not sip.isdeleted(watched)]
+        if any(watched is window for watched in self._watched):
+            return
+        self._watched.append(window)
+        window.screenChanged.connect(self._on_screen_changed)
+        self.use_dpr(window.devicePixelRatio())
+
+    def _on_screen_changed(self, screen):
+        # The window repaints itself at the new ratio; the bucket for it is
+        # already warm if that screen was used recently
+        if screen is not None:
+            self.use_dpr(screen.devicePixelRatio())
+
+
 # --- Custom iOS Style Toggle Switch Widget ---
 class IOSToggleSwitch(QWidget):
     # Signal emitted when the switch state changes
@@ -43,10 +1638,9 @@ class IOSToggleSwitch(QWidget):
         self._checked = False # Initial state is OFF
         self._slider_position = 0.0 # 0.0 for OFF, 1.0 for ON
 
-        # Animation for smooth transition
-        self._animation = QPropertyAnimation(self, b'slider_position')
-        self._animation.setDuration(200) # Animation duration in ms
-        self._animation.setEasingCurve(QEasingCurve.InOutQuad)
+        # Animation for smooth transition (pooled tween from the shared driver)
+        self._animation = None
+        self._animation_duration = 200 # Animation duration in ms
 
     # Property for animating slider position
     @pyqtProperty(float)
@@ -64,53 +1658,85 @@ class IOSToggleSwitch(QWidget):
     def set_checked(self, checked):
         if self._checked != checked:
             self._checked = checked
-            self._animation.stop()
-            if self._checked:
-                self._animation.setStartValue(self._slider_position)
-                self._animation.setEndValue(1.0)
-            else:
-                self._animation.setStartValue(self._slider_position)
-                self._animation.setEndValue(0.0)
-            self._animation.start()
+            driver = AnimationDriver.instance()
+            driver.cancel(self._animation)
+            end_value = 1.0 if self._checked else 0.0
+            self._animation = driver.animate(self, "slider_position", self._slider_position, end_value,
+                                             self._animation_duration, QEasingCurve.InOutQuad,
+                                             self._animation_finished)
             self.toggled.emit(self._checked) # Emit signal
 
+    def _animation_finished(self):
+        self._animation = None
+
     def toggle(self):
         self.set_checked(not self._checked)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    # --- Pre-rendered sprite frames ---
+    # The switch is drawn once per (size, DPR) into a strip of pixmaps covering
+    # the slider positions (kept in the shared RenderCache); every animation
+    # frame is then a single blit.
+    SPRITE_FRAMES = 25 # Number of pre-rendered slider positions between OFF and ON
+    OFF_COLOR = QColor(189, 189, 191) # Light Grey
+    ON_COLOR = QColor(76, 217, 100) # iOS Green
+
+    @classmethod
+    def _track_color(cls, position):
+        """Blends the track colour between OFF and ON for a slider position."""
+        off, on = cls.OFF_COLOR, cls.ON_COLOR
+        return QColor(
+            round(off.red() + (on.red() - off.red()) * position),
+            round(off.green() + (on.green() - off.green()) * position),
+            round(off.blue() + (on.blue() - off.blue()) * position),
+        )
+
+    @classmethod
+    def _render_frame(cls, width, height, dpr, position):
+        pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
 
-        rect = self.rect()
+        rect = QRect(0, 0, width, height)
         radius = rect.height() / 2 # Half of the height for rounded corners
 
-        # Draw the background track
-        # Color is green when ON, light grey when OFF
-        if self._checked:
-            background_color = QColor(76, 217, 100) # iOS Green
-        else:
-            background_color = QColor(189, 189, 191) # Light Grey
-
-        painter.setBrush(background_color)
+        # Draw the background track, blended from grey (OFF) to green (ON)
+        painter.setBrush(cls._track_color(position))
         painter.setPen(Qt.NoPen)
         painter.drawRoundedRect(rect, radius, radius)
 
         # Draw the slider handle
         handle_size = rect.height() - 4 # Slightly smaller than height
         handle_rect = QRectF(0, 0, handle_size, handle_size)
-        handle_rect.moveCenter(rect.center())
+        handle_rect.moveCenter(QRectF(rect).center())
 
-        # Calculate horizontal position based on slider_position (0.0 to 1.0)
+        # Calculate horizontal position based on slider position (0.0 to 1.0)
         # Move from left side (padding 2) to right side (padding 2)
         min_x = rect.left() + 2
         max_x = rect.right() - handle_size - 2
-        current_x = min_x + (max_x - min_x) * self._slider_position
-        handle_rect.moveLeft(current_x)
+        handle_rect.moveLeft(min_x + (max_x - min_x) * position)
 
         painter.setBrush(QColor(255, 255, 255)) # White handle
-        # Add a subtle shadow (optional, requires more complex drawing or QGraphicsEffect)
-        # For simplicity, we'll skip the shadow here.
         painter.drawEllipse(handle_rect)
+        painter.end()
+        return pixmap
+
+    def _sprite_frames(self, dpr):
+        width, height = self.width(), self.height()
+        last = self.SPRITE_FRAMES - 1
+        return RenderCache.instance().get(
+            "toggle_switch", (width, height), dpr,
+            lambda dpr: [self._render_frame(width, height, dpr, i / last) for i in range(self.SPRITE_FRAMES)])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # Ratio of the device actually painted on: the screen's backing store,
+        # or a QImage/QPixmap when the widget is rendered off-screen
+        frames = self._sprite_frames(painter.paintEngine().paintDevice().devicePixelRatioF())
+        position = max(0.0, min(1.0, self._slider_position))
+        painter.drawPixmap(0, 0, frames[round(position * (len(frames) - 1))])
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -240,8 +1866,8 @@ class PickerWheel(QWidget):
         self._dragging = False
         self._last_mouse_pos = QPoint()
         self._velocity = 0.0 # Для имитации инерции
-        self._animation_timer = QTimer(self) # Таймер для анимации инерции
-        self._animation_timer.timeout.connect(self._apply_inertia)
+        self._inertia_active = False # Инерция тикает от общего AnimationDriver
+        self.snap_animation = None # Текущая анимация "прилипания" (Tween из пула)
 
         self.item_height = 40 # Ориентировочная высота одного элемента в списке (будет пересчитана в paintEvent)
 
@@ -359,7 +1985,9 @@ class PickerWheel(QWidget):
             self._dragging = True
             self._last_mouse_pos = event.pos()
             self._velocity = 0.0 # Сбрасываем скорость при начале перетаскивания
-            self._animation_timer.stop() # Останавливаем анимацию инерции
+            self._stop_inertia() # Останавливаем анимацию инерции
+            AnimationDriver.instance().cancel(self.snap_animation) # И незавершенное прилипание
+            self.snap_animation = None
             event.accept()
 
     def mouseMoveEvent(self, event):
@@ -379,21 +2007,35 @@ class PickerWheel(QWidget):
             # --- Логика "прилипания" и инерции ---
             # Если была достаточная скорость, запускаем анимацию инерции
             if abs(self._velocity) > 1.0: # Порог скорости для инерции
-                 self._animation_timer.start(16) # Запускаем таймер анимации (60 FPS)
+                 self._start_inertia() # Кадры инерции идут от общего драйвера анимаций
             else:
                  # Иначе сразу "прилипаем" к ближайшему значению
                  self._snap_to_nearest_item()
 
             event.accept()
 
-    def _apply_inertia(self):
+    def _start_inertia(self):
+        self._inertia_active = True
+        AnimationDriver.instance().add_ticker(self._apply_inertia, interactive=True)
+
+    def _stop_inertia(self):
+        self._inertia_active = False
+        AnimationDriver.instance().remove_ticker(self._apply_inertia)
+
+    def is_animating(self):
+        return self._inertia_active or self.snap_animation is not None
+
+    def _apply_inertia(self, dt_ms=16.0):
         """Применяет скорость и замедление для имитации инерции."""
-        self._y_offset += self._velocity
-        self._velocity *= 0.95 # Коэффициент замедления (например, 5% за кадр)
+        # Скорость задана в пикселях за 16 мс кадр; масштабируем по фактическому dt,
+        # чтобы физика не зависела от частоты кадров драйвера
+        frames = dt_ms / 16.0
+        self._y_offset += self._velocity * frames
+        self._velocity *= math.pow(0.95, frames) # Коэффициент замедления (5% за 16 мс кадр)
 
         # Если скорость стала очень маленькой, останавливаем анимацию и прилипаем
         if abs(self._velocity) < 1.0:
-            self._animation_timer.stop()
+            self._stop_inertia()
             self._snap_to_nearest_item()
 
         self.update() # Перерисовываем для отображения движения
@@ -422,21 +2064,21 @@ class PickerWheel(QWidget):
         # Оно должно быть таким, чтобы элемент с новым индексом оказался ровно по центру
         target_y_offset = -(new_current_value_index_in_extended_list - self.current_value_index) * self.item_height
 
-        # Запускаем анимацию "прилипания"
-        self.snap_animation = QPropertyAnimation(self, b'y_offset')
-        self.snap_animation.setStartValue(self._y_offset)
-        self.snap_animation.setEndValue(target_y_offset)
-        self.snap_animation.setDuration(min(300, int(abs(self._y_offset - target_y_offset) * 2))) # Длительность зависит от расстояния
-        self.snap_animation.setEasingCurve(QEasingCurve.OutQuad)
-        self.snap_animation.finished.connect(self._snap_animation_finished)
-        self.snap_animation.start()
-
         # Обновляем индекс выбранного значения после определения цели анимации
         self.current_value_index = new_current_value_index_in_extended_list
 
+        # Запускаем анимацию "прилипания" (объект Tween берется из пула драйвера)
+        driver = AnimationDriver.instance()
+        driver.cancel(self.snap_animation)
+        self.snap_animation = None
+        duration = min(300, int(abs(self._y_offset - target_y_offset) * 2)) # Длительность зависит от расстояния
+        self.snap_animation = driver.animate(self, "y_offset", self._y_offset, target_y_offset, duration,
+                                             QEasingCurve.OutQuad, self._snap_animation_finished)
+
 
     def _snap_animation_finished(self):
           # После анимации прилипания сбрасываем смещение _y_offset в ноль.
+          self.snap_animation = None
           self._y_offset = 0.0
           self.update()
           # Теперь self.current_value_index точно указывает на выбранный элемент
@@ -473,6 +2115,10 @@ class PickerWheel(QWidget):
             index_in_extended_list = initial_list_index + 10
 
             if 0 <= index_in_extended_list < len(self._values):
+                 # Останавливаем инерцию и прилипание, иначе они перезапишут новое значение
+                 self._stop_inertia()
+                 AnimationDriver.instance().cancel(self.snap_animation)
+                 self.snap_animation = None
                  self.current_value_index = index_in_extended_list
                  self._y_offset = 0.0 # Сбрасываем любое текущее смещение
                  self.update() # Перерисовываем
@@ -544,8 +2190,157 @@ class TimePickerWidget(QWidget):
         self.seconds_wheel.set_value(time_obj.second())
 
 
+# --- Progress Ring Drawing (shared by TimerApp and the dashboard) ---
+RING_COLOR = QColor("#FF9500") # Bright orange
+RING_START_ANGLE = 90 * 16 # Top of the circle, in QPainter's 1/16 degree units
+RING_SWEEP_UNITS = 360 * 16 # Full circle
+
+
+def draw_progress_ring(painter, circle_rect, progress, line_thickness, color=RING_COLOR):
+    """Draws the remaining-time arc inside circle_rect (already inset by half the pen width)."""
+    # Set pen for drawing
+    pen = QPen(color)
+    pen.setWidth(line_thickness)
+    pen.setCapStyle(Qt.RoundCap) # Rounded ends
+
+    painter.setPen(pen)
+    painter.setBrush(Qt.NoBrush)
+
+    # Angle starts at 90 degrees (top) and goes counter-clockwise.
+    # Remaining angle = progress * 360 degrees, drawn counter-clockwise (positive angle)
+    # so the arc shows the remaining part.
+    painter.drawArc(circle_rect, RING_START_ANGLE, int(progress * RING_SWEEP_UNITS))
+
+
+# --- Tray icon ring (quantized, cached) ---
+TRAY_ICON_STEPS = 48 # Distinct ring positions; the icon only changes every 1/48 of the timer
+TRAY_ICON_SIZE = 32
+TRAY_CLOCK_CHECK_MS = 10000 # Suspend re-check while the per-second tick is off in the tray
+TRAY_TRACK_COLOR = QColor(255, 255, 255, 60)
+
+
+@functools.lru_cache(maxsize=TRAY_ICON_STEPS + 1)
+def tray_ring_icon(step, steps=TRAY_ICON_STEPS, size=TRAY_ICON_SIZE):
+    """Tray icon for a ring filled to step/steps; each step is rendered once."""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    thickness = max(2, size // 8)
+    inset = thickness / 2.0 + 1
+    circle_rect = QRectF(inset, inset, size - 2 * inset, size - 2 * inset)
+    draw_progress_ring(painter, circle_rect, 1.0, thickness, TRAY_TRACK_COLOR)
+    if step > 0:
+        draw_progress_ring(painter, circle_rect, step / steps, thickness)
+    painter.end()
+    return QIcon(pixmap)
+
+
+# --- Fixed-cell digit display with partial repaint ---
+class DigitLabel(QWidget):
+    """Text display for the countdown digits.
+
+    Every character sits in its own cell (all digits share one width, as do
+    ':', '.' and the blinking space), so the layout never shifts and a text
+    change repaints only the cells whose character actually changed.
+    """
+    SEPARATORS = ":. "
+    # Same chain the digits had as a QLabel stylesheet: the bundled font first, then platform fonts
+    FONT_FAMILIES = ["SF Pro Display", "Segoe UI", "Roboto", "Helvetica Neue"]
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self._text = ""
+        self._color = QColor(255, 255, 255)
+        self._cells = [] # QRect per character
+        self._digit_width = 0
+        self._separator_width = 0
+        font = QFont(self.font())
+        font.setFamilies(self.FONT_FAMILIES)
+        font.setStyleHint(QFont.SansSerif) # The stylesheet's final sans-serif
+        self.setFont(font) # Metrics follow from the FontChange event
+        self.setText(text)
+
+    def text(self):
+        return self._text
+
+    def setText(self, text):
+        if text == self._text:
+            return
+        old_text = self._text
+        self._text = text
+        same_layout = len(old_text) == len(text) and all(
+            self._cell_width(a) == self._cell_width(b) for a, b in zip(old_text, text))
+        if not same_layout:
+            self._layout_cells()
+            self.updateGeometry()
+            self.update()
+            return
+        for cell, old_char, new_char in zip(self._cells, old_text, text):
+            if old_char != new_char:
+                self.update(cell) # Only the changed digit cell
+
+    def _update_metrics(self):
+        metrics = QFontMetrics(self.font())
+        self._digit_width = max(metrics.horizontalAdvance(d) for d in "0123456789")
+        self._separator_width = max(metrics.horizontalAdvance(c) for c in self.SEPARATORS)
+        self._ascent = metrics.ascent()
+        self._descent = metrics.descent()
+        self._line_height = metrics.height()
+        self._metrics = metrics
+
+    def _cell_width(self, char):
+        if char.isdigit():
+            return self._digit_width
+        if char in self.SEPARATORS:
+            return self._separator_width
+        return self._metrics.horizontalAdvance(char)
+
+    def _layout_cells(self):
+        total_width = sum(self._cell_width(c) for c in self._text)
+        x = (self.width() - total_width) // 2
+        self._cells = []
+        for char in self._text:
+            width = self._cell_width(char)
+            self._cells.append(QRect(x, 0, width, self.height()))
+            x += width
+
+    def sizeHint(self):
+        return QSize(sum(self._cell_width(c) for c in self._text) + 4, self._line_height)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.FontChange:
+            self._update_metrics()
+            self._layout_cells()
+            self.updateGeometry()
+            self.update()
+        super().changeEvent(event)
+
+    def resizeEvent(self, event):
+        self._layout_cells()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(self.font())
+        painter.setPen(self._color)
+        dirty = event.rect()
+        baseline = (self.height() + self._ascent - self._descent) // 2
+        for cell, char in zip(self._cells, self._text):
+            if char != " " and cell.intersects(dirty):
+                x = cell.left() + (cell.width() - self._metrics.horizontalAdvance(char)) // 2
+                painter.drawText(x, baseline, char)
+
+
 # --- Widget for displaying the countdown timer ---
 class TimerDisplayWidget(QWidget):
+    # Double click on the digits toggles the centisecond display mode
+    double_clicked = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         # Добавляем отступы вокруг содержимого виджета отображения таймера
@@ -554,18 +2349,9 @@ class TimerDisplayWidget(QWidget):
         main_layout.setContentsMargins(10, 110, 10, 10)
         main_layout.setSpacing(10) # Space between time digits and alarm info
 
-        # Label for large countdown digits
-        self.time_label = QLabel("00:00", self) # Will display HH:MM or MM:SS
+        # Large countdown digits (HH:MM:SS, MM:SS or MM:SS.cc), repainted per changed cell
+        self.time_label = DigitLabel("00:00", self)
         # Размер шрифта будет установлен динамически в resizeEvent
-        self.time_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                background: transparent;
-                /* font-size will be set in resizeEvent */
-                font-family: 'SF Pro Display', 'Segoe UI', 'Roboto', 'Helvetica Neue', sans-serif;
-                qproperty-alignment: AlignCenter;
-            }
-        """)
         self.time_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         main_layout.addWidget(self.time_label, alignment=Qt.AlignCenter)
 
@@ -610,10 +2396,16 @@ class TimerDisplayWidget(QWidget):
 
         self.setLayout(main_layout)
 
+    def mouseDoubleClickEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.double_clicked.emit()
+            event.accept()
+
     def update_time_display(self, time_str, alarm_trigger_time_str):
         """Updates the countdown and alarm time labels."""
-        self.time_label.setText(time_str)
-        self.alarm_time_label.setText(alarm_trigger_time_str)
+        self.time_label.setText(time_str) # DigitLabel repaints only the changed cells
+        if self.alarm_time_label.text() != alarm_trigger_time_str:
+            self.alarm_time_label.setText(alarm_trigger_time_str)
 
     def set_time_font_size(self, size):
         """Sets the font size of the large time digits."""
@@ -621,6 +2413,11 @@ class TimerDisplayWidget(QWidget):
         font.setPointSize(size)
         self.time_label.setFont(font)
 
+    def set_alarm_info_visible(self, visible):
+        """Shows or hides the bell icon and trigger time (hidden in stopwatch mode)."""
+        self.alarm_icon_label.setVisible(visible)
+        self.alarm_time_label.setVisible(visible)
+
     def set_alarm_info_font_size(self, size):
           """Sets the font size of the alarm info text."""
           font = self.alarm_time_label.font()
@@ -632,16 +2429,855 @@ class TimerDisplayWidget(QWidget):
           self.alarm_icon_label.setFont(icon_font)
 
 
+# --- Grid dashboard: many countdowns in one widget and one paintEvent ---
+class DashboardTimer:
+    """State of one dashboard countdown. Deadlines are on deadline_clock."""
+    __slots__ = ("label", "total_seconds", "deadline", "remaining", "running",
+                 "text", "sweep", "due")
+
+    def __init__(self, label, total_seconds):
+        self.label = label
+        self.total_seconds = float(total_seconds)
+        self.deadline = None
+        self.remaining = float(total_seconds)
+        self.running = False
+        self.text = "" # Last painted digits
+        self.sweep = -1 # Last painted ring sweep (quantized)
+        self.due = None # Next time (deadline_clock) its display can change
+
+
+class TimerDashboard(QWidget):
+    """Grid of countdowns drawn by a single paintEvent, woken per timer from a deadline heap.
+
+    Only cells that changed are repainted; rows scrolled out of view are not formatted at all.
+    """
+    SMOOTH_SECONDS = 60.0 # Final minute is animated at the frame rate
+    CELL_MIN_SIZE = 64 # Smallest readable cell; below this the grid scrolls
+    BACKGROUND = QColor("black")
+    TEXT_COLOR = QColor(255, 255, 255)
+    LABEL_COLOR = QColor(138, 138, 142)
+    FINISHED_COLOR = QColor(255, 69, 58)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Timers")
+        self.setAttribute(Qt.WA_OpaquePaintEvent) # Every pixel is painted, skip background erase
+        self.timers = []
+        self._heap = [] # (due, index); stale entries are skipped when due no longer matches
+        self._layout_key = None
+        self._columns = self._rows = 1
+        self._cell_w = self._cell_h = self.CELL_MIN_SIZE
+        self._sweep_steps = 0
+        self._scroll = QScrollBar(Qt.Vertical, self)
+        self._scroll.hide()
+        self._scroll.valueChanged.connect(self._on_scroll)
+        self._wakeup = QTimer(self)
+        self._wakeup.setSingleShot(True)
+        self._wakeup.setTimerType(Qt.PreciseTimer)
+        self._wakeup.timeout.connect(self._on_wakeup)
+        self._last_wakeup = 0.0
+        self.resize(640, 480)
+
+    # --- Timer management ---
+    def add_timer(self, label, total_seconds, start=True):
+        entry = DashboardTimer(label, total_seconds)
+        self.timers.append(entry)
+        self._layout_key = None # Grid shape may change
+        self._ensure_layout()
+        if start:
+            self.start_timer(len(self.timers) - 1)
+        self.update()
+        return len(self.timers) - 1
+
+    def add_timers(self, specs, start=True):
+        """Bulk insert of (label, seconds) pairs: one relayout, one heap rebuild, one repaint."""
+        now = deadline_clock()
+        first = len(self.timers)
+        for label, total_seconds in specs:
+            entry = DashboardTimer(label, total_seconds)
+            if start and entry.total_seconds > 0:
+                entry.running = True
+                entry.deadline = now + entry.remaining
+                entry.due = now
+            self.timers.append(entry)
+        self._heap.extend((t.due, i) for i, t in enumerate(self.timers[first:], first) if t.due is not None)
+        heapq.heapify(self._heap)
+        self._layout_key = None
+        self._ensure_layout()
+        self._schedule_wakeup(now)
+        self.update()
+        return len(self.timers) - first
+
+    def start_timer(self, index):
+        entry = self.timers[index]
+        if entry.running or entry.remaining <= 0:
+            return
+        now = deadline_clock()
+        entry.running = True
+        entry.deadline = now + entry.remaining
+        self._push(entry, index, now)
+        self._schedule_wakeup(now)
+
+    def pause_timer(self, index):
+        entry = self.timers[index]
+        if not entry.running:
+            return
+        self._ensure_layout()
+        entry.remaining = max(0.0, entry.deadline - deadline_clock())
+        entry.running = False
+        entry.due = None # Invalidates its heap entry
+        self._refresh(entry, entry.remaining)
+        self.update(self._cell_rect(index))
+
+    def toggle_timer(self, index):
+        if self.timers[index].running:
+            self.pause_timer(index)
+        else:
+            self.start_timer(index)
+
+    # --- Scheduling ---
+    def _push(self, entry, index, due):
+        entry.due = due
+        heapq.heappush(self._heap, (due, index))
+
+    def _next_due(self, entry, now, remaining):
+        if remaining <= self.SMOOTH_SECONDS:
+            return now + AnimationDriver.instance().frame_interval() / 1000.0
+        # Next moment the rounded-up seconds display drops by one
+        return entry.deadline - (math.ceil(remaining) - 1)
+
+    def _schedule_wakeup(self, now):
+        if not self._heap:
+            self._wakeup.stop()
+            return
+        delay_ms = max(0, int((self._heap[0][0] - now) * 1000))
+        # Coalesce: at most one wakeup (and one repaint) per frame, however many timers are due
+        frame_ms = AnimationDriver.instance().frame_interval()
+        delay_ms = max(delay_ms, int(frame_ms - (now - self._last_wakeup) * 1000))
+        self._wakeup.start(delay_ms)
+
+    def _on_wakeup(self):
+        now = deadline_clock()
+        self._last_wakeup = now
+        self._ensure_layout()
+        dirty = QRegion()
+        while self._heap and self._heap[0][0] <= now:
+            due, index = heapq.heappop(self._heap)
+            entry = self.timers[index]
+            if entry.due != due or not entry.running:
+                continue # Stale heap entry (paused or rescheduled)
+            remaining = max(0.0, entry.deadline - now)
+            if not self._row_visible(index // self._columns):
+                # Off screen: nothing to draw, only the deadline matters until it is scrolled into view
+                if remaining <= 0.0:
+                    entry.running = False
+                    entry.remaining = 0.0
+                    entry.due = None
+                else:
+                    self._push(entry, index, entry.deadline)
+                continue
+            if self._refresh(entry, remaining):
+                dirty += self._cell_rect(index)
+            if remaining <= 0.0:
+                entry.running = False
+                entry.remaining = 0.0
+                entry.due = None
+            else:
+                self._push(entry, index, self._next_due(entry, now, remaining))
+        if not dirty.isEmpty():
+            self.update(dirty) # Only the cells that changed
+        self._schedule_wakeup(now)
+
+    def _refresh(self, entry, remaining):
+        """Recomputes the display of one timer; returns True if its cell needs a repaint."""
+        display_seconds = int(math.ceil(remaining))
+        h, rem = divmod(display_seconds, 3600)
+        m, sec = divmod(rem, 60)
+        text = f"{h}:{m:02}:{sec:02}" if h else f"{m:02}:{sec:02}"
+        progress = remaining / entry.total_seconds if entry.total_seconds > 0 else 0.0
+        sweep = int(progress * self._sweep_steps) if self._sweep_steps else 0
+        changed = text != entry.text or sweep != entry.sweep
+        entry.text = text
+        entry.sweep = sweep
+        entry.remaining = remaining
+        return changed
+
+    # --- Layout (precomputed per grid size) ---
+    def _ensure_layout(self):
+        key = (self.width(), self.height(), len(self.timers))
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+        count = max(1, len(self.timers))
+        width, height = max(1, self.width()), max(1, self.height())
+        # Roughly square cells that fill the widget
+        self._columns = max(1, min(count, int(math.ceil(math.sqrt(count * width / height)))))
+        self._rows = int(math.ceil(count / self._columns))
+        self._cell_w = width // self._columns
+        self._cell_h = height // self._rows
+        scrolling = min(self._cell_w, self._cell_h) < self.CELL_MIN_SIZE
+        if scrolling:
+            # Too many to fit readably: as many square cells per row as the width allows, scrolled vertically
+            width = max(1, width - self._scroll.sizeHint().width())
+            self._columns = max(1, min(count, width // self.CELL_MIN_SIZE))
+            self._rows = int(math.ceil(count / self._columns))
+            self._cell_w = self._cell_h = max(self.CELL_MIN_SIZE, width // self._columns)
+
+        size = min(self._cell_w, self._cell_h)
+        self._ring_thickness = max(2, size // 24)
+        diameter = size * 0.86
+        half = self._ring_thickness / 2
+        self._ring_rect = QRectF((self._cell_w - diameter) / 2 + half, (self._cell_h - diameter) / 2 + half,
+                                 diameter - self._ring_thickness, diameter - self._ring_thickness)
+        # One ring step per pixel of circumference: finer changes are invisible
+        self._sweep_steps = max(1, int(math.pi * diameter))
+
+        self._digit_font = QFont(self.font())
+        self._digit_font.setPixelSize(max(8, int(size * 0.2)))
+        self._label_font = QFont(self.font())
+        self._label_font.setPixelSize(max(7, int(size * 0.09)))
+        self._digit_rect = QRectF(0, self._cell_h * 0.36, self._cell_w, self._cell_h * 0.24)
+        self._label_rect = QRectF(0, self._cell_h * 0.6, self._cell_w, self._cell_h * 0.14)
+
+        scroll_range = self._rows * self._cell_h - self.height() if scrolling else 0
+        self._scroll.blockSignals(True) # _reveal below covers the new position
+        self._scroll.setRange(0, max(0, scroll_range))
+        self._scroll.setPageStep(max(1, self.height()))
+        self._scroll.setSingleStep(max(1, self._cell_h // 2))
+        self._scroll.blockSignals(False)
+        self._scroll.setGeometry(self.width() - self._scroll.sizeHint().width(), 0,
+                                 self._scroll.sizeHint().width(), self.height())
+        self._scroll.setVisible(scroll_range > 0)
+        self._reveal()
+
+    def _visible_rows(self):
+        top = self._scroll.value()
+        first = top // self._cell_h
+        last = min(self._rows - 1, (top + max(1, self.height()) - 1) // self._cell_h)
+        return first, last
+
+    def _row_visible(self, row):
+        first, last = self._visible_rows()
+        return first <= row <= last
+
+    def _reveal(self):
+        """Refreshes the visible cells and puts their running timers back on the per-second schedule."""
+        now = deadline_clock()
+        first, last = self._visible_rows()
+        for index in range(first * self._columns, min(len(self.timers), (last + 1) * self._columns)):
+            entry = self.timers[index]
+            remaining = max(0.0, entry.deadline - now) if entry.running else entry.remaining
+            self._refresh(entry, remaining)
+            if entry.running and entry.due is not None and entry.due >= entry.deadline:
+                self._push(entry, index, self._next_due(entry, now, remaining))
+        self._schedule_wakeup(now)
+
+    def _on_scroll(self, value):
+        self._reveal()
+        self.update()
+
+    def _cell_rect(self, index):
+        row, column = divmod(index, self._columns)
+        return QRect(column * self._cell_w, row * self._cell_h - self._scroll.value(), self._cell_w, self._cell_h)
+
+    def resizeEvent(self, event):
+        self._layout_key = None
+        self._ensure_layout()
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        if self._scroll.isVisible():
+            QApplication.sendEvent(self._scroll, event)
+        else:
+            super().wheelEvent(event)
+
+    # --- Painting ---
+    def paintEvent(self, event):
+        self._ensure_layout()
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.BACKGROUND)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Only the cells intersecting the dirty region, each painted once
+        top = self._scroll.value()
+        cells = set()
+        for dirty in event.region().rects():
+            first_row = max(0, (dirty.top() + top) // self._cell_h)
+            last_row = min(self._rows - 1, (dirty.bottom() + top) // self._cell_h)
+            first_column = max(0, dirty.left() // self._cell_w)
+            last_column = min(self._columns - 1, dirty.right() // self._cell_w)
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    cells.add((row, column))
+
+        for row, column in cells:
+            index = row * self._columns + column
+            if index >= len(self.timers):
+                continue
+            entry = self.timers[index]
+            painter.save()
+            painter.translate(column * self._cell_w, row * self._cell_h - top)
+            if entry.sweep > 0:
+                draw_progress_ring(painter, self._ring_rect, entry.sweep / self._sweep_steps,
+                                   self._ring_thickness)
+            painter.setPen(self.FINISHED_COLOR if entry.remaining <= 0 else self.TEXT_COLOR)
+            painter.setFont(self._digit_font)
+            painter.drawText(self._digit_rect, Qt.AlignCenter, entry.text)
+            painter.setPen(self.LABEL_COLOR)
+            painter.setFont(self._label_font)
+            painter.drawText(self._label_rect, Qt.AlignCenter, entry.label)
+            painter.restore()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.timers:
+            self._ensure_layout()
+            column = event.pos().x() // self._cell_w
+            index = ((event.pos().y() + self._scroll.value()) // self._cell_h) * self._columns + column
+            if column < self._columns and 0 <= index < len(self.timers):
+                self.toggle_timer(index) # Click pauses/resumes a cell
+            event.accept()
+
+
+# --- Batch Timer Loading (JSON Lines, one timer per row) ---
+LOAD_ERROR_REPORT = 10 # Bad rows listed one by one in the summary, the rest are only counted
+
+
+def parse_duration(value):
+    """Seconds from a number or an "H:MM:SS" / "MM:SS" / "SS" string. Raises ValueError."""
+    if isinstance(value, bool):
+        raise ValueError("duration must be a number or H:MM:SS")
+    if isinstance(value, str):
+        parts = value.strip().split(":")
+        if not 1 <= len(parts) <= 3:
+            raise ValueError(f"bad duration '{value}'")
+        seconds = 0.0
+        for position, part in enumerate(parts):
+            number = float(part)
+            if not math.isfinite(number):
+                raise ValueError(f"bad duration '{value}'")
+            if number < 0:
+                raise ValueError(f"negative part in duration '{value}'")
+            if position > 0 and number >= 60:
+                raise ValueError(f"minutes and seconds must be below 60 in '{value}'")
+            seconds = seconds * 60 + number
+    elif isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        raise ValueError("duration must be a number or H:MM:SS")
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"duration must be positive, got {value!r}")
+    return seconds
+
+
+def read_timer_specs(stream, first_index=1):
+    """Parses timer rows from a text stream, line by line.
+
+    Each non-empty line is a JSON object with "seconds" (number) or
+    "duration" (number or H:MM:SS) and an optional "label"; lines starting
+    with '#' are comments. Returns ([(label, seconds)], [(line number, error)]),
+    nothing is created for rows that fail.
+    """
+    specs = []
+    errors = []
+    loads = json.loads
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            row = loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("row is not a JSON object")
+            if "seconds" in row:
+                seconds = parse_duration(row["seconds"])
+            elif "duration" in row:
+                seconds = parse_duration(row["duration"])
+            else:
+                raise ValueError("missing 'seconds' or 'duration'")
+            label = row.get("label")
+            if label is None:
+                label = f"Timer {first_index + len(specs)}"
+            elif not isinstance(label, str):
+                label = str(label)
+        except ValueError as e: # json.JSONDecodeError is a ValueError too
+            errors.append((number, str(e)))
+            continue
+        specs.append((label, seconds))
+    return specs, errors
+
+
+# --- Lap list model (virtualized: the view only asks for visible rows) ---
+class LapListModel(QAbstractListModel):
+    BEST_COLOR = QColor(76, 217, 100) # iOS Green
+    WORST_COLOR = QColor(255, 69, 58) # iOS Red
+    TEXT_COLOR = QColor(255, 255, 255)
+
+    def __init__(self, laps, parent=None):
+        super().__init__(parent)
+        self._laps = laps # LapStore, owned by the Stopwatch
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._laps)
+
+    def _lap_index(self, row):
+        return len(self._laps) - 1 - row # Newest lap on top
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        lap = self._lap_index(index.row())
+        if role == Qt.DisplayRole:
+            return f"Lap {lap + 1}\t{format_stopwatch_time(self._laps.durations[lap])}"
+        if role == Qt.ForegroundRole:
+            if len(self._laps) > 1 and lap == self._laps.min_index:
+                return self.BEST_COLOR
+            if len(self._laps) > 1 and lap == self._laps.max_index:
+                return self.WORST_COLOR
+            return self.TEXT_COLOR
+        return None
+
+    def lap_added(self, previous_min_index, previous_max_index):
+        """Call after LapStore.append; notifies the view about one new row (O(1))."""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.endInsertRows()
+        # Best/worst highlighting may have moved to the new lap
+        for lap in {previous_min_index, previous_max_index}:
+            if lap >= 0:
+                row = self.index(len(self._laps) - 1 - lap)
+                self.dataChanged.emit(row, row, [Qt.ForegroundRole])
+
+
+# --- Overlay Frame Server (timer display streamed to local consumers) ---
+FRAME_SERVER_SIZE = (640, 360)
+FRAME_SERVER_FPS = 30
+FRAME_SERVER_IDLE_MS = 250 # Poll interval while the countdown is not running
+FRAME_SERVER_JPEG_QUALITY = 85
+FRAME_SERVER_MAX_THREADS = 2
+FRAME_SERVER_MAX_BACKLOG = 2 # Frames a consumer may lag behind before frames are skipped for it
+FRAME_FORMATS = ("mjpeg", "raw")
+MJPEG_BOUNDARY = b"flipframe"
+RAW_FRAME_MAGIC = b"FTFR"
+RAW_FRAME_HEADER = struct.Struct("<4sIII") # magic, width, height, frame number; RGBA8888 pixels follow
+HTTP_REQUEST_LIMIT = 8192
+
+
+def encode_frame_packet(image, fmt, number, quality=FRAME_SERVER_JPEG_QUALITY):
+    """Encodes a rendered frame into the bytes sent to every consumer of fmt (runs on a pool thread)."""
+    if fmt == "mjpeg":
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "JPEG", quality) # Transparent pixels end up black
+        buffer.close()
+        header = b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % (MJPEG_BOUNDARY, data.size())
+        return QByteArray(header) + data + QByteArray(b"\r\n")
+    # raw: straight (non-premultiplied) RGBA, so the overlay can be composited with its transparency
+    rgba = image.convertToFormat(QImage.Format_RGBA8888)
+    header = RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, rgba.width(), rgba.height(), number)
+    return QByteArray(header + rgba.constBits().asstring(rgba.sizeInBytes()))
+
+
+class _FrameEncodeTask(_SignalTask):
+    def __init__(self, server, fmt, number, image):
+        super().__init__(server._encoded)
+        self.fmt = fmt
+        self.number = number
+        self.image = image
+
+    def result(self):
+        try:
+            packet = encode_frame_packet(self.image, self.fmt, self.number)
+        except Exception as e:
+            print(f"Error encoding {self.fmt} frame: {e}")
+            packet = None # Still reported, so the server can start the next pending frame
+        return self.fmt, self.number, packet
+
+
+class FrameServer(QObject):
+    """Streams the timer display to local consumers: MJPEG over HTTP, raw RGBA8888 over a Unix socket.
+
+    Frames are only rendered when the display changed and someone is connected.
+    """
+    _encoded = pyqtSignal(str, int, object) # format, frame number, packet (QByteArray or None)
+
+    def __init__(self, app, size=FRAME_SERVER_SIZE, fps=FRAME_SERVER_FPS, parent=None):
+        super().__init__(parent if parent is not None else app)
+        self.app = app
+        self.width, self.height = size
+        self.fps = max(1, fps)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(FRAME_SERVER_MAX_THREADS)
+        self._clients = {fmt: [] for fmt in FRAME_FORMATS}
+        self._requests = {} # HTTP socket -> request bytes received so far
+        self._latest = dict.fromkeys(FRAME_FORMATS) # Last packet per format, sent to new consumers at once
+        self._encoding = set() # Formats with an encode in flight
+        self._pending = {} # Format -> (number, image) waiting for the encoder
+        self._key = None
+        self._view = None # Private TimerDisplayWidget, built for the first consumer
+        self._http_server = None
+        self._unix_server = None
+        self.frame_number = 0
+        self.frames_encoded = 0
+        self.frames_skipped = 0 # Packets not written to consumers that lag behind
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setSingleShot(True)
+        self._poll_timer.setTimerType(Qt.PreciseTimer)
+        self._poll_timer.timeout.connect(self.poll)
+        self._encoded.connect(self._on_encoded)
+
+        # Ring geometry, fixed for the output resolution
+        side = min(self.width, self.height)
+        diameter = side * 0.9
+        self._ring_thickness = max(2, int(side / 45))
+        half = self._ring_thickness / 2
+        self._ring_rect = QRectF((self.width - diameter) / 2 + half, (self.height - diameter) / 2 + half,
+                                 diameter - self._ring_thickness, diameter - self._ring_thickness)
+        self._sweep_steps = max(1, int(math.pi * diameter))
+        self._font_scale = diameter / 300.0 # The app's ring is about 300 px at the default window size
+
+    # --- Listening ---
+    def listen_http(self, port):
+        """MJPEG over HTTP on loopback; returns the bound port (useful with port 0)."""
+        server = QTcpServer(self)
+        if not server.listen(QHostAddress.LocalHost, port):
+            raise OSError(f"cannot listen on 127.0.0.1:{port}: {server.errorString()}")
+        server.newConnection.connect(self._on_http_connection)
+        self._http_server = server
+        return server.serverPort()
+
+    def listen_unix(self, path):
+        """Raw frames over a Unix socket at path."""
+        QLocalServer.removeServer(path) # Stale socket file from a previous run
+        server = QLocalServer(self)
+        if not server.listen(path):
+            raise OSError(f"cannot listen on '{path}': {server.errorString()}")
+        server.newConnection.connect(self._on_unix_connection)
+        self._unix_server = server
+        return server.fullServerName()
+
+    def has_consumers(self):
+        return any(self._clients.values())
+
+    def _on_http_connection(self):
+        while self._http_server.hasPendingConnections():
+            sock = self._http_server.nextPendingConnection()
+            # Sockets are referenced from here until they disconnect, the wrappers must not be collected
+            self._requests[sock] = bytearray()
+            sock.readyRead.connect(self._on_http_ready_read)
+            sock.disconnected.connect(self._on_disconnected)
+
+    def _on_http_ready_read(self):
+        sock = self.sender()
+        request = self._requests.get(sock)
+        if request is None:
+            sock.readAll() # Streaming consumers have nothing more to say
+            return
+        request.extend(bytes(sock.readAll()))
+        if b"\r\n\r\n" not in request:
+            if len(request) > HTTP_REQUEST_LIMIT:
+                sock.abort()
+            return
+        del self._requests[sock]
+        if not request.startswith(b"GET "):
+            sock.write(b"HTTP/1.0 405 Method Not Allowed\r\nConnection: close\r\n\r\n")
+            sock.disconnectFromHost()
+            return
+        sock.write(b"HTTP/1.0 200 OK\r\nCache-Control: no-cache\r\nConnection: close\r\n"
+                   b"Content-Type: multipart/x-mixed-replace; boundary=%s\r\n\r\n" % MJPEG_BOUNDARY)
+        self._add_client("mjpeg", sock)
+
+    def _on_unix_connection(self):
+        while self._unix_server.hasPendingConnections():
+            sock = self._unix_server.nextPendingConnection()
+            sock.disconnected.connect(self._on_disconnected)
+            self._add_client("raw", sock)
+
+    def _on_disconnected(self):
+        sock = self.sender()
+        self._requests.pop(sock, None)
+        for fmt in FRAME_FORMATS:
+            if sock in self._clients[fmt]:
+                self._remove_client(fmt, sock)
+        sock.deleteLater()
+
+    def _add_client(self, fmt, sock):
+        self._clients[fmt].append(sock)
+        if self._latest[fmt] is not None:
+            sock.write(self._latest[fmt])
+        else:
+            self._key = None # Nothing encoded for this format yet, render the next poll
+        app = self.app
+        if app.tray_mode and app.mode == TimerMode.COUNTDOWN and app.current_state == TimerState.RUNNING:
+            app.arm_seconds_timer() # The digits are not refreshed per second while in the tray otherwise
+        self._poll_timer.start(0)
+
+    def _remove_client(self, fmt, sock):
+        self._clients[fmt].remove(sock)
+        if not self._clients[fmt]:
+            # Stops being updated, a later consumer gets a freshly rendered frame
+            self._latest[fmt] = None
+            self._pending.pop(fmt, None)
+        if not self.has_consumers():
+            self._poll_timer.stop()
+
+    # --- Rendering ---
+    def content_key(self):
+        """Everything a frame depends on, cheap to compare."""
+        app = self.app
+        display = app.timer_display_widget
+        sweep = 0
+        if (app.mode == TimerMode.COUNTDOWN and app.current_state in (TimerState.RUNNING, TimerState.PAUSED)
+                and app.total_seconds_at_start > 0):
+            sweep = int(app.remaining_now() / app.total_seconds_at_start * self._sweep_steps)
+        alarm = "" if display.alarm_time_label.isHidden() else display.alarm_time_label.text()
+        return display.time_label.text(), alarm, sweep
+
+    def poll(self):
+        if not self.has_consumers():
+            return
+        key = self.content_key()
+        if key != self._key:
+            self._key = key
+            self._render(*key)
+        running = self.app.current_state == TimerState.RUNNING
+        self._poll_timer.start(int(1000 / self.fps) if running else FRAME_SERVER_IDLE_MS)
+
+    def _ensure_view(self):
+        if self._view is None:
+            view = TimerDisplayWidget()
+            view.setAttribute(Qt.WA_DontShowOnScreen) # Laid out and rendered, never mapped
+            view.layout().setContentsMargins(10, int(self.height * 0.3), 10, 10)
+            view.set_time_font_size(max(12, int(44 * self._font_scale)))
+            view.set_alarm_info_font_size(max(6, int(14 * self._font_scale)))
+            view.resize(self.width, self.height)
+            view.show()
+            self._view = view
+        return self._view
+
+    def _render(self, text, alarm, sweep):
+        view = self._ensure_view()
+        view.update_time_display(text, alarm)
+        view.set_alarm_info_visible(bool(alarm))
+        view.layout().activate()
+        # A fresh image per frame: the previous one may still be read by an encoder thread
+        image = QImage(self.width, self.height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        if sweep > 0:
+            draw_progress_ring(painter, self._ring_rect, sweep / self._sweep_steps, self._ring_thickness)
+        view.render(painter, QPoint(), QRegion(), QWidget.DrawChildren)
+        painter.end()
+        self.frame_number += 1
+        for fmt in FRAME_FORMATS:
+            if self._clients[fmt]:
+                self._submit(fmt, self.frame_number, image)
+
+    # --- Encoding and fan-out ---
+    def _submit(self, fmt, number, image):
+        if fmt in self._encoding:
+            self._pending[fmt] = (number, image) # Replaces an older frame that never got encoded
+            return
+        self._encoding.add(fmt)
+        self.pool.start(_FrameEncodeTask(self, fmt, number, image))
+
+    def _on_encoded(self, fmt, number, packet):
+        self._encoding.discard(fmt)
+        pending = self._pending.pop(fmt, None)
+        if pending is not None:
+            self._submit(fmt, *pending)
+        if packet is None or not self._clients[fmt]:
+            return
+        self.frames_encoded += 1
+        self._latest[fmt] = packet
+        backlog = FRAME_SERVER_MAX_BACKLOG * packet.size()
+        for sock in self._clients[fmt]:
+            if sock.bytesToWrite() > backlog:
+                self.frames_skipped += 1
+                continue
+            sock.write(packet)
+
+    def shutdown(self, wait_ms=1000):
+        self._poll_timer.stop()
+        for server in (self._http_server, self._unix_server):
+            if server is not None:
+                server.close()
+        for sock in list(self._requests) + [sock for sockets in self._clients.values() for sock in sockets]:
+            sock.abort()
+        self.pool.clear()
+        self.pool.waitForDone(wait_ms)
+        if self._view is not None:
+            self._view.deleteLater()
+            self._view = None
+
+
+# --- Sampling Profiler (GUI thread stacks in collapsed format) ---
+PROFILER_DEFAULT_HZ = 200
+PROFILER_MAX_DEPTH = 64
+PROFILER_CHORD = "Ctrl+Alt+Shift+P" # Hidden shortcut that starts/stops profiling
+PROFILER_IDLE = "idle" # Samples taken while the event loop sleeps
+_QT_EVENT_NAMES = {int(value): name for name, value in vars(QEvent).items() if isinstance(value, QEvent.Type)}
+
+
+class SamplingProfiler(QObject):
+    """Samples the GUI thread's stack into collapsed stacks rooted at the Qt event being handled.
+
+    The hooks only exist while profiling, and the event filter just queues deliveries for the sampler thread.
+    """
+
+    def __init__(self, rate_hz=PROFILER_DEFAULT_HZ, parent=None):
+        super().__init__(parent)
+        self.rate_hz = max(1, rate_hz)
+        self.samples = {} # (event name, outermost frame, ..., innermost frame) -> count
+        self.sample_count = 0
+        self._labels = {} # code object -> frame label
+        # (QEvent type, calling frame, its f_lasti) per delivered event, None when the loop sleeps or wakes.
+        # deque appends and pops are atomic, so the GUI thread never waits for the sampler
+        self._pending = deque()
+        self._deliveries = [] # Sampler thread only: events still being delivered, outermost first
+        self._idle = True
+        self._own_code = {func.__code__ for func in vars(SamplingProfiler).values() if hasattr(func, "__code__")}
+        self._target_id = threading.get_ident() # Created on the GUI thread
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        app = QApplication.instance()
+        app.installEventFilter(self)
+        dispatcher = QAbstractEventDispatcher.instance()
+        dispatcher.aboutToBlock.connect(self._on_about_to_block)
+        dispatcher.awake.connect(self._on_awake)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        QApplication.instance().removeEventFilter(self)
+        dispatcher = QAbstractEventDispatcher.instance()
+        dispatcher.aboutToBlock.disconnect(self._on_about_to_block)
+        dispatcher.awake.disconnect(self._on_awake)
+        self._pending.clear() # Drops the frame references
+        self._deliveries = []
+
+    def eventFilter(self, obj, event):
+        caller = sys._getframe().f_back # Python frame that called into Qt (exec_(), repaint(), ...)
+        self._pending.append((event.type(), caller, caller.f_lasti if caller is not None else -1))
+        self._idle = False # Not every dispatcher emits awake
+        return False
+
+    @staticmethod
+    def _in_progress(delivery, frame_ids):
+        caller = delivery[1]
+        return caller is None or (id(caller) in frame_ids and caller.f_lasti == delivery[2])
+
+    def _on_about_to_block(self):
+        self._pending.append(None)
+        self._idle = True
+
+    def _on_awake(self):
+        self._pending.append(None) # Woken, no event delivered yet (timers and sockets are dispatched next)
+        self._idle = False
+
+    def _take_pending(self):
+        """Moves the queued deliveries onto the sampler's own stack of deliveries."""
+        pending = self._pending
+        deliveries = self._deliveries
+        while pending:
+            delivery = pending.popleft()
+            if delivery is None:
+                deliveries.clear()
+            else:
+                # The same call site delivering again means its previous event is over
+                deliveries[:] = [other for other in deliveries if other[1] is not delivery[1]]
+                deliveries.append(delivery)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        current_frames = sys._current_frames
+        next_sample = time.perf_counter()
+        while True:
+            next_sample += interval
+            delay = next_sample - time.perf_counter()
+            if delay < 0:
+                next_sample = time.perf_counter() # Fell behind (GIL held elsewhere), don't burst
+                delay = 0
+            if self._stop.wait(delay):
+                break
+            self._take_pending() # Before the stack is read, so every delivery taken has its caller in it
+            frame = current_frames().get(self._target_id)
+            idle = self._idle
+            if frame is None:
+                continue
+            if idle:
+                key = (PROFILER_IDLE,)
+            else:
+                stack = []
+                frame_ids = set()
+                while frame is not None:
+                    if len(stack) < PROFILER_MAX_DEPTH and frame.f_code not in self._own_code:
+                        stack.append(self._label(frame.f_code))
+                    frame_ids.add(id(frame))
+                    frame = frame.f_back
+                # Deliveries whose caller returned or moved on are over; the innermost left is the current event
+                deliveries = self._deliveries
+                deliveries[:] = [delivery for delivery in deliveries if self._in_progress(delivery, frame_ids)]
+                event_type = deliveries[-1][0] if deliveries else None
+                stack.append("Dispatch" if event_type is None else _QT_EVENT_NAMES.get(event_type, f"Event {event_type}"))
+                stack.reverse()
+                key = tuple(stack)
+            self.samples[key] = self.samples.get(key, 0) + 1
+            self.sample_count += 1
+
+    def event_totals(self):
+        """Sample counts per root (Qt event type or idle), largest first."""
+        totals = {}
+        for key, count in list(self.samples.items()):
+            totals[key[0]] = totals.get(key[0], 0) + count
+        return sorted(totals.items(), key=lambda item: -item[1])
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for key, count in sorted(self.samples.items()):
+                f.write(f"{';'.join(key)} {count}\n")
+        return path
+
+
 # --- Main application window ---
 class TimerApp(QWidget):
-    def __init__(self):
+    def __init__(self, audio_profile=None, power_profile=POWER_AUTO, opaque=False):
         super().__init__()
+        self._construction_started = time.perf_counter()
 
         self.setWindowTitle("iOS Style Timer")
         # Убираем стандартную строку заголовка Windows
         # Оставляем WindowStaysOnTopHint, если нужно, чтобы окно всегда было поверх других
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # Opaque mode: the rounded corners come from a window mask and the
+        # surface has no alpha channel, so the compositor never blends it per
+        # pixel. Transparent mode only needs window opacity, which works either way.
+        self.opaque_window = opaque
+        self._mask_size = None
+        if opaque:
+            self.setAttribute(Qt.WA_OpaquePaintEvent) # paintEvent covers every pixel
+        else:
+            self.setAttribute(Qt.WA_TranslucentBackground)
         self.setStyleSheet("background-color: transparent;")
 
         # Adjusted initial and minimum window sizes (slightly reduced)
@@ -662,26 +3298,61 @@ class TimerApp(QWidget):
         self.expanded_section_height = 150
 
         # --- Timer Attributes ---
-        # Timer for smooth animation updates (approx. 60 FPS)
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_timer_animation)
+        # Smooth ring animation updates (approx. 60 FPS) are ticked by the shared
+        # AnimationDriver, see update_timer_animation
 
-        # Timer for actual countdown logic (every second)
+        # Timer for actual countdown logic, re-armed for the moment the displayed second changes
         self.seconds_timer = QTimer(self)
+        self.seconds_timer.setSingleShot(True)
+        self.seconds_timer.setTimerType(Qt.PreciseTimer)
         self.seconds_timer.timeout.connect(self.update_timer_logic)
 
         # Timer for colon blinking
         self.blink_timer = QTimer(self)
         self.blink_timer.timeout.connect(self.blink_colon)
         self.colon_visible = True
+        self.colon_blinking = True # Turned off by the "saver" power profile
 
         self.alarm_playing = False
+        self.audio_profile = audio_profile or saved_audio_profile()
+        self.preferred_audio_profile = self.audio_profile # Restored when a power profile stops overriding it
+        self.start_audio()
         self.total_seconds_at_start = 0
         self.remaining_seconds = 0.0 # Use float for smoother progress calculation
-        self.start_datetime = None # Use datetime for accurate time tracking
-        self.end_datetime = None # To display alarm trigger time
+        self.end_datetime = None # Wall time of the deadline, only for the "ends at" label
 
         self.current_state = TimerState.IDLE # Start in picker state
+        self.mode = TimerMode.COUNTDOWN # Countdown or stopwatch
+        self.stopwatch = Stopwatch()
+        # (started_at ISO string, set seconds, elapsed seconds, outcome) per finished/cancelled countdown
+        self.timer_history = deque(maxlen=HISTORY_LIMIT)
+        self.history_started_at = None
+        # Countdown deadline on deadline_clock (set on start/resume), the only source of remaining time
+        self.deadline = None
+        self.clock_watch = ClockWatch()
+        # Optional MM:SS.cc display, refreshed every frame instead of once per second
+        self.centisecond_mode = False
+        self._last_ring_sweep = None # Last painted sweep, the ring only repaints when it changes
+        self._export_thread = None
+        self._export_worker = None
+        self.dashboard = None # TimerDashboard window, created on first use
+        # Actions attached to timer events, run off the GUI thread
+        self.hooks = HookDispatcher(parent=self)
+        self.hooks.hook_finished.connect(self._on_hook_finished)
+        # Wall-clock alarms ("ring at 07:00 on weekdays"), independent of the countdown
+        self.alarm_scheduler = AlarmScheduler(self)
+        self.alarm_scheduler.alarm_fired.connect(self._on_wall_alarm)
+        self._alarm_box = None # Non-modal notice listing the alarms ringing right now
+        self._ringing_alarms = []
+        # Running program (CompiledSchedule), see start_program
+        self.schedule = None
+        self.segment_index = 0
+        self._paused_at = None
+        # Single precise wakeup at the deadline (end of the countdown or of a program segment)
+        self.deadline_timer = QTimer(self)
+        self.deadline_timer.setSingleShot(True)
+        self.deadline_timer.setTimerType(Qt.PreciseTimer)
+        self.deadline_timer.timeout.connect(self.on_deadline)
 
         # Progress for the circular indicator (1.0 to 0.0, 1.0 means full circle)
         self.progress = 1.0
@@ -690,9 +3361,40 @@ class TimerApp(QWidget):
         self.transparent_mode_enabled = False
         # -----------------------------------
 
+        # Secondary views (display, expandable section) are built on first use
+        # or right after the first frame, see build_deferred_views
+        self._timer_display_widget = None
+        self.expandable_widget = None
+        self._display_scale_factor = None
+        self.time_to_first_frame_ms = None
+        self._first_frame_scheduled = False
+
+        # Tray mode: window hidden, only the deadline and the tray icon's next ring step wake the app
+        self.tray_mode = False
+        self.tray_icon = None # QSystemTrayIcon, created on first use
+        self._tray_step = None
+        self.tray_step_timer = QTimer(self)
+        self.tray_step_timer.setSingleShot(True)
+        self.tray_step_timer.timeout.connect(self.update_tray_icon)
+        # Qt timers don't count suspend time, so the tray still needs a coarse tick to catch a resume
+        self.tray_clock_timer = QTimer(self)
+        self.tray_clock_timer.setTimerType(Qt.VeryCoarseTimer)
+        self.tray_clock_timer.timeout.connect(self.update_tray_icon)
+        self.frame_server = None # FrameServer streaming the display, see start_frame_server
+
         self.create_ui()
         self.update_ui_state() # Set initial UI state
 
+        # Frame rates, blinking and audio follow the power source (or a fixed profile)
+        self.power = PowerGovernor(self, mode=power_profile)
+
+        # Sampling profiler, created on first use (hidden key chord or --profile)
+        self.profiler = None
+        self.profile_path = None # Output of the next stop; a timestamped file when None
+        self.profiler_shortcut = QShortcut(QKeySequence(PROFILER_CHORD), self)
+        self.profiler_shortcut.setContext(Qt.ApplicationShortcut)
+        self.profiler_shortcut.activated.connect(self.toggle_profiler)
+
         # Save initial sizes and font sizes for scaling
         # Используем self.height() после создания UI, чтобы получить фактическую высоту
         self.initial_total_height = self.height()
@@ -739,10 +3441,7 @@ class TimerApp(QWidget):
         self.time_picker_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.MinimumExpanding)
         self.stacked_widget.addWidget(self.time_picker_widget) # Index 0
 
-        # View 1: Timer Display
-        self.timer_display_widget = TimerDisplayWidget(self)
-        self.timer_display_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.MinimumExpanding)
-        self.stacked_widget.addWidget(self.timer_display_widget) # Index 1
+        # View 1: Timer Display, built lazily (see ensure_display_view)
 
         main_layout.addWidget(self.stacked_widget, 1)
 
@@ -802,17 +3501,8 @@ class TimerApp(QWidget):
 
         main_layout.addLayout(self.buttons_layout)
 
-        # --- Expandable Section (keep as is) ---
-        self.expandable_widget = QWidget(self)
-        self.expandable_widget.setStyleSheet("background-color: #1C1C1E; border-radius: 8px;")
-        expandable_layout = QVBoxLayout(self.expandable_widget)
-        expandable_layout.setContentsMargins(15, 15, 15, 15)
-        placeholder_label = QLabel("Список будет здесь (пока пусто)")
-        placeholder_label.setStyleSheet("color: #8A8A8E; font-size: 14px; background: transparent;")
-        placeholder_label.setAlignment(Qt.AlignCenter)
-        expandable_layout.addWidget(placeholder_label)
-        self.expandable_widget.setFixedHeight(self.expanded_section_height)
-        self.expandable_widget.setVisible(False)
+        # --- Expandable Section: built lazily (see ensure_expandable_section) ---
+        self.lap_model = LapListModel(self.stopwatch.laps, self)
 
         # --- Bottom Bar with Toggle Button (keep as is) ---
         self.bottom_bar_frame = QFrame(self)
@@ -831,8 +3521,48 @@ class TimerApp(QWidget):
         self.toggle_button.clicked.connect(self.toggle_expandable_section)
         bottom_bar_layout.addWidget(self.toggle_button, alignment=Qt.AlignLeft | Qt.AlignVCenter)
         bottom_bar_layout.addStretch(1)
+        # Countdown / stopwatch mode switch
+        self.mode_button = QPushButton("⏱")
+        self.mode_button.setCheckable(True)
+        self.mode_button.setToolTip("Stopwatch")
+        self.mode_button.setStyleSheet("""
+            QPushButton { color: #8A8A8E; background-color: transparent; border: none; font-size: 18px; padding: 0px; }
+            QPushButton:hover { color: #CCCCCC; }
+            QPushButton:checked { color: #FF9500; }
+        """)
+        self.mode_button.setFixedSize(30, 30)
+        self.mode_button.clicked.connect(self.toggle_mode)
+        bottom_bar_layout.addWidget(self.mode_button, alignment=Qt.AlignRight | Qt.AlignVCenter)
+        # Sends the picker's time to the grid dashboard as a new running timer
+        self.dashboard_button = QPushButton("▦")
+        self.dashboard_button.setToolTip("Add to dashboard")
+        self.dashboard_button.setStyleSheet("""
+            QPushButton { color: #8A8A8E; background-color: transparent; border: none; font-size: 18px; padding: 0px; }
+            QPushButton:hover { color: #CCCCCC; }
+        """)
+        self.dashboard_button.setFixedSize(30, 30)
+        self.dashboard_button.clicked.connect(self.add_to_dashboard)
+        bottom_bar_layout.addWidget(self.dashboard_button, alignment=Qt.AlignRight | Qt.AlignVCenter)
+        # Interval programs (pomodoro, HIIT)
+        self.program_button = QPushButton("☰")
+        self.program_button.setToolTip("Programs")
+        self.program_button.setStyleSheet(self.dashboard_button.styleSheet())
+        self.program_button.setFixedSize(30, 30)
+        self.program_menu = QMenu(self)
+        for program in BUILTIN_PROGRAMS:
+            action = self.program_menu.addAction(program.name)
+            action.triggered.connect(lambda checked=False, p=program: self.start_program(p))
+        self.program_button.clicked.connect(
+            lambda: self.program_menu.popup(self.program_button.mapToGlobal(self.program_button.rect().topLeft())))
+        bottom_bar_layout.addWidget(self.program_button, alignment=Qt.AlignRight | Qt.AlignVCenter)
+        # Hide into the system tray (the timer keeps running)
+        self.tray_button = QPushButton("▾")
+        self.tray_button.setToolTip("Minimize to tray")
+        self.tray_button.setStyleSheet(self.dashboard_button.styleSheet())
+        self.tray_button.setFixedSize(30, 30)
+        self.tray_button.clicked.connect(self.enter_tray_mode)
+        bottom_bar_layout.addWidget(self.tray_button, alignment=Qt.AlignRight | Qt.AlignVCenter)
 
-        main_layout.addWidget(self.expandable_widget)
         main_layout.addWidget(self.bottom_bar_frame)
 
         self.setLayout(main_layout)
@@ -842,8 +3572,103 @@ class TimerApp(QWidget):
         # Let's keep it simple and check for 0 time in toggle_timer.
 
 
+    # --- Lazily built views ---
+    @property
+    def timer_display_widget(self):
+        """Countdown/stopwatch display (stacked view 1), built on first use."""
+        if self._timer_display_widget is None:
+            self.ensure_display_view()
+        return self._timer_display_widget
+
+    def ensure_display_view(self):
+        if self._timer_display_widget is not None:
+            return
+        display = TimerDisplayWidget(self)
+        display.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.MinimumExpanding)
+        display.double_clicked.connect(self.toggle_centisecond_mode)
+        display.set_alarm_info_visible(self.mode == TimerMode.COUNTDOWN)
+        self._timer_display_widget = display
+        self.stacked_widget.addWidget(display) # Index 1
+        self._scale_display_fonts()
+
+    def ensure_expandable_section(self):
+        """Builds the expandable section (laps, export) below the controls."""
+        if self.expandable_widget is not None:
+            return
+        self.expandable_widget = QWidget(self)
+        self.expandable_widget.setStyleSheet("background-color: #1C1C1E; border-radius: 8px;")
+        expandable_layout = QVBoxLayout(self.expandable_widget)
+        expandable_layout.setContentsMargins(15, 15, 15, 15)
+        self.placeholder_label = QLabel("Список будет здесь (пока пусто)")
+        self.placeholder_label.setStyleSheet("color: #8A8A8E; font-size: 14px; background: transparent;")
+        self.placeholder_label.setAlignment(Qt.AlignCenter)
+        expandable_layout.addWidget(self.placeholder_label)
+
+        # Stopwatch laps: O(1) statistics line + virtualized list (only visible rows are painted)
+        self.lap_stats_label = QLabel("")
+        self.lap_stats_label.setStyleSheet("color: #8A8A8E; font-size: 12px; background: transparent;")
+        self.lap_stats_label.setVisible(False)
+        expandable_layout.addWidget(self.lap_stats_label)
+        self.lap_list_view = QListView(self.expandable_widget)
+        self.lap_list_view.setModel(self.lap_model)
+        self.lap_list_view.setUniformItemSizes(True) # Row height is not measured per lap
+        self.lap_list_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.lap_list_view.setStyleSheet("QListView { color: white; background: transparent; border: none; font-size: 14px; }")
+        self.lap_list_view.setVisible(False)
+        expandable_layout.addWidget(self.lap_list_view, 1)
+
+        # Export of timer history and laps (written by a worker thread)
+        export_layout = QHBoxLayout()
+        export_layout.setContentsMargins(0, 0, 0, 0)
+        export_layout.setSpacing(8)
+        export_button_style = """
+            QPushButton { color: #CCCCCC; background-color: rgba(58, 58, 60, 0.6); border: none; border-radius: 6px; font-size: 12px; padding: 3px 8px; }
+            QPushButton:hover { color: white; }
+            QPushButton:disabled { color: #555555; }
+        """
+        self.export_csv_button = QPushButton("Export CSV")
+        self.export_csv_button.setStyleSheet(export_button_style)
+        self.export_csv_button.clicked.connect(lambda: self.export_history("csv"))
+        self.export_jsonl_button = QPushButton("Export JSONL")
+        self.export_jsonl_button.setStyleSheet(export_button_style)
+        self.export_jsonl_button.clicked.connect(lambda: self.export_history("jsonl"))
+        self.export_progress = QProgressBar()
+        self.export_progress.setTextVisible(False)
+        self.export_progress.setFixedHeight(6)
+        self.export_progress.setStyleSheet("""
+            QProgressBar { background-color: #3A3A3C; border: none; border-radius: 3px; }
+            QProgressBar::chunk { background-color: #FF9500; border-radius: 3px; }
+        """)
+        self.export_progress.setVisible(False)
+        export_layout.addWidget(self.export_csv_button)
+        export_layout.addWidget(self.export_jsonl_button)
+        export_layout.addWidget(self.export_progress, 1)
+        expandable_layout.addLayout(export_layout)
+        self.expandable_widget.setFixedHeight(self.expanded_section_height)
+        self.expandable_widget.setVisible(False)
+        if self.transparent_mode_enabled:
+            self.expandable_widget.setAttribute(Qt.WA_TransparentForMouseEvents)
+        layout = self.layout()
+        layout.insertWidget(layout.indexOf(self.bottom_bar_frame), self.expandable_widget)
+        self.update_lap_stats()
+
+    def build_deferred_views(self):
+        """Runs once the first frame is out: records time-to-first-frame, then builds the secondary views."""
+        self.time_to_first_frame_ms = (time.perf_counter() - self._construction_started) * 1000.0
+        debug_log(f"First frame after {self.time_to_first_frame_ms:.1f} ms.")
+        self.ensure_display_view()
+        self.ensure_expandable_section()
+
+
     def update_ui_state(self):
         """Updates widget visibility and button states based on current_state."""
+        if self.mode == TimerMode.STOPWATCH:
+            self.update_stopwatch_ui_state()
+            return
+        self.cancel_button.setText("Cancel")
+        if self._timer_display_widget is not None:
+            self._timer_display_widget.set_alarm_info_visible(True)
+
         if self.current_state == TimerState.IDLE:
             self.stacked_widget.setCurrentIndex(0) # Show picker
             self.cancel_button.setEnabled(False) # Cancel disabled in IDLE
@@ -861,7 +3686,7 @@ class TimerApp(QWidget):
             self.update() # Repaint to hide circle
 
         elif self.current_state == TimerState.RUNNING:
-            self.stacked_widget.setCurrentIndex(1) # Show timer display
+            self.stacked_widget.setCurrentWidget(self.timer_display_widget) # Show timer display
             self.cancel_button.setEnabled(True)
             self.start_pause_button.setEnabled(True)
             self.start_pause_button.setText("Pause")
@@ -872,17 +3697,24 @@ class TimerApp(QWidget):
             """)
             self.start_pause_button.setProperty("state", "pause") # Set custom state property
             self.style().polish(self.start_pause_button)
-            # Start animation timer (high frequency for smooth animation)
-            self.animation_timer.start(16) # ~60 FPS
-            # Start seconds timer for logic updates
-            self.seconds_timer.start(1000)
-            self.blink_timer.start(500) # Colon blinking
+            # Start seconds timer for logic updates and the precise wakeup at the deadline
+            self.arm_seconds_timer()
+            self.arm_deadline_timer()
+            if self.tray_mode:
+                self.update_tray_icon() # Hidden window: no ring frames, no blinking
+            else:
+                # Start ring animation ticks (high frequency for smooth animation)
+                AnimationDriver.instance().add_ticker(self.update_timer_animation)
+                if not self.centisecond_mode:
+                    self.start_colon_blink() # Colon blinking (not with moving centiseconds)
             self.colon_visible = True # Ensure colon is visible at start of RUNNING
-            self.progress = 1.0 # Initial progress is full
+            # Initial progress is full on start, and where we paused on resume
+            self.progress = self.remaining_seconds / self.total_seconds_at_start if self.total_seconds_at_start > 0 else 1.0
+            self._last_ring_sweep = None
             self.update() # Repaint to show circle
 
         elif self.current_state == TimerState.PAUSED:
-            self.stacked_widget.setCurrentIndex(1) # Show timer display
+            self.stacked_widget.setCurrentWidget(self.timer_display_widget) # Show timer display
             self.cancel_button.setEnabled(True)
             self.start_pause_button.setEnabled(True)
             self.start_pause_button.setText("Resume")
@@ -896,7 +3728,7 @@ class TimerApp(QWidget):
                  self.start_pause_button.setProperty("state", "pause")
                  self.style().polish(self.start_pause_button)
 
-            self.animation_timer.stop() # Stop animation timer
+            AnimationDriver.instance().remove_ticker(self.update_timer_animation) # Stop ring animation
             self.seconds_timer.stop() # Stop countdown logic
             self.blink_timer.stop() # Stop colon blinking
             self.colon_visible = True # Ensure colon is visible
@@ -904,27 +3736,26 @@ class TimerApp(QWidget):
             h = int(self.remaining_seconds) // 3600
             m = (int(self.remaining_seconds) % 3600) // 60
             s = int(self.remaining_seconds) % 60
-            # Use current time format (HH:MM:SS or MM:SS)
-            if self.total_seconds_at_start >= 3600:
+            # Use current time format (HH:MM:SS or MM:SS, with .cc in centisecond mode)
+            if self.centisecond_mode:
+                 time_str = self.format_centisecond_time(self.remaining_seconds)
+            elif self.total_seconds_at_start >= 3600:
                  time_str = f"{h:02}:{m:02}:{s:02}"
             else:
                  time_str = f"{m:02}:{s:02}"
 
             # Format alarm trigger time
-            alarm_trigger_time_str = ""
-            if self.end_datetime:
-                 # Format as h:mm AP/PM
-                 alarm_trigger_time_str = self.end_datetime.toString("h:mm AP").replace("AM", "am").replace("PM", "pm")
+            alarm_trigger_time_str = self.alarm_trigger_time_text()
 
             self.timer_display_widget.update_time_display(time_str, alarm_trigger_time_str)
             self.update() # Repaint to ensure circle state is fixed and colon is visible
 
 
         elif self.current_state == TimerState.FINISHED:
-            self.animation_timer.stop()
+            AnimationDriver.instance().remove_ticker(self.update_timer_animation)
             self.seconds_timer.stop()
             self.blink_timer.stop()
-            self.stacked_widget.setCurrentIndex(1) # Remain on display
+            self.stacked_widget.setCurrentWidget(self.timer_display_widget) # Remain on display
             # Display 00:00, clear alarm time
             self.timer_display_widget.update_time_display("00:00", "")
             # --- CHANGE: Enable Cancel button in FINISHED state ---
@@ -932,6 +3763,10 @@ class TimerApp(QWidget):
             # -----------------------------------------------------------
             self.start_pause_button.setEnabled(True) # Start button should be enabled to start a new timer
             self.start_pause_button.setText("Start") # Button becomes Start
+            if self.tray_mode:
+                # Bring the window back so the alarm can be cancelled
+                self.tray_icon.showMessage("Timer", "Time is up.", QSystemTrayIcon.Information, 5000)
+                self.exit_tray_mode()
             # Apply Start button style
             self.start_pause_button.setStyleSheet(self.styleSheet() + """
                 QPushButton { background-color: rgba(50, 205, 50, 0.3); } /* Green with transparency */
@@ -946,6 +3781,10 @@ class TimerApp(QWidget):
 
     def toggle_timer(self):
         """Handles Start, Pause, and Resume actions."""
+        if self.mode == TimerMode.STOPWATCH:
+            self.toggle_stopwatch()
+            return
+
         if self.current_state == TimerState.IDLE or self.current_state == TimerState.FINISHED:
             # --- CHANGE: Allow starting a new timer from FINISHED state ---
             # Get time from picker (or reset if starting from FINISHED)
@@ -956,6 +3795,7 @@ class TimerApp(QWidget):
                 # Stop alarm if it's still playing from the previous run
                 self.stop_alarm_sound() # Ensure sound stops if Start is pressed while alarm plays
 
+            self.schedule = None # A picker start is a plain single countdown
             selected_time = self.time_picker_widget.get_time()
             self.total_seconds_at_start = selected_time.hour() * 3600 + selected_time.minute() * 60 + selected_time.second()
 
@@ -966,106 +3806,313 @@ class TimerApp(QWidget):
                 return # Do not start if time is 0
 
             self.remaining_seconds = float(self.total_seconds_at_start) # Use float for smoother progress
-            self.start_datetime = QDateTime.currentDateTime()
-            self.end_datetime = self.start_datetime.addSecs(int(self.total_seconds_at_start))
+            self.history_started_at = datetime.datetime.now().isoformat(timespec="seconds")
+            self.deadline = deadline_clock() + self.remaining_seconds
+            self.update_end_datetime()
 
             self.current_state = TimerState.RUNNING
             self.update_ui_state() # Switch to RUNNING state UI
+            self.hooks.reset_intervals()
+            self.hooks.emit_event("start", **self.hook_info())
             # ---------------------------------------------------------------------
 
         elif self.current_state == TimerState.RUNNING:
-            # Pause
+            # Pause, keeping the exact remaining time rather than the last whole-second tick
+            self.remaining_seconds = self.remaining_now()
+            self._paused_at = deadline_clock()
+            self.deadline_timer.stop()
             self.current_state = TimerState.PAUSED
             self.update_ui_state() # Switch to PAUSED state UI
+            self.hooks.emit_event("pause", **self.hook_info())
 
         elif self.current_state == TimerState.PAUSED:
-            # Resume
-            # When resuming, need to calculate remaining time more accurately
-            # based on when it was paused. For simplicity, just restart from remaining_seconds.
-            # A more accurate resume would involve storing the pause time.
-            # Recalculate start_datetime to account for paused time
-            now = QDateTime.currentDateTime()
-            # The new start time should be 'now' minus the time that had already elapsed
-            # elapsed_seconds_before_pause = self.total_seconds_at_start - self.remaining_seconds
-            # self.start_datetime = now.addMSecs(-int(elapsed_seconds_before_pause * 1000))
-            # Simpler: Recalculate end_datetime based on remaining seconds from now
-            self.end_datetime = now.addSecs(int(round(self.remaining_seconds)))
-            # We need a reference point for elapsed time calculation in update_timer_logic.
-            # Let's adjust start_datetime so that the difference between now and start_datetime
-            # reflects the time *already* passed.
-            elapsed_seconds_so_far = self.total_seconds_at_start - self.remaining_seconds
-            self.start_datetime = now.addMSecs(-int(elapsed_seconds_so_far * 1000))
-
+            # Resume: the new deadline is exactly the remaining time from now
+            now = deadline_clock()
+            self.deadline = now + self.remaining_seconds
+            if self.schedule is not None:
+                # The rest of the program moves by exactly the time spent paused
+                self.schedule.shift(now - self._paused_at)
+                self.deadline = self.schedule.deadline(self.segment_index)
+            self.update_end_datetime()
 
             self.current_state = TimerState.RUNNING
             self.update_ui_state() # Switch to RUNNING state UI
+            self.hooks.emit_event("resume", **self.hook_info())
 
         self.update() # Ensure UI updates after state change
 
 
     def cancel_timer(self):
         """Cancels the timer and returns to the time picker state."""
-        self.animation_timer.stop()
+        if self.mode == TimerMode.STOPWATCH:
+            self.lap_or_reset_stopwatch()
+            return
+
+        AnimationDriver.instance().remove_ticker(self.update_timer_animation)
         self.seconds_timer.stop()
         self.blink_timer.stop()
+        self.deadline_timer.stop()
+        self.deadline = None
 
         # Stop sound if playing (important for cancelling from FINISHED state)
         self.stop_alarm_sound()
 
+        if self.current_state in (TimerState.RUNNING, TimerState.PAUSED):
+            self.record_timer_history("cancelled")
+
         # Reset time picker wheels to 00:00:00
         self.time_picker_widget.set_time(QTime(0, 0, 0))
 
+        self.schedule = None
         self.current_state = TimerState.IDLE
         self.update_ui_state()
 
+    # --- Timer Programs ---
+    def start_program(self, program):
+        """Runs a program's segments back to back from one start instant."""
+        if self.mode != TimerMode.COUNTDOWN:
+            return
+        if self.current_state != TimerState.IDLE:
+            self.cancel_timer()
+        now = deadline_clock()
+        self.schedule = program.compile(now)
+        if self.schedule.total <= 0:
+            self.schedule = None
+            return
+        self.history_started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.current_state = TimerState.RUNNING
+        self._enter_segment(self.schedule.segment_at(now), now)
+        self.update_ui_state()
+        self.update_timer_logic()
+        self.hooks.reset_intervals()
+        self.hooks.emit_event("start", program=program.name, **self.hook_info())
+
+    def _enter_segment(self, index, now):
+        """Points the countdown at segment index of the running schedule."""
+        schedule = self.schedule
+        self.segment_index = index
+        self.total_seconds_at_start = schedule.durations[index]
+        self.deadline = schedule.deadline(index)
+        self.remaining_seconds = max(0.0, self.deadline - now)
+        self.update_end_datetime()
+        self.progress = self.remaining_seconds / self.total_seconds_at_start if self.total_seconds_at_start > 0 else 0.0
+        self._last_ring_sweep = None
+        # One wakeup per boundary
+        self.arm_deadline_timer()
+        if self.tray_mode:
+            self._tray_step = None
+            self.update_tray_icon()
+
+    def on_segment_boundary(self):
+        """Switches to the segment due now (skipping any missed ones) or finishes the program."""
+        if self.schedule is None or self.current_state != TimerState.RUNNING:
+            return
+        now = deadline_clock()
+        index = self.schedule.segment_at(now)
+        if index == self.segment_index and now < self.schedule.deadline(index):
+            # Woke up a little early, wait for the real boundary
+            self.arm_deadline_timer()
+            return
+        if index >= len(self.schedule):
+            self.remaining_seconds = 0.0
+            self.record_timer_history("finished")
+            self.schedule = None
+            self.current_state = TimerState.FINISHED
+            self.update_ui_state()
+            return
+        self._enter_segment(index, now)
+        self.colon_visible = True
+        self.update_timer_logic() # New digits and label in this frame
+        self.update(self._ring_dirty_rect())
+
 
     def stop_alarm_sound(self):
         """Stops the alarm sound if it's playing."""
         if self.alarm_playing:
-            try:
-                if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()
-                    print("Alarm sound stopped.")
-            except pygame.error as e:
-                print(f"Pygame error stopping music: {e}")
-            finally:
-                self.alarm_playing = False # Ensure flag is reset
+            self.audio.stop() # Handled on the audio thread, never blocks here
+            self.alarm_playing = False
+
+
+    def _on_wall_alarm(self, alarm, scheduled):
+        """Rings for a wall-clock alarm until its notice is dismissed."""
+        print(f"Alarm '{alarm.label}' at {scheduled:%Y-%m-%d %H:%M}.")
+        self._ringing_alarms.append(f"{scheduled:%H:%M}  {alarm.label}")
+        if self._alarm_box is None:
+            self._alarm_box = QMessageBox(QMessageBox.Information, "Alarm", "", QMessageBox.Ok, self)
+            self._alarm_box.setModal(False) # Never blocks the timer
+            self._alarm_box.finished.connect(self._on_wall_alarm_dismissed)
+        self._alarm_box.setText("\n".join(self._ringing_alarms))
+        self._alarm_box.show()
+        if self.tray_mode and self.tray_icon is not None:
+            self.tray_icon.showMessage("Alarm", alarm.label)
+        self.play_alarm()
+
+    def _on_wall_alarm_dismissed(self):
+        self._ringing_alarms.clear()
+        if self.current_state != TimerState.FINISHED: # A finished countdown is silenced by its own Cancel
+            self.stop_alarm_sound()
+
+    def remaining_now(self):
+        """Remaining seconds right now, from the deadline while running."""
+        if self.current_state == TimerState.RUNNING and self.deadline is not None:
+            return max(0.0, self.deadline - deadline_clock())
+        return self.remaining_seconds
+
+    def running_elapsed(self):
+        """Running time since start, pauses excluded; keeps counting across program segments."""
+        elapsed = self.total_seconds_at_start - self.remaining_seconds
+        if self.schedule is not None:
+            elapsed += self.schedule.segment_start(self.segment_index) - self.schedule.start
+        return elapsed
+
+    def update_end_datetime(self):
+        """Maps the deadline to wall time for the "ends at" label (display only)."""
+        remaining = self.remaining_seconds
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - deadline_clock())
+        self.end_datetime = QDateTime.currentDateTime().addMSecs(int(round(remaining * 1000)))
+        self.clock_watch.reset()
+
+    def arm_deadline_timer(self):
+        """Schedules the single wakeup at the deadline, rounded up so it never fires early."""
+        if self.deadline is None:
+            return
+        self.deadline_timer.start(max(0, int(math.ceil((self.deadline - deadline_clock()) * 1000))))
+
+    def arm_seconds_timer(self):
+        """Wakes update_timer_logic just after the displayed (rounded up) second changes."""
+        if self.tray_mode and not self.hooks.every_hooks and not (
+                self.frame_server is not None and self.frame_server.has_consumers()):
+            self.seconds_timer.stop() # Nothing to show per second while hidden
+            return
+        remaining = self.remaining_now()
+        fraction_ms = int(math.ceil((remaining - math.floor(remaining)) * 1000))
+        self.seconds_timer.start((fraction_ms or 1000) + 1)
+
+    def on_deadline(self):
+        if self.current_state != TimerState.RUNNING:
+            return
+        if self.schedule is not None:
+            self.on_segment_boundary()
+        else:
+            self.update_timer_logic()
+
+    def check_clock_jumps(self):
+        """Reacts to wall clock steps (new "ends at" time) and suspend/resume (wakeups re-armed)."""
+        stepped, resumed = self.clock_watch.check()
+        if stepped or resumed:
+            self.update_end_datetime()
+            self.alarm_scheduler.reschedule() # Wall-clock alarms moved relative to the timers
+        if resumed:
+            # Qt timers do not count suspended time, the deadline clock does
+            debug_log("Resumed from suspend, re-arming timer deadlines.")
+            self.arm_deadline_timer()
+        return stepped or resumed
+
+    def format_centisecond_time(self, remaining):
+        """MM:SS.cc (HH:MM:SS.cc for timers of an hour or more), rounded up like the 1 Hz display."""
+        centis = int(math.ceil(remaining * 100))
+        h, rem = divmod(centis, 360000)
+        m, rem = divmod(rem, 6000)
+        s, cs = divmod(rem, 100)
+        if self.total_seconds_at_start >= 3600:
+            return f"{h:02}:{m:02}:{s:02}.{cs:02}"
+        return f"{m:02}:{s:02}.{cs:02}"
+
+    def toggle_centisecond_mode(self):
+        self.set_centisecond_mode(not self.centisecond_mode)
+
+    def start_colon_blink(self):
+        if self.colon_blinking:
+            self.blink_timer.start(500)
 
+    def set_colon_blinking(self, enabled):
+        """Turns colon blinking on or off; off means a steady colon and no 2 Hz wakeups."""
+        self.colon_blinking = enabled
+        if not enabled:
+            self.blink_timer.stop()
+            if not self.colon_visible:
+                self.colon_visible = True
+                if self.mode == TimerMode.COUNTDOWN and self.current_state == TimerState.RUNNING:
+                    self.update_timer_logic() # Redraw now, not at the next tick, or the colon stays hidden
+        elif (self.mode == TimerMode.COUNTDOWN and self.current_state == TimerState.RUNNING
+              and not self.centisecond_mode and not self.tray_mode):
+            self.start_colon_blink()
+
+    def set_centisecond_mode(self, enabled):
+        if self.mode != TimerMode.COUNTDOWN:
+            return
+        self.centisecond_mode = enabled
+        if self.current_state == TimerState.RUNNING:
+            self.colon_visible = True
+            if enabled:
+                self.blink_timer.stop()
+                self.update_timer_animation()
+            else:
+                self.start_colon_blink()
+                self.update_timer_logic()
+        elif self.current_state == TimerState.PAUSED:
+            self.update_ui_state() # Re-render the paused time in the new format
 
-    def update_timer_animation(self):
+    def update_timer_animation(self, dt_ms=None):
         """Updates the UI for smooth animation (called frequently)."""
-        # This is called ~60 times per second.
-        # We don't update the remaining seconds here, only trigger repaint for the circle.
-        # The actual time update is in update_timer_logic.
-        self.update() # Trigger paintEvent for smooth circle animation
+        # This is called ~60 times per second by the AnimationDriver.
+        # The ring is only repainted (and only its own area) when its quantized
+        # sweep angle changes; in centisecond mode the digits are refreshed too,
+        # and DigitLabel repaints just the cells that changed.
+        if self.current_state != TimerState.RUNNING or self.total_seconds_at_start <= 0:
+            return
+        remaining = self.remaining_now()
+        if remaining <= 0.0:
+            self.update_timer_logic() # Finish within one frame instead of waiting for the 1 Hz tick
+            return
+        self.progress = remaining / self.total_seconds_at_start
+        sweep = int(self.progress * self.RING_SWEEP_UNITS)
+        if sweep != self._last_ring_sweep:
+            self._last_ring_sweep = sweep
+            self.update(self._ring_dirty_rect())
+        if self.centisecond_mode:
+            self.timer_display_widget.update_time_display(self.format_centisecond_time(remaining),
+                                                          self.alarm_trigger_time_text())
+
+    def alarm_trigger_time_text(self):
+        if not self.end_datetime:
+            return ""
+        # Format as h:mm AP/PM
+        text = self.end_datetime.toString("h:mm AP").replace("AM", "am").replace("PM", "pm")
+        if self.schedule is not None:
+            # Program segment name and position, e.g. "Focus 3/9 · 1:41 pm"
+            label = self.schedule.labels[self.segment_index]
+            text = f"{label} {self.segment_index + 1}/{len(self.schedule)} · {text}"
+        return text
 
 
     def update_timer_logic(self):
         """Updates the timer countdown logic (called every second)."""
-        if self.start_datetime is None or self.current_state != TimerState.RUNNING:
+        if self.deadline is None or self.current_state != TimerState.RUNNING:
              # Only update logic if running and started correctly
              return
 
-        # Calculate elapsed time since start
-        # Use floating point elapsed seconds for smoother progress calculation
-        now = QDateTime.currentDateTime()
-        elapsed_msecs = self.start_datetime.msecsTo(now)
-        elapsed_seconds = elapsed_msecs / 1000.0
-
-        # Calculate remaining seconds based on elapsed time
-        self.remaining_seconds = max(0.0, float(self.total_seconds_at_start) - elapsed_seconds)
+        # Remaining time comes from the deadline only, wall clock changes cannot move it
+        self.check_clock_jumps()
+        self.remaining_seconds = self.remaining_now()
 
-        # --- More robust check using end_datetime ---
-        # remaining_msecs = now.msecsTo(self.end_datetime)
-        # self.remaining_seconds = max(0.0, remaining_msecs / 1000.0)
-        # --------------------------------------------
+        if self.remaining_seconds <= 0.001 and self.schedule is not None:
+            # Program segment ended: switch to the next one instead of finishing
+            self.on_segment_boundary()
+            return
 
         if self.remaining_seconds <= 0.001: # Use a small threshold for floating point comparison
             self.remaining_seconds = 0.0 # Ensure it's exactly zero at the end
+            self.record_timer_history("finished")
             self.current_state = TimerState.FINISHED
             self.update_ui_state()
             return
 
+        self.arm_seconds_timer()
+        if self.hooks.every_hooks:
+            self.hooks.tick(self.running_elapsed(), **self.hook_info())
+
         # Update displayed time string (HH:MM:SS or MM:SS)
         # Display time based on rounded remaining seconds for the label
         display_seconds = int(math.ceil(self.remaining_seconds)) # Use ceil to show 00:01 until it hits 0
@@ -1082,13 +4129,11 @@ class TimerApp(QWidget):
              time_str = f"{m:02}:{s:02}"
 
         # Format alarm trigger time
-        alarm_trigger_time_str = ""
-        if self.end_datetime:
-             # Format as h:mm AP/PM
-             alarm_trigger_time_str = self.end_datetime.toString("h:mm AP").replace("AM", "am").replace("PM", "pm")
+        alarm_trigger_time_str = self.alarm_trigger_time_text()
 
         # Update the display label, respecting colon blinking (only in RUNNING state)
-        if self.current_state == TimerState.RUNNING:
+        # In centisecond mode the per-frame ticker owns the label
+        if self.current_state == TimerState.RUNNING and not self.centisecond_mode:
              if self.colon_visible:
                  self.timer_display_widget.update_time_display(time_str, alarm_trigger_time_str)
              else:
@@ -1110,8 +4155,8 @@ class TimerApp(QWidget):
             self.progress = 0.0
 
         # Trigger repaint for circle animation (also called by update_timer_animation)
-        # Calling here ensures circle updates even if animation_timer isn't running (e.g., debugging)
-        self.update()
+        # Calling here ensures circle updates even if the ring ticker isn't running (e.g., debugging)
+        self.update(self._ring_dirty_rect())
 
 
     def blink_colon(self):
@@ -1126,75 +4171,436 @@ class TimerApp(QWidget):
         #          self.update_timer_logic() # Force update to show colon
 
 
+    # --- Stopwatch Mode ---
+    def toggle_mode(self):
+        """Switches between countdown and stopwatch. Only allowed while nothing is running."""
+        idle = self.current_state == TimerState.IDLE if self.mode == TimerMode.COUNTDOWN \
+            else not self.stopwatch.running and self.stopwatch.elapsed() == 0.0
+        if not idle:
+            self.mode_button.setChecked(self.mode == TimerMode.STOPWATCH) # Revert the click
+            return
+        self.mode = TimerMode.STOPWATCH if self.mode_button.isChecked() else TimerMode.COUNTDOWN
+        self.current_state = TimerState.IDLE
+        self.update_ui_state()
+
+    def update_stopwatch_ui_state(self):
+        """Stopwatch counterpart of update_ui_state: Lap/Reset on the left, Start/Stop on the right."""
+        self.stacked_widget.setCurrentWidget(self.timer_display_widget) # Stopwatch always shows the display view
+        self.timer_display_widget.set_alarm_info_visible(False)
+        self.seconds_timer.stop()
+        self.blink_timer.stop()
+        self.colon_visible = True
+        driver = AnimationDriver.instance()
+        driver.remove_ticker(self.update_timer_animation) # No progress ring in stopwatch mode
+
+        if self.current_state == TimerState.RUNNING:
+            self.cancel_button.setText("Lap")
+            self.cancel_button.setEnabled(True)
+            self.start_pause_button.setText("Stop")
+            self.start_pause_button.setStyleSheet(self.styleSheet() + """
+                QPushButton { background-color: rgba(255, 69, 58, 0.3); } /* Red with transparency */
+                QPushButton:pressed { background-color: rgba(224, 56, 46, 0.3); }
+            """)
+            if not self.tray_mode:
+                driver.add_ticker(self.update_stopwatch_display)
+        else:
+            # IDLE (reset) or PAUSED (stopped with time on the clock)
+            self.cancel_button.setText("Reset" if self.current_state == TimerState.PAUSED else "Lap")
+            self.cancel_button.setEnabled(self.current_state == TimerState.PAUSED)
+            self.start_pause_button.setText("Start")
+            self.start_pause_button.setStyleSheet(self.styleSheet() + """
+                QPushButton { background-color: rgba(50, 205, 50, 0.3); } /* Green with transparency */
+                QPushButton:pressed { background-color: rgba(40, 164, 40, 0.3); }
+            """)
+            driver.remove_ticker(self.update_stopwatch_display)
+        self.start_pause_button.setEnabled(True)
+        self.start_pause_button.setProperty("state", "")
+        self.style().polish(self.start_pause_button)
+        self.update_stopwatch_display()
+        self.update_lap_stats()
+        self.update()
+
+    def toggle_stopwatch(self):
+        if self.stopwatch.running:
+            self.stopwatch.pause()
+            self.current_state = TimerState.PAUSED
+        else:
+            self.stopwatch.start()
+            self.current_state = TimerState.RUNNING
+        self.update_stopwatch_ui_state()
+
+    def lap_or_reset_stopwatch(self):
+        if self.stopwatch.running:
+            laps = self.stopwatch.laps
+            previous_min, previous_max = laps.min_index, laps.max_index
+            self.stopwatch.lap()
+            self.lap_model.lap_added(previous_min, previous_max)
+            self.update_lap_stats()
+        else:
+            self.lap_model.beginResetModel()
+            self.stopwatch.reset()
+            self.lap_model.endResetModel()
+            self.current_state = TimerState.IDLE
+            self.update_stopwatch_ui_state()
+
+    def update_stopwatch_display(self, dt_ms=None):
+        """Ticker for the running stopwatch; sets the label only when the text changes."""
+        time_str = format_stopwatch_time(self.stopwatch.elapsed())
+        if time_str != self.timer_display_widget.time_label.text():
+            self.timer_display_widget.update_time_display(time_str, "")
+
+    def update_lap_stats(self):
+        if self.expandable_widget is None:
+            return # Refreshed when the section is built
+        laps = self.stopwatch.laps
+        has_laps = self.mode == TimerMode.STOPWATCH and len(laps) > 0
+        self.placeholder_label.setVisible(not has_laps)
+        self.lap_stats_label.setVisible(has_laps)
+        self.lap_list_view.setVisible(has_laps)
+        if has_laps:
+            self.lap_stats_label.setText(
+                f"{len(laps)} laps   best {format_stopwatch_time(laps.min)}   "
+                f"worst {format_stopwatch_time(laps.max)}   "
+                f"avg {format_stopwatch_time(laps.mean)}   σ {laps.stdev:.2f}s")
+
+
+    # --- Tray Mode ---
+    def start_frame_server(self, http_port=None, unix_path=None, size=FRAME_SERVER_SIZE, fps=FRAME_SERVER_FPS):
+        """Serves the display as MJPEG over HTTP and/or raw frames over a Unix socket (loopback only)."""
+        if self.frame_server is None:
+            self.frame_server = FrameServer(self, size, fps)
+        if http_port is not None:
+            port = self.frame_server.listen_http(http_port)
+            print(f"Overlay MJPEG stream: http://127.0.0.1:{port}/")
+        if unix_path:
+            print(f"Overlay raw frames: {self.frame_server.listen_unix(unix_path)}")
+        return self.frame_server
+
+    def toggle_profiler(self, rate_hz=None):
+        """Starts sampling the GUI thread, or stops and writes the collapsed stacks."""
+        if self.profiler is not None and self.profiler.is_running():
+            self.profiler.stop()
+            path = self.profile_path or datetime.datetime.now().strftime("flip_timer-%Y%m%d-%H%M%S.folded")
+            try:
+                self.profiler.write_collapsed(path)
+            except OSError as e:
+                print(f"Error writing profile to '{path}': {e}")
+                return
+            top = ", ".join(f"{name} {count}" for name, count in self.profiler.event_totals()[:5])
+            print(f"Profile: {self.profiler.sample_count} samples written to '{path}' ({top}).")
+            self.profiler = None
+            return
+        self.profiler = SamplingProfiler(rate_hz or PROFILER_DEFAULT_HZ, self)
+        self.profiler.start()
+        print(f"Profiling the GUI thread at {self.profiler.rate_hz} Hz, {PROFILER_CHORD} stops.")
+
+    def ensure_tray_icon(self):
+        if self.tray_icon is not None:
+            return self.tray_icon
+        self.tray_icon = QSystemTrayIcon(tray_ring_icon(TRAY_ICON_STEPS), self)
+        menu = QMenu(self)
+        menu.addAction("Show", self.exit_tray_mode)
+        self.tray_pause_action = menu.addAction("Pause", self.toggle_timer)
+        menu.addAction("Cancel", self.cancel_timer)
+        menu.addSeparator()
+        menu.addAction("Quit", self.close)
+        menu.aboutToShow.connect(self._update_tray_menu)
+        self.tray_icon.setContextMenu(menu)
+        self.tray_icon.activated.connect(self._on_tray_activated)
+        return self.tray_icon
+
+    def _update_tray_menu(self):
+        self.tray_pause_action.setText("Resume" if self.current_state == TimerState.PAUSED else
+                                       "Start" if self.current_state in (TimerState.IDLE, TimerState.FINISHED) else "Pause")
+
+    def _on_tray_activated(self, reason):
+        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.exit_tray_mode()
+
+    def enter_tray_mode(self):
+        """Hides the window into the tray; rendering stops, the timer itself keeps running."""
+        if self.tray_mode:
+            return
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            print("System tray is not available.")
+            return
+        self.tray_mode = True
+        self.ensure_tray_icon().show()
+        self.hide()
+        AnimationDriver.instance().remove_ticker(self.update_timer_animation)
+        AnimationDriver.instance().remove_ticker(self.update_stopwatch_display)
+        self.blink_timer.stop()
+        self.arm_seconds_timer()
+        self.tray_clock_timer.start(TRAY_CLOCK_CHECK_MS)
+        self._tray_step = None
+        self.update_tray_icon()
+
+    def exit_tray_mode(self):
+        """Shows the window again from the live timer state."""
+        if not self.tray_mode:
+            return
+        self.tray_mode = False
+        self.tray_step_timer.stop()
+        self.tray_clock_timer.stop()
+        self.tray_icon.hide()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.update_ui_state() # Re-arms ring frames, blinking and the per-second logic
+        if self.mode == TimerMode.COUNTDOWN and self.current_state == TimerState.RUNNING:
+            self.update_timer_logic() # Fresh digits in the first frame
+
+    def update_tray_icon(self):
+        """Sets the ring icon for the current quantized progress and waits for the next step."""
+        if not self.tray_mode:
+            return
+        if self.check_clock_jumps(): # Re-arms the deadline after a suspend; nothing else ticks in the tray
+            self._tray_step = None # Tooltip carries the new "ends at" time
+        running = self.mode == TimerMode.COUNTDOWN and self.current_state == TimerState.RUNNING
+        if self.mode == TimerMode.COUNTDOWN and self.current_state in (TimerState.RUNNING, TimerState.PAUSED) \
+                and self.total_seconds_at_start > 0:
+            remaining = self.remaining_now()
+            step = min(TRAY_ICON_STEPS, int(math.ceil(remaining / self.total_seconds_at_start * TRAY_ICON_STEPS)))
+        else:
+            remaining, step = 0.0, TRAY_ICON_STEPS
+        if step != self._tray_step:
+            self._tray_step = step
+            self.tray_icon.setIcon(tray_ring_icon(step))
+            ends = self.alarm_trigger_time_text()
+            self.tray_icon.setToolTip(f"Ends at {ends}" if running and ends else "Timer")
+        if running and step > 0:
+            # Next change is when remaining drops to (step - 1) / steps of the total
+            next_remaining = (step - 1) / TRAY_ICON_STEPS * self.total_seconds_at_start
+            self.tray_step_timer.start(max(1, int(math.ceil((remaining - next_remaining) * 1000)) + 1))
+        else:
+            self.tray_step_timer.stop()
+
+    # --- Dashboard ---
+    def ensure_dashboard(self):
+        if self.dashboard is None:
+            self.dashboard = TimerDashboard()
+        return self.dashboard
+
+    def add_to_dashboard(self):
+        selected_time = self.time_picker_widget.get_time()
+        total_seconds = selected_time.hour() * 3600 + selected_time.minute() * 60 + selected_time.second()
+        if total_seconds <= 0:
+            return
+        dashboard = self.ensure_dashboard()
+        dashboard.add_timer(f"Timer {len(dashboard.timers) + 1}", total_seconds)
+        dashboard.show()
+        dashboard.raise_()
+
+    def load_timers(self, path):
+        """Creates and starts one dashboard timer per row of a JSONL file ("-" reads stdin).
+
+        Rows are parsed and validated first, then inserted with a single
+        add_timers call; bad rows are summarized on the console.
+        """
+        source = "stdin" if path == "-" else f"'{path}'"
+        dashboard = self.ensure_dashboard()
+        try:
+            if path == "-":
+                specs, errors = read_timer_specs(sys.stdin, len(dashboard.timers) + 1)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    specs, errors = read_timer_specs(f, len(dashboard.timers) + 1)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error loading timers from {source}: {e}")
+            return 0
+        added = dashboard.add_timers(specs) if specs else 0
+        print(f"Loaded {added} timers from {source}, {len(errors)} bad rows.")
+        for number, message in errors[:LOAD_ERROR_REPORT]:
+            print(f"  line {number}: {message}")
+        if len(errors) > LOAD_ERROR_REPORT:
+            print(f"  ... and {len(errors) - LOAD_ERROR_REPORT} more")
+        if added:
+            dashboard.show()
+        return added
+
+
+    # --- History and Export ---
+    def record_timer_history(self, outcome):
+        elapsed = self.total_seconds_at_start - self.remaining_seconds
+        self.timer_history.append((self.history_started_at or "", self.total_seconds_at_start, elapsed, outcome))
+        self.hooks.emit_event("finish" if outcome == "finished" else "cancel", **self.hook_info())
+
+    # --- Plugin Hooks ---
+    def hook_info(self):
+        """Event payload handed to hooks (JSON-serializable)."""
+        info = {
+            "remaining": round(self.remaining_now(), 3),
+            "total": self.total_seconds_at_start,
+            "ends_at": self.end_datetime.toString(Qt.ISODate) if self.end_datetime else None,
+        }
+        if self.schedule is not None:
+            info["segment"] = self.schedule.labels[self.segment_index]
+        return info
+
+    def _on_hook_finished(self, name, event, ok, message):
+        if not ok:
+            print(f"Hook '{name}' ({event}) failed: {message}")
+
+    def export_history(self, fmt):
+        """Streams timer history and laps to a CSV or JSON Lines file in a worker thread."""
+        if self._export_thread is not None:
+            return # One export at a time
+        suffix = "csv" if fmt == "csv" else "jsonl"
+        path, _ = QFileDialog.getSaveFileName(self, "Export", f"timer_history.{suffix}",
+                                              f"{suffix.upper()} files (*.{suffix})")
+        if not path:
+            return
+        self.start_export(path, fmt)
+
+    def start_export(self, path, fmt):
+        # Snapshot the inputs (flat copies, 16 bytes per lap) so the worker never
+        # races with new laps or a reset on the GUI thread
+        laps = self.stopwatch.laps
+        history = list(self.timer_history)
+        durations = array('d', laps.durations)
+        splits = array('d', laps.splits)
+        total_rows = len(history) + len(durations)
+
+        self._export_thread = QThread(self)
+        self._export_worker = ExportWorker(path, fmt, iter_export_rows(history, durations, splits), total_rows)
+        self._export_worker.moveToThread(self._export_thread)
+        self._export_thread.started.connect(self._export_worker.run)
+        self._export_worker.progress.connect(self._on_export_progress)
+        self._export_worker.finished.connect(self._on_export_finished)
+        self._export_worker.failed.connect(self._on_export_failed)
+
+        self.export_csv_button.setEnabled(False)
+        self.export_jsonl_button.setEnabled(False)
+        self.export_progress.setRange(0, max(1, total_rows))
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self._export_thread.start()
+
+    def _on_export_progress(self, written, total):
+        self.export_progress.setValue(written)
+
+    def _on_export_finished(self, path):
+        print(f"Exported history to '{path}'.")
+        self._finish_export()
+
+    def _on_export_failed(self, message):
+        print(message)
+        self._finish_export()
+
+    def _finish_export(self):
+        # The one place the export UI is reset, for success, failure and cancel alike
+        self._export_thread.quit()
+        self._export_thread.wait()
+        self._export_worker.deleteLater()
+        self._export_thread.deleteLater()
+        self._export_thread = None
+        self._export_worker = None
+        self.export_progress.setVisible(False)
+        self.export_csv_button.setEnabled(True)
+        self.export_jsonl_button.setEnabled(True)
+
+    def closeEvent(self, event):
+        # Don't leave a writer thread running behind a destroyed window
+        if self._export_thread is not None:
+            self._export_worker.cancel()
+            self._export_thread.quit()
+            self._export_thread.wait()
+        if self.dashboard is not None:
+            self.dashboard.close()
+        self.hooks.shutdown()
+        if self.profiler is not None and self.profiler.is_running():
+            self.toggle_profiler() # Writes the samples collected so far
+        if self.frame_server is not None:
+            self.frame_server.shutdown()
+        self.stop_audio()
+        if self.tray_icon is not None:
+            self.tray_icon.hide()
+        # The driver outlives the window; don't leave it ticking our callbacks
+        driver = AnimationDriver.instance()
+        driver.remove_ticker(self.update_timer_animation)
+        driver.remove_ticker(self.update_stopwatch_display)
+        for wheel in self.time_picker_widget.findChildren(PickerWheel):
+            driver.remove_ticker(wheel._apply_inertia)
+        super().closeEvent(event)
+
+
+    def showEvent(self, event):
+        # Cached pixmaps follow the screen (pixel ratio) this window is on
+        RenderCache.instance().watch(self)
+        super().showEvent(event)
+
     # --- Painting Logic ---
+    RING_LINE_THICKNESS = 8 # Pen width of the progress ring
+    RING_SWEEP_UNITS = RING_SWEEP_UNITS
+
+    def _progress_circle_rect(self):
+        """Rectangle of the progress ring (already inset by half the pen width)."""
+        # Calculate the bounding rectangle for the circle centered within the stacked widget
+        stacked_widget_rect = self.stacked_widget.geometry()
+        available_size = min(stacked_widget_rect.width(), stacked_widget_rect.height())
+
+        # Calculate circle diameter relative to the available space, ensuring padding
+        # Adjusted padding factor as needed for visual balance at min size
+        padding_factor = 0.1 # 10% of available size for padding
+        circle_diameter = available_size * (1.0 - padding_factor)
+        # Ensure minimum diameter to prevent circle from disappearing or being too small
+        # Adjusted minimum diameter based on visual testing
+        min_circle_diameter = 150 # Increased minimum diameter
+        circle_diameter = max(min_circle_diameter, circle_diameter)
+
+        # Calculate the top-left corner of the circle rectangle
+        # Center the circle within the stacked widget's geometry
+        circle_x = stacked_widget_rect.center().x() - circle_diameter / 2
+        circle_y = stacked_widget_rect.center().y() - circle_diameter / 2
+
+        circle_rect = QRectF(circle_x, circle_y, circle_diameter, circle_diameter)
+
+        # Adjust the rectangle inwards by half the line thickness for drawing
+        half = self.RING_LINE_THICKNESS / 2
+        circle_rect.adjust(half, half, -half, -half)
+        return circle_rect
+
+    def _ring_dirty_rect(self):
+        """Window area touched by the ring, including the pen and round caps."""
+        pad = self.RING_LINE_THICKNESS
+        return self._progress_circle_rect().adjusted(-pad, -pad, pad, pad).toAlignedRect()
+
     def paintEvent(self, event):
+        if self.time_to_first_frame_ms is None and not self._first_frame_scheduled:
+            # Runs after this paint is flushed, the first frame is not delayed by it
+            self._first_frame_scheduled = True
+            QTimer.singleShot(0, self.build_deferred_views)
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
 
         # Draw the black background with rounded corners
-        path = QPainterPath()
-        rect = QRectF(self.rect())
-        path.addRoundedRect(rect, self.corner_radius, self.corner_radius)
-        painter.fillPath(path, QColor("black"))
+        if self.opaque_window:
+            painter.fillRect(event.rect(), QColor("black")) # The window mask cuts the corners
+        else:
+            path = QPainterPath()
+            rect = QRectF(self.rect())
+            path.addRoundedRect(rect, self.corner_radius, self.corner_radius)
+            painter.fillPath(path, QColor("black"))
 
         # --- Draw Circular Progress Indicator ---
         # Draw only if in RUNNING or PAUSED state and total time was set
-        if self.current_state in [TimerState.RUNNING, TimerState.PAUSED] and self.total_seconds_at_start > 0:
+        if self.mode == TimerMode.COUNTDOWN and self.current_state in [TimerState.RUNNING, TimerState.PAUSED] and self.total_seconds_at_start > 0:
             # The circle should be centered within the stacked widget
             if not self.stacked_widget:
                 print("Warning: Stacked widget not found for drawing circle.")
                 return
 
             try:
-                # Calculate the bounding rectangle for the circle centered within the stacked widget
-                stacked_widget_rect = self.stacked_widget.geometry()
-                available_size = min(stacked_widget_rect.width(), stacked_widget_rect.height())
-
-                # Calculate circle diameter relative to the available space, ensuring padding
-                # Adjusted padding factor as needed for visual balance at min size
-                padding_factor = 0.1 # 10% of available size for padding
-                circle_diameter = available_size * (1.0 - padding_factor)
-                # Ensure minimum diameter to prevent circle from disappearing or being too small
-                # Adjusted minimum diameter based on visual testing
-                min_circle_diameter = 150 # Increased minimum diameter
-                circle_diameter = max(min_circle_diameter, circle_diameter)
-
-
-                # Calculate the top-left corner of the circle rectangle
-                # Center the circle within the stacked widget's geometry
-                circle_x = stacked_widget_rect.center().x() - circle_diameter / 2
-                circle_y = stacked_widget_rect.center().y() - circle_diameter / 2
-
-                circle_rect = QRectF(circle_x, circle_y, circle_diameter, circle_diameter)
-
-                # Adjust the rectangle inwards by half the line thickness for drawing
-                line_thickness = 8 # Ensure this matches the pen width
-                circle_rect.adjust(line_thickness / 2, line_thickness / 2, -line_thickness / 2, -line_thickness / 2)
+                circle_rect = self._progress_circle_rect()
+                line_thickness = self.RING_LINE_THICKNESS
 
                 # Ensure circle_rect is valid and within reasonable bounds
                 if circle_rect.width() <= 0 or circle_rect.height() <= 0 or circle_rect.width() > self.width() * 2:
                      print("Warning: Invalid circle rectangle dimensions.")
                      return
 
-                # Set pen for drawing
-                pen = QPen(QColor("#FF9500")) # Bright orange
-                pen.setWidth(line_thickness)
-                pen.setCapStyle(Qt.RoundCap) # Rounded ends
-
-                painter.setPen(pen)
-                painter.setBrush(Qt.NoBrush)
-
-                # Draw the progress arc
-                # Angle starts at 90 degrees (top) and goes counter-clockwise.
-                # Full circle is 360 * 16 units for QPainter.
-                # Remaining angle = progress * 360 degrees.
-                # Starting from the top (90 degrees), we draw an arc of `progress * 360` degrees
-                # in the *counter-clockwise* direction (positive angle) to show the remaining part.
-                start_angle = 90 * 16 # Top of the circle
-                # Sweep angle is proportional to REMAINING time, drawn counter-clockwise (positive)
-                sweep_angle = int(self.progress * 360 * 16)
-
-                painter.drawArc(circle_rect, start_angle, sweep_angle)
+                # Draw the progress arc (shared with the dashboard cells)
+                draw_progress_ring(painter, circle_rect, self.progress, line_thickness)
 
 
                 # (Optional) Draw a faint grey circle behind to show the full circle track
@@ -1210,7 +4616,17 @@ class TimerApp(QWidget):
 
 
     # --- Resize Logic ---
+    def update_window_mask(self):
+        """Rounded window shape for the opaque mode, rebuilt only when the size changes."""
+        if not self.opaque_window or self.size() == self._mask_size:
+            return
+        self._mask_size = self.size()
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(self.rect()), self.corner_radius, self.corner_radius)
+        self.setMask(QRegion(path.toFillPolygon().toPolygon()))
+
     def resizeEvent(self, event):
+        self.update_window_mask()
         # Переопределяем resizeEvent для принудительного пропорционального масштабирования
         new_size = event.size()
         current_size = self.size()
@@ -1300,32 +4716,31 @@ class TimerApp(QWidget):
 
              except AttributeError: pass
 
-        # Scale time display font
-        if self.timer_display_widget: # Check if widget exists
-             try:
-                 # Scale font size based on the same scale factor
-                 # Adjust multiplier (1.5) as needed for visual balance relative to circle size
-                 new_time_font_size = int(self.initial_display_time_font_size * scale_factor * 1.5)
-                 # Уменьшаем минимальный размер шрифта цифр (был 30) и корректируем базовый множитель
-                 new_time_font_size = max(30, new_time_font_size) # Ensure a reasonable minimum size
-                 self.timer_display_widget.set_time_font_size(new_time_font_size) # <--- Здесь устанавливается новый размер
-             except (AttributeError, ZeroDivisionError) as e:
-                 print(f"Error scaling timer font size: {e}")
-                 pass # Catch if set_time_font_size doesn't exist or calculation is invalid
-
-          # Scale alarm info font
-        if self.timer_display_widget: # Check if widget exists
-             try:
-                 new_alarm_info_font_size = int(self.initial_alarm_info_font_size * scale_factor)
-                 new_alarm_info_font_size = max(8, new_alarm_info_font_size) # Min size 8
-                 self.timer_display_widget.set_alarm_info_font_size(new_alarm_info_font_size)
-             except AttributeError: pass # Catch if set_alarm_info_font_size doesn't exist or widget is None
-
+        # Scale time display and alarm info fonts (applied on creation if the display is not built yet)
+        self._display_scale_factor = scale_factor
+        self._scale_display_fonts()
 
         # Вызываем paintEvent для перерисовки фона и круга с учетом нового размера
         self.update()
 
 
+    def _scale_display_fonts(self):
+        if self._timer_display_widget is None or self._display_scale_factor is None:
+            return
+        scale_factor = self._display_scale_factor
+        # Scale time display font
+        # Adjust multiplier (1.5) as needed for visual balance relative to circle size
+        new_time_font_size = int(self.initial_display_time_font_size * scale_factor * 1.5)
+        # Уменьшаем минимальный размер шрифта цифр (был 30) и корректируем базовый множитель
+        new_time_font_size = max(30, new_time_font_size) # Ensure a reasonable minimum size
+        self._timer_display_widget.set_time_font_size(new_time_font_size)
+
+        # Scale alarm info font
+        new_alarm_info_font_size = int(self.initial_alarm_info_font_size * scale_factor)
+        new_alarm_info_font_size = max(8, new_alarm_info_font_size) # Min size 8
+        self._timer_display_widget.set_alarm_info_font_size(new_alarm_info_font_size)
+
+
     # --- Window Dragging Logic (now handled by CustomTitleBar) ---
     # Removing these methods as dragging is handled by the title bar
     # def mousePressEvent(self, event): pass
@@ -1353,6 +4768,7 @@ class TimerApp(QWidget):
             self.expanded = True
             self.toggle_button.setText("v")
             self.toggle_button.setChecked(True)
+            self.ensure_expandable_section()
             # При показе секции, увеличиваем общую высоту окна на высоту секции
             new_height = current_height + self.expanded_section_height
             self.resize(current_width, new_height)
@@ -1366,49 +4782,61 @@ class TimerApp(QWidget):
         self.update()
 
 
-    # --- Alarm Sound Logic (keep as is) ---
+    # --- Alarm Sound Logic ---
+    def start_audio(self):
+        """Attaches to the shared audio thread; it opens the mixer and preloads the alarm in the background."""
+        resources = ResourcePack.instance()
+        self.audio = AudioWorker.instance()
+        self.audio.state_changed.connect(self._on_audio_state)
+        self.alarm_sound = ALARM_RESOURCE if ALARM_RESOURCE in resources else None
+        if self.alarm_sound is None:
+            debug_log(f"Note: {ALARM_RESOURCE} not found, using the built-in tone.")
+        self.alarm_tone = DEFAULT_ALARM_TONE if np is not None else None # Used without alarm.wav
+        self.audio.init_mixer(AUDIO_PROFILES[self.audio_profile])
+        self._preload_alarm()
+        self.audio.attach()
+        self._audio_attached = True
+
+    def _preload_alarm(self):
+        if self.alarm_sound:
+            self.audio.preload(self.alarm_sound)
+        elif self.alarm_tone:
+            self.audio.preload_tone(self.alarm_tone)
+
+    def set_audio_profile(self, name):
+        """Re-opens the mixer with another profile (on the audio thread); a playing alarm restarts."""
+        if name == self.audio_profile or name not in AUDIO_PROFILES:
+            return
+        self.audio_profile = name
+        self.audio.init_mixer(AUDIO_PROFILES[name])
+        self._preload_alarm()
+        if self.alarm_playing:
+            self.alarm_playing = False
+            self.play_alarm()
+
+    def stop_audio(self):
+        if not self._audio_attached:
+            return # Closed twice
+        self._audio_attached = False
+        self.stop_alarm_sound()
+        self.audio.state_changed.disconnect(self._on_audio_state)
+        self.audio.detach()
+
+    def _on_audio_state(self, state):
+        if state == "unavailable":
+            self.alarm_playing = False # No device, allow a retry on the next alarm
+
     def play_alarm(self):
-        if self.alarm_playing: return
-        try:
-            if not pygame.mixer.get_init():
-                 print("Initializing pygame mixer...")
-                 try: pygame.mixer.pre_init(44100, -16, 2, 2048); pygame.mixer.init()
-                 except pygame.error as init_err: print(f"Failed to initialize pygame mixer: {init_err}"); return
-
-            # Determine the directory of the script or the executable
-            if getattr(sys, 'frozen', False):
-                 # If running as a bundled executable (e.g., PyInstaller)
-                 script_dir = sys._MEIPASS
-            else:
-                 # If running as a normal script
-                 script_dir = os.path.dirname(os.path.abspath(__file__))
-
-            sound_path = os.path.join(script_dir, "alarm.wav") # <--- Font file relative to script/exe
-
-            if not os.path.exists(sound_path):
-                 # Fallback to checking current working directory
-                 sound_path_cwd = os.path.join(os.getcwd(), "alarm.wav")
-                 if os.path.exists(sound_path_cwd):
-                      sound_path = sound_path_cwd
-                 else:
-                      print(f"Error: alarm.wav not found in '{script_dir}' or '{os.getcwd()}'")
-                      self.alarm_playing = False
-                      return
-
-            print(f"Loading sound: {sound_path}")
-            pygame.mixer.music.load(sound_path)
-            print("Playing sound...")
-            pygame.mixer.music.play(loops=-1) # Play indefinitely until stopped
-            self.alarm_playing = True
-            # No need for QTimer.singleShot, alarm plays until stopped by Cancel
-            # QTimer.singleShot(2000, self.reset_alarm_flag) # Removed this line
-        except pygame.error as e: print(f"Pygame error playing sound: {e}"); self.alarm_playing = False
-        except Exception as e: print(f"Unexpected error playing sound: {e}"); self.alarm_playing = False
-
-    # This function might not be needed anymore if alarm_playing is reset in stop_alarm_sound
-    # def reset_alarm_flag(self):
-    #     """Resets the alarm playing flag."""
-    #     self.alarm_playing = False
+        if self.alarm_playing:
+            return
+        # Plays until stopped by Cancel; the built-in tone stands in for a missing alarm.wav
+        if self.alarm_sound:
+            self.audio.play(self.alarm_sound)
+        elif self.alarm_tone:
+            self.audio.play_tone(self.alarm_tone)
+        else:
+            return
+        self.alarm_playing = True
 
     # --- Transparency and Click-through Logic ---
     def toggle_transparent_mode(self, checked):
@@ -1422,7 +4850,8 @@ class TimerApp(QWidget):
             self.stacked_widget.setAttribute(Qt.WA_TransparentForMouseEvents)
             self.cancel_button.setAttribute(Qt.WA_TransparentForMouseEvents)
             self.start_pause_button.setAttribute(Qt.WA_TransparentForMouseEvents)
-            self.expandable_widget.setAttribute(Qt.WA_TransparentForMouseEvents)
+            if self.expandable_widget is not None:
+                self.expandable_widget.setAttribute(Qt.WA_TransparentForMouseEvents)
             self.bottom_bar_frame.setAttribute(Qt.WA_TransparentForMouseEvents)
         else:
             # Выключаем прозрачность и восстанавливаем кликабельность
@@ -1432,7 +4861,8 @@ class TimerApp(QWidget):
             self.stacked_widget.setAttribute(Qt.WA_TransparentForMouseEvents, False)
             self.cancel_button.setAttribute(Qt.WA_TransparentForMouseEvents, False)
             self.start_pause_button.setAttribute(Qt.WA_TransparentForMouseEvents, False)
-            self.expandable_widget.setAttribute(Qt.WA_TransparentForMouseEvents, False)
+            if self.expandable_widget is not None:
+                self.expandable_widget.setAttribute(Qt.WA_TransparentForMouseEvents, False)
             self.bottom_bar_frame.setAttribute(Qt.WA_TransparentForMouseEvents, False)
         self.update()  # Перерисовываем окно для применения изменений
 
@@ -1487,83 +4917,84 @@ class TimerApp(QWidget):
 
 # --- Application Entry Point ---
 if __name__ == "__main__":
-    # Initialize Pygame
-    try:
-        pygame.mixer.pre_init(44100, -16, 2, 2048)
-        pygame.init()
-        print("Pygame initialized.")
-    except Exception as e:
-        print(f"Error initializing Pygame: {e}")
-
-    app = QApplication(sys.argv)
-
-    # --- Set SF Pro Display font ---
-    # IMPORTANT: Replace with the actual path to your SF Pro Display font file.
-    # The font file (e.g., SF-Pro-Display-Regular.otf) must be accessible.
-    # Place the file next to your script or provide a full path.
-    # You might need multiple font files for different weights (Regular, Light)
-    # For simplicity, we load one and rely on setPointSize.
-
-    # Determine the directory of the script or the executable for font loading
-    if getattr(sys, 'frozen', False):
-        # If running as a bundled executable (e.g., PyInstaller)
-        script_dir = sys._MEIPASS
-    else:
-        # If running as a normal script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    font_path = os.path.join(script_dir, "SF-Pro-Display-Regular.otf") # <--- Font file relative to script/exe
-
-    font_id = QFontDatabase.addApplicationFont(font_path)
-    if font_id != -1:
-        families = QFontDatabase.applicationFontFamilies(font_id)
-        if families:
-            # Set SF Pro Display as the default application font
-            default_font = QFont(families[0])
-            # Set a base size, widget-specific sizes will be applied later
-            default_font.setPointSize(9)
-            app.setFont(default_font)
-            print(f"Font '{families[0]}' loaded from '{font_path}' and set.")
-        else:
-            print(f"Error: Could not get font families from file '{font_path}'.")
-            print("Using system fallback font.")
-            # Fallback to a similar system font
-            default_font = QFont('Segoe UI', 9) # Windows
-            if sys.platform == 'darwin':
-                 default_font = QFont('Helvetica Neue', 9) # macOS
-            elif sys.platform.startswith('linux'):
-                 default_font = QFont('Roboto', 9) # Linux
-            app.setFont(default_font)
-    else:
-        print(f"Note: Font file '{font_path}' not found or could not be loaded.")
-        # Fallback to checking current working directory
-        font_path_cwd = os.path.join(os.getcwd(), "SF-Pro-Display-Regular.otf")
-        font_id_cwd = QFontDatabase.addApplicationFont(font_path_cwd)
-        if font_id_cwd != -1:
-            families_cwd = QFontDatabase.applicationFontFamilies(font_id_cwd)
-            if families_cwd:
-                default_font = QFont(families_cwd[0])
-                default_font.setPointSize(9)
-                app.setFont(default_font)
-                print(f"Font '{families_cwd[0]}' loaded from '{font_path_cwd}' and set.")
-            else: # Should not happen if font_id_cwd != -1
-                 print("Using system fallback font after CWD check failed.")
-                 default_font = QFont('Segoe UI', 9); app.setFont(default_font) # Fallback
-            app.setFont(default_font) # Ensure font is set
-        else:
-            print("Using system fallback font.")
-            # Fallback to a similar system font
-            default_font = QFont('Segoe UI', 9) # Windows
-            if sys.platform == 'darwin':
-                 default_font = QFont('Helvetica Neue', 9) # macOS
-            elif sys.platform.startswith('linux'):
-                 default_font = QFont('Roboto', 9) # Linux
-            app.setFont(default_font)
-
-
-    timer_app = TimerApp() # Use the main app class
+    # The pygame mixer is opened by the audio thread (see AudioWorker), not here
+
+    parser = argparse.ArgumentParser(description="Flip timer")
+    parser.add_argument("--hooks", metavar="PATH", help="JSON list of hooks to run on timer events")
+    parser.add_argument("--audio-profile", choices=sorted(AUDIO_PROFILES),
+                        help="Mixer profile for this run (default: the one saved by --audio-selftest-device)")
+    parser.add_argument("--audio-selftest", action="store_true",
+                        help="Check every audio profile on SDL's dummy driver (same result everywhere) and exit")
+    parser.add_argument("--audio-selftest-device", action="store_true",
+                        help="Measure playback latency of every profile on the real device, save the best one and exit")
+    parser.add_argument("--build-resource-pack", metavar="PATH", nargs="?", const=RESOURCE_PACK_NAME,
+                        help=f"Bundle the font and sounds into one pack file (default {RESOURCE_PACK_NAME}) and exit")
+    parser.add_argument("--opaque", action="store_true",
+                        help="Opaque window with masked corners (cheaper compositing, corners are not anti-aliased)")
+    parser.add_argument("--power-profile", choices=[POWER_AUTO] + list(POWER_PROFILES), default=POWER_AUTO,
+                        help="Frame rates, colon blinking and audio buffering (default: follow the power source)")
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const="",
+                        help="Sample the GUI thread from startup and write collapsed stacks on exit "
+                             f"(default: a timestamped .folded file; {PROFILER_CHORD} toggles it at runtime)")
+    parser.add_argument("--profile-hz", type=int, default=PROFILER_DEFAULT_HZ,
+                        help="Sampling rate of the profiler (default %(default)s)")
+    parser.add_argument("--alarms", metavar="PATH",
+                        help="JSON list of wall-clock alarms, e.g. {\"label\": ..., \"at\": \"07:00\", \"days\": \"weekdays\"}")
+    parser.add_argument("--load", metavar="PATH",
+                        help="Start one dashboard timer per JSONL row ({\"label\": ..., \"seconds\": ...}), '-' reads stdin")
+    parser.add_argument("--overlay-http", metavar="PORT", type=int,
+                        help="Serve the timer display as an MJPEG stream on 127.0.0.1:PORT")
+    parser.add_argument("--overlay-socket", metavar="PATH",
+                        help="Serve raw RGBA frames of the timer display on a Unix socket")
+    parser.add_argument("--overlay-size", metavar="WxH", default="%dx%d" % FRAME_SERVER_SIZE,
+                        help="Resolution of the overlay frames (default %(default)s)")
+    parser.add_argument("--overlay-fps", type=int, default=FRAME_SERVER_FPS,
+                        help="Maximum overlay frame rate (default %(default)s)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print startup timings and fallback notes")
+    args, qt_args = parser.parse_known_args()
+    VERBOSE = args.verbose
+
+    if args.build_resource_pack:
+        packed = build_resource_pack(args.build_resource_pack)
+        print(f"Packed {len(packed)} resources into '{args.build_resource_pack}'.")
+        sys.exit(0)
+
+    if args.audio_selftest or args.audio_selftest_device:
+        sys.exit(0 if run_audio_selftest(device=args.audio_selftest_device) else 1)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    # Font and sounds are resolved once (pack or loose files), the font registers from memory
+    app.setFont(load_app_font(ResourcePack.instance()))
+
+    timer_app = TimerApp(audio_profile=args.audio_profile, power_profile=args.power_profile,
+                         opaque=args.opaque) # Use the main app class
+    if args.hooks:
+        try:
+            timer_app.hooks.set_hooks(load_hooks(args.hooks))
+        except (OSError, ValueError) as e:
+            print(f"Error loading hooks from '{args.hooks}': {e}")
+    if args.alarms:
+        try:
+            timer_app.alarm_scheduler.add_alarms(load_alarms(args.alarms))
+        except (OSError, ValueError) as e:
+            print(f"Error loading alarms from '{args.alarms}': {e}")
+    if args.load:
+        timer_app.load_timers(args.load)
+    if args.overlay_http is not None or args.overlay_socket:
+        try:
+            width, height = (int(v) for v in args.overlay_size.lower().split("x"))
+            timer_app.start_frame_server(args.overlay_http, args.overlay_socket, (width, height), args.overlay_fps)
+        except (OSError, ValueError) as e:
+            print(f"Error starting the overlay frame server: {e}")
+    if args.profile is not None:
+        timer_app.profile_path = args.profile or None
+        timer_app.toggle_profiler(args.profile_hz)
     timer_app.show()
     exit_code = app.exec_()
+    if timer_app.profiler is not None and timer_app.profiler.is_running():
+        timer_app.toggle_profiler() # Quit from the tray skips closeEvent
 
     pygame.quit()
     print("Pygame finalized.")
@@ -0,0 +1,308 @@
+"""Record-and-replay harness for TimerApp interaction benchmarks.
+
+Record a session with the real window (mouse, wheel and window resizes):
+
+    python input_replay.py record session.ftlog
+
+Replay it headlessly, either as fast as possible or paced at a multiple of the
+original speed, and collect per-frame costs plus the final picked values:
+
+    python input_replay.py replay session.ftlog --speed 0 --output replay.json
+    python input_replay.py replay session.ftlog --speed 1 --expect replay.json
+
+Animations (picker inertia, snapping, the toggle switch) are stepped through
+flip_timer.AnimationDriver on a virtual 16 ms frame clock driven by the log
+timestamps, so a replay gives the same picked values no matter how fast it
+runs.
+"""
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+
+from PyQt5.QtCore import Qt, QObject, QEvent, QPoint, QPointF
+from PyQt5.QtGui import QImage, QMouseEvent, QWheelEvent, QWindow
+from PyQt5.QtWidgets import QApplication
+
+
+# --- Log format ---
+# Header: magic, version, window x, y, width, height at the start of recording
+LOG_MAGIC = b"FTIR"
+LOG_VERSION = 1
+HEADER = struct.Struct("<4sHiiii")
+# Record: delta time (us), kind, button, buttons, modifiers, x, y, wheel delta
+RECORD = struct.Struct("<IBBBBiih")
+
+KIND_PRESS = 1
+KIND_RELEASE = 2
+KIND_MOVE = 3
+KIND_DBLCLICK = 4
+KIND_WHEEL = 5
+KIND_RESIZE = 6
+
+_MOUSE_KINDS = {
+    QEvent.MouseButtonPress: KIND_PRESS,
+    QEvent.MouseButtonRelease: KIND_RELEASE,
+    QEvent.MouseMove: KIND_MOVE,
+    QEvent.MouseButtonDblClick: KIND_DBLCLICK,
+}
+_MOUSE_EVENT_TYPES = {kind: event_type for event_type, kind in _MOUSE_KINDS.items()}
+
+_MODIFIER_SHIFT = 25 # Shift/Control/Alt/Meta live in bits 25..28 of Qt.KeyboardModifiers
+
+FRAME_MS = 16 # Virtual frame period, matches the app's 60 FPS timers
+SETTLE_LIMIT_MS = 10000 # Stop ticking after the log if animations never finish
+
+
+def _pack_modifiers(modifiers):
+    return (int(modifiers) >> _MODIFIER_SHIFT) & 0x0F
+
+
+def _unpack_modifiers(bits):
+    return Qt.KeyboardModifiers(bits << _MODIFIER_SHIFT)
+
+
+def read_log(path):
+    """Returns (header dict, list of records with absolute times in ms)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, x, y, width, height = HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC or version != LOG_VERSION:
+        raise ValueError(f"{path} is not a version {LOG_VERSION} input log")
+    header = {"x": x, "y": y, "width": width, "height": height}
+
+    records = []
+    now_us = 0
+    for dt_us, kind, button, buttons, modifiers, px, py, delta in RECORD.iter_unpack(data[HEADER.size:]):
+        now_us += dt_us
+        records.append((now_us / 1000.0, kind, button, buttons, modifiers, px, py, delta))
+    return header, records
+
+
+# --- Recorder ---
+class InputRecorder(QObject):
+    """Application-wide event filter that logs input reaching one top-level window."""
+
+    def __init__(self, window, parent=None):
+        super().__init__(parent)
+        self._window = window
+        self._data = bytearray()
+        self._last_ns = None
+
+    def start(self):
+        geometry = self._window.geometry()
+        self._data = bytearray(HEADER.pack(LOG_MAGIC, LOG_VERSION, geometry.x(), geometry.y(),
+                                           geometry.width(), geometry.height()))
+        self._last_ns = time.monotonic_ns()
+        QApplication.instance().installEventFilter(self)
+
+    def stop(self):
+        QApplication.instance().removeEventFilter(self)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self._data)
+
+    def _append(self, kind, button, buttons, modifiers, x, y, delta=0):
+        now_ns = time.monotonic_ns()
+        dt_us = min(0xFFFFFFFF, (now_ns - self._last_ns) // 1000)
+        self._last_ns = now_ns
+        self._data += RECORD.pack(dt_us, kind, int(button) & 0xFF, int(buttons) & 0xFF,
+                                  _pack_modifiers(modifiers), x, y, max(-32768, min(32767, delta)))
+
+    def eventFilter(self, obj, event):
+        # Input is captured at the QWindow level, before Qt picks a receiver widget,
+        # so propagation to parent widgets does not duplicate records.
+        if isinstance(obj, QWindow) and obj is self._window.windowHandle():
+            kind = _MOUSE_KINDS.get(event.type())
+            if kind is not None:
+                pos = event.globalPos()
+                self._append(kind, event.button(), event.buttons(), event.modifiers(), pos.x(), pos.y())
+            elif event.type() == QEvent.Wheel:
+                pos = event.globalPosition().toPoint()
+                self._append(KIND_WHEEL, 0, event.buttons(), event.modifiers(), pos.x(), pos.y(),
+                             event.angleDelta().y())
+        elif obj is self._window and event.type() == QEvent.Resize and event.spontaneous():
+            # Only resizes coming from the window manager, the app's own
+            # aspect-ratio corrections are reproduced by replaying these.
+            size = event.size()
+            self._append(KIND_RESIZE, 0, 0, 0, size.width(), size.height())
+        return False
+
+
+# --- Replayer ---
+class InputReplayer:
+    """Feeds a recorded log into a TimerApp and measures the cost of every frame."""
+
+    def __init__(self, root, header, records, speed=0.0, render=True):
+        self.root = root
+        self.header = header
+        self.records = records
+        self.speed = speed # 0 = as fast as possible, 1 = original pace, 4 = four times faster
+        self.render = render
+        self.frame_costs_ms = []
+        self.dispatch_costs_ms = []
+        self._image = None
+
+    def _tick_frame(self):
+        """Advances every running animation by one virtual frame and renders the window."""
+        from flip_timer import AnimationDriver
+        start = time.perf_counter_ns()
+        AnimationDriver.instance().advance(FRAME_MS)
+        QApplication.sendPostedEvents()
+        if self.render:
+            size = self.root.size()
+            if self._image is None or self._image.size() != size:
+                self._image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+            self._image.fill(Qt.transparent)
+            self.root.render(self._image)
+        self.frame_costs_ms.append((time.perf_counter_ns() - start) / 1e6)
+
+    def _is_animating(self):
+        # The progress ring ticks for as long as a timer runs, only the
+        # self-terminating animations matter for the final picked values
+        from flip_timer import PickerWheel, IOSToggleSwitch
+        if any(w.is_animating() for w in self.root.findChildren(PickerWheel)):
+            return True
+        return any(s._animation is not None for s in self.root.findChildren(IOSToggleSwitch))
+
+    def _dispatch(self, kind, button, buttons, modifiers, x, y, delta):
+        start = time.perf_counter_ns()
+        if kind == KIND_RESIZE:
+            self.root.resize(x, y)
+        else:
+            window = self.root.windowHandle()
+            global_pos = QPoint(x, y)
+            local_pos = QPointF(window.mapFromGlobal(global_pos))
+            modifiers = _unpack_modifiers(modifiers)
+            if kind == KIND_WHEEL:
+                event = QWheelEvent(local_pos, QPointF(global_pos), QPoint(0, 0), QPoint(0, delta),
+                                    Qt.MouseButtons(buttons), modifiers, Qt.NoScrollPhase, False)
+            else:
+                event = QMouseEvent(_MOUSE_EVENT_TYPES[kind], local_pos, local_pos, QPointF(global_pos),
+                                    Qt.MouseButton(button), Qt.MouseButtons(buttons), modifiers)
+            QApplication.sendEvent(window, event)
+        QApplication.sendPostedEvents()
+        self.dispatch_costs_ms.append((time.perf_counter_ns() - start) / 1e6)
+
+    def _pace(self, wall_start, log_ms):
+        if self.speed > 0:
+            delay = wall_start + log_ms / 1000.0 / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def run(self):
+        from flip_timer import AnimationDriver
+        AnimationDriver.instance().set_manual(True) # Frames follow the log clock, not the wall clock
+        self.root.setGeometry(self.header["x"], self.header["y"], self.header["width"], self.header["height"])
+        self.root.show()
+        QApplication.sendPostedEvents()
+
+        wall_start = time.perf_counter()
+        next_frame_ms = FRAME_MS
+        last_ms = 0.0
+        for log_ms, kind, button, buttons, modifiers, x, y, delta in self.records:
+            while next_frame_ms <= log_ms:
+                self._pace(wall_start, next_frame_ms)
+                self._tick_frame()
+                next_frame_ms += FRAME_MS
+            self._pace(wall_start, log_ms)
+            self._dispatch(kind, button, buttons, modifiers, x, y, delta)
+            last_ms = log_ms
+
+        # Let inertia and snap animations run out so the picked values are final
+        settle_end_ms = last_ms + SETTLE_LIMIT_MS
+        while self._is_animating() and next_frame_ms <= settle_end_ms:
+            self._pace(wall_start, next_frame_ms)
+            self._tick_frame()
+            next_frame_ms += FRAME_MS
+        return self.results()
+
+    def results(self):
+        from bench_widgets import summarize
+        picker = self.root.time_picker_widget
+        geometry = self.root.geometry()
+        frame_stats = summarize([int(ms * 1e6) for ms in self.frame_costs_ms]) if self.frame_costs_ms else {}
+        return {
+            "events": len(self.records),
+            "speed": self.speed,
+            "frames": frame_stats,
+            "dispatch_total_ms": round(sum(self.dispatch_costs_ms), 3),
+            "picked": {
+                "hours": picker.hours_wheel.get_selected_value(),
+                "minutes": picker.minutes_wheel.get_selected_value(),
+                "seconds": picker.seconds_wheel.get_selected_value(),
+            },
+            "geometry": [geometry.x(), geometry.y(), geometry.width(), geometry.height()],
+        }
+
+
+# --- Command line ---
+def _record(args):
+    from flip_timer import TimerApp
+    app = QApplication(sys.argv[:1])
+    window = TimerApp()
+    window.show()
+    recorder = InputRecorder(window)
+    recorder.start()
+    exit_code = app.exec_()
+    recorder.stop()
+    recorder.save(args.log)
+    print(f"Input log written to {args.log}")
+    return exit_code
+
+
+def _replay(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from flip_timer import TimerApp
+    app = QApplication(sys.argv[:1])
+    header, records = read_log(args.log)
+    replayer = InputReplayer(TimerApp(), header, records, speed=args.speed, render=not args.no_render)
+    results = replayer.run()
+
+    frames = results["frames"]
+    print(f"{results['events']} events, {frames.get('frames', 0)} frames, "
+          f"p50 {frames.get('p50_ms', 0):.3f} ms, p99 {frames.get('p99_ms', 0):.3f} ms")
+    print(f"Picked: {results['picked']}  geometry: {results['geometry']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.expect:
+        with open(args.expect, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        mismatches = [key for key in ("picked", "geometry") if expected.get(key) != results[key]]
+        if mismatches:
+            for key in mismatches:
+                print(f"Mismatch in {key}: expected {expected.get(key)}, got {results[key]}")
+            return 1
+        print(f"Final state matches '{args.expect}'.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay TimerApp input.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Run the app and record input into a log")
+    record.add_argument("log")
+    record.set_defaults(func=_record)
+
+    replay = commands.add_parser("replay", help="Replay a log headlessly")
+    replay.add_argument("log")
+    replay.add_argument("--speed", type=float, default=0.0,
+                        help="Pacing relative to the recording (0 = as fast as possible)")
+    replay.add_argument("--no-render", action="store_true", help="Only dispatch input, skip rendering frames")
+    replay.add_argument("--output", help="Write the results as JSON")
+    replay.add_argument("--expect", help="Fail if picked values or geometry differ from this results file")
+    replay.set_defaults(func=_replay)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Memory soak test for TimerApp.
+
+Drives the app headlessly through thousands of start/pause/resume/cancel
+cycles, finished timers and picker flings under a virtual clock, while
+sampling Python heap usage (tracemalloc) and live Qt object counts. The run
+fails if a least-squares fit over the post-warm-up samples shows either one
+growing faster than a per-cycle threshold:
+
+    python memory_soak.py --cycles 5000 --output soak.json
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+# Headless and silent: no window, no audio device needed
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from PyQt5.QtCore import QObject, QEvent, QTime
+from PyQt5.QtWidgets import QApplication
+
+import flip_timer
+
+
+DEFAULT_CYCLES = 3000
+DEFAULT_SAMPLE_EVERY = 100
+DEFAULT_WARMUP_FRACTION = 0.25
+DEFAULT_MEMORY_SLOPE = 32.0 # bytes of heap growth per cycle allowed after warm-up
+DEFAULT_OBJECT_SLOPE = 0.005 # live QObjects per cycle allowed after warm-up (one per 200 cycles)
+
+
+# --- Virtual clock ---
+class VirtualClock:
+    """Moves a running TimerApp forward in time without waiting.
+
+    The app measures remaining time against its deadline, so pulling
+    the deadline closer is equivalent to the time having passed.
+    """
+
+    def __init__(self, app_widget):
+        self.app_widget = app_widget
+        self.now_ms = 0
+
+    def advance(self, msecs, frame_ms=16):
+        self.now_ms += msecs
+        if self.app_widget.deadline is not None and self.app_widget.current_state == flip_timer.TimerState.RUNNING:
+            self.app_widget.deadline -= msecs / 1000.0
+        # Run the per-frame and per-second callbacks the QTimers would have fired
+        for _ in range(max(1, msecs // 1000)):
+            self.app_widget.blink_colon()
+            self.app_widget.update_timer_logic()
+        self.app_widget.update_timer_animation()
+
+
+# --- Scripted activity ---
+def _settle_animations(wheel, frame_ms=16):
+    """Runs inertia and snapping to completion without an event loop."""
+    driver = flip_timer.AnimationDriver.instance()
+    while wheel.is_animating():
+        driver.advance(frame_ms)
+
+
+def fling_pickers(app_widget, cycle):
+    picker = app_widget.time_picker_widget
+    for index, wheel in enumerate((picker.hours_wheel, picker.minutes_wheel, picker.seconds_wheel)):
+        direction = 1 if (cycle + index) % 2 else -1
+        wheel._velocity = direction * (20.0 + (cycle * 7 + index * 13) % 40)
+        wheel._start_inertia()
+        _settle_animations(wheel)
+
+
+def run_cycle(app_widget, clock, cycle):
+    """One start -> run -> pause -> resume -> (finish | cancel) round trip."""
+    fling_pickers(app_widget, cycle)
+    app_widget.time_picker_widget.set_time(QTime(0, 0, 3 + cycle % 5))
+    app_widget.toggle_timer() # Start
+    clock.advance(1000)
+    app_widget.toggle_timer() # Pause
+    app_widget.toggle_timer() # Resume
+    clock.advance(1000)
+    if cycle % 3 == 0:
+        clock.advance(10000) # Run out, FINISHED plays the alarm
+    app_widget.cancel_timer()
+    # One history record per run is kept on purpose (bounded by HISTORY_LIMIT, exported
+    # on demand); dropping it keeps that intended growth out of the leak slope
+    app_widget.timer_history.clear()
+
+
+def collect_garbage():
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+def sample(app_widget, cycle):
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "cycle": cycle,
+        "python_bytes": current,
+        "python_peak_bytes": peak,
+        "qt_children": len(app_widget.findChildren(QObject)),
+        "qt_wrappers": sum(1 for obj in gc.get_objects() if isinstance(obj, QObject)),
+    }
+
+
+# --- Growth check ---
+def growth_per_cycle(samples, key):
+    """Least-squares slope of samples[key] against the cycle number."""
+    xs = [s["cycle"] for s in samples]
+    ys = [s[key] for s in samples]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def check_growth(samples, warmup_fraction, memory_slope, object_slope):
+    """Fits a line through the post-warm-up samples; a slow steady leak shows up as its slope."""
+    steady = samples[int(len(samples) * warmup_fraction):]
+    if len(steady) < 4:
+        return ["not enough samples after warm-up to judge growth"]
+    failures = []
+    limits = (("python_bytes", memory_slope), ("qt_children", object_slope),
+              ("qt_wrappers", object_slope))
+    for key, limit in limits:
+        slope = growth_per_cycle(steady, key)
+        if slope > limit:
+            failures.append(f"{key} grows by {slope:.3g} per cycle (limit {limit:g})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory soak test for TimerApp.")
+    parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+    parser.add_argument("--sample-every", type=int, default=DEFAULT_SAMPLE_EVERY)
+    parser.add_argument("--warmup", type=float, default=DEFAULT_WARMUP_FRACTION,
+                        help="Fraction of samples ignored while caches fill up")
+    parser.add_argument("--memory-slope", type=float, default=DEFAULT_MEMORY_SLOPE,
+                        help="Heap growth allowed after warm-up, in bytes per cycle")
+    parser.add_argument("--object-slope", type=float, default=DEFAULT_OBJECT_SLOPE,
+                        help="Live QObject growth allowed after warm-up, per cycle")
+    parser.add_argument("--output", help="Write the samples and verdict as JSON")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    flip_timer.AnimationDriver.instance().set_manual(True) # Virtual clock only
+    app_widget = flip_timer.TimerApp()
+    app_widget.show()
+    QApplication.processEvents()
+    clock = VirtualClock(app_widget)
+
+    tracemalloc.start()
+    samples = []
+    wall_start = time.perf_counter()
+    for cycle in range(1, args.cycles + 1):
+        run_cycle(app_widget, clock, cycle)
+        if cycle % args.sample_every == 0:
+            collect_garbage()
+            samples.append(sample(app_widget, cycle))
+            last = samples[-1]
+            print(f"cycle {cycle:>6}  python {last['python_bytes'] / 1024:9.1f} KiB  "
+                  f"qt children {last['qt_children']:>5}  qt wrappers {last['qt_wrappers']:>5}")
+    tracemalloc.stop()
+
+    failures = check_growth(samples, args.warmup, args.memory_slope, args.object_slope)
+    elapsed = time.perf_counter() - wall_start
+    print(f"{args.cycles} cycles in {elapsed:.1f} s ({clock.now_ms / 3600000:.1f} h of virtual time)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cycles": args.cycles, "samples": samples, "failures": failures}, f, indent=2)
+        print(f"Samples written to {args.output}")
+
+    if failures:
+        print("Unbounded growth detected:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("No unbounded growth detected.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
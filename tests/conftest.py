@@ -0,0 +1,32 @@
+import gc
+import os
+import sys
+
+# Must be set before flip_timer pulls in PyQt5 and pygame: CI runners have no display or sound card
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+@pytest.fixture(autouse=True)
+def collect_widgets():
+    yield
+    # Closed windows sit in reference cycles; free them here on the GUI thread, not in a
+    # collection that happens to run on the profiler or audio thread of a later test
+    gc.collect()
+
+
+@pytest.fixture
+def timer_app(qapp):
+    import flip_timer
+    window = flip_timer.TimerApp(power_profile="performance")
+    yield window
+    window.close()
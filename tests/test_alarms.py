@@ -0,0 +1,83 @@
+import datetime
+import time
+
+import pytest
+
+from flip_timer import AlarmRule, AlarmScheduler, WallAlarm
+
+FRIDAY = datetime.datetime(2024, 5, 3, 8, 0)
+MONDAY_7AM = datetime.datetime(2024, 5, 6, 7, 0)
+
+
+def test_weekly_skips_to_the_next_matching_weekday():
+    rule = AlarmRule.from_dict({"at": "07:00", "days": "weekdays"})
+    assert rule.next_after(FRIDAY) == MONDAY_7AM
+    # Strictly after: ringing at 07:00 moves on to the next day
+    assert rule.next_after(MONDAY_7AM) == MONDAY_7AM + datetime.timedelta(days=1)
+
+
+def test_weekly_day_names():
+    rule = AlarmRule.from_dict({"at": "21:30", "days": ["sun"]})
+    assert rule.next_after(FRIDAY) == datetime.datetime(2024, 5, 5, 21, 30)
+
+
+def test_interval():
+    anchor = datetime.datetime(2024, 1, 1)
+    rule = AlarmRule("interval", anchor=anchor, every=datetime.timedelta(hours=2))
+    assert rule.next_after(anchor - datetime.timedelta(days=1)) == anchor
+    assert rule.next_after(anchor + datetime.timedelta(hours=3)) == anchor + datetime.timedelta(hours=4)
+    assert rule.next_after(anchor + datetime.timedelta(hours=4)) == anchor + datetime.timedelta(hours=6)
+
+
+def test_dates_run_out():
+    dates = [datetime.datetime(2024, 5, 4, 9), datetime.datetime(2024, 5, 1, 9)]
+    rule = AlarmRule("dates", dates=dates)
+    assert rule.next_after(datetime.datetime(2024, 4, 1)) == dates[1]
+    assert rule.next_after(dates[1]) == dates[0]
+    assert rule.next_after(dates[0]) is None
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"kind": "weekly", "at": datetime.time(7)},
+    {"kind": "interval", "anchor": FRIDAY, "every": datetime.timedelta(0)},
+    {"kind": "dates"},
+    {"kind": "monthly"},
+])
+def test_invalid_rules(kwargs):
+    with pytest.raises(ValueError):
+        AlarmRule(**kwargs)
+
+
+def _in(seconds):
+    return WallAlarm(f"in {seconds}", AlarmRule("dates", dates=[datetime.datetime.now() + datetime.timedelta(seconds=seconds)]))
+
+
+def test_disabling_invalidates_the_heap_entry(qapp):
+    scheduler = AlarmScheduler()
+    soon, later = _in(3600), _in(7200)
+    scheduler.add_alarms([later])
+    scheduler.add_alarm(soon)
+    assert scheduler.next_alarm()[0] is soon
+
+    scheduler.set_enabled(1, False)
+    assert scheduler.next_alarm()[0] is later
+    assert len(scheduler._heap) == 1 # The stale entry was dropped on the way
+
+    scheduler.set_enabled(1, True)
+    assert scheduler.next_alarm()[0] is soon
+    scheduler._wakeup.stop()
+
+
+def test_wakeup_fires_due_alarms_once(qapp):
+    scheduler = AlarmScheduler()
+    fired = []
+    scheduler.alarm_fired.connect(lambda alarm, at: fired.append(alarm))
+    due, pending = _in(0.05), _in(3600)
+    scheduler.add_alarms([due, pending])
+    time.sleep(0.1)
+    scheduler._on_wakeup()
+    scheduler._on_wakeup()
+    assert fired == [due]
+    assert due.due is None # A dates rule with no dates left is done
+    assert scheduler.next_alarm()[0] is pending
+    scheduler._wakeup.stop()
@@ -0,0 +1,78 @@
+from PyQt5 import sip
+from PyQt5.QtWidgets import QWidget
+
+from flip_timer import AnimationDriver
+
+
+class Target:
+    value = 0.0
+
+
+def manual_driver():
+    driver = AnimationDriver()
+    driver.set_manual(True)
+    return driver
+
+
+def test_tween_reaches_end_and_calls_on_finished(qapp):
+    driver = manual_driver()
+    target, finished = Target(), []
+    driver.animate(target, "value", 0.0, 10.0, 100, on_finished=lambda: finished.append(True))
+    driver.advance(50)
+    assert target.value == 5.0 and not finished
+    driver.advance(60)
+    assert target.value == 10.0 and finished == [True]
+    assert not driver.is_active()
+
+
+def test_failing_callbacks_do_not_stop_the_others(qapp):
+    driver = manual_driver()
+    calls = []
+
+    def deleted_widget(dt_ms):
+        raise RuntimeError("wrapped C/C++ object has been deleted")
+
+    def broken(dt_ms):
+        raise ValueError("bug")
+
+    def finished_on_deleted_widget():
+        raise RuntimeError("wrapped C/C++ object has been deleted")
+
+    driver.add_ticker(deleted_widget)
+    driver.add_ticker(broken)
+    driver.add_ticker(calls.append)
+    driver.animate(Target(), "value", 0.0, 1.0, 10, on_finished=finished_on_deleted_widget)
+    driver.advance(16)
+    assert calls == [16]
+    assert driver._tickers == [calls.append] # Failing tickers are dropped
+    driver.advance(16)
+    assert calls == [16, 16]
+
+
+class Ticking(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.ticks = 0
+
+    def tick(self, dt_ms):
+        self.ticks += 1
+
+
+def test_ticker_of_a_deleted_widget_is_removed(qapp):
+    driver = manual_driver()
+    widget = Ticking()
+    driver.add_ticker(widget.tick)
+    driver.advance(16)
+    assert widget.ticks == 1
+    sip.delete(widget) # The C++ side goes, the bound method keeps the wrapper alive
+    driver.advance(16)
+    assert not driver.is_active()
+
+
+def test_closing_the_window_unregisters_its_tickers(timer_app):
+    driver = AnimationDriver.instance()
+    driver.add_ticker(timer_app.update_timer_animation)
+    driver.add_ticker(timer_app.update_stopwatch_display)
+    timer_app.close()
+    assert timer_app.update_timer_animation not in driver._tickers
+    assert timer_app.update_stopwatch_display not in driver._tickers
@@ -0,0 +1,133 @@
+import time
+
+import pygame
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+import flip_timer
+from flip_timer import AudioWorker, ResourcePack
+
+
+@pytest.fixture
+def worker():
+    worker = AudioWorker(ResourcePack.instance())
+    yield worker
+    while worker._users > 0:
+        worker.detach()
+
+
+def wait_for(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        QApplication.processEvents() # Signals from the audio thread arrive queued
+        time.sleep(0.01)
+
+
+def test_stop_discards_plays_queued_before_it(worker, monkeypatch):
+    executed = []
+    monkeypatch.setattr(worker, "_execute", lambda command: executed.append(command[0]))
+    # Queued before the thread starts, so the worker sees them as one batch
+    worker.play("alarm.wav")
+    worker.play_tone("escalating")
+    worker.set_volume(0.5)
+    worker.stop()
+    worker.preload("alarm.wav")
+    worker.attach()
+    wait_for(lambda: "preload" in executed)
+    assert executed == ["volume", "stop", "preload"]
+
+
+def test_plays_a_tone_on_the_dummy_driver(qapp, worker):
+    states = []
+    worker.state_changed.connect(states.append)
+    worker.init_mixer(flip_timer.AUDIO_PROFILES["low-power"])
+    worker.play_tone("beep")
+    worker.attach()
+    wait_for(lambda: "playing" in states or "unavailable" in states)
+    assert states[0] == "ready" and "playing" in states
+    worker.detach()
+    assert worker._thread is None
+    assert not pygame.mixer.get_init()
+
+
+def test_quit_is_ignored_after_attaching_again(worker):
+    worker.attach()
+    worker.quit() # As if a detach raced with a new window attaching
+    executed = []
+    worker._execute = lambda command: executed.append(command[0])
+    worker.stop()
+    wait_for(lambda: executed == ["stop"])
+    assert worker._thread is not None and worker._thread.is_alive()
+
+
+def test_slow_quit_keeps_the_worker_shared(monkeypatch):
+    monkeypatch.setattr(AudioWorker, "_instance", None)
+    worker = AudioWorker.instance()
+    quit_mixer = worker._quit_mixer
+
+    def slow_quit():
+        time.sleep(0.3)
+        quit_mixer()
+
+    monkeypatch.setattr(worker, "_quit_mixer", slow_quit)
+    worker.attach()
+    thread = worker._thread
+    worker.detach(timeout=0.01)
+    assert thread.is_alive()
+    assert AudioWorker.instance() is worker # No second worker beside the one still quitting
+
+    worker.attach() # Waits for the quit, then starts a fresh thread
+    assert worker._thread is not thread and worker._thread.is_alive()
+    assert not thread.is_alive()
+    worker.detach()
+    assert AudioWorker._instance is None
+
+
+def test_selftest_runs_on_the_dummy_driver_and_saves_nothing(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "pulseaudio")
+    drivers = []
+
+    def fake_measure(settings, repeats=flip_timer.LATENCY_REPEATS, device=False):
+        drivers.append(device)
+        return settings[3] / settings[0] * 1000.0 # Grows with the buffer, like the real thing
+
+    monkeypatch.setattr(flip_timer, "measure_mixer_latency", fake_measure)
+    monkeypatch.setattr(flip_timer, "app_settings", lambda: pytest.fail("dummy run must not save"))
+    assert flip_timer.run_audio_selftest() == "low-latency"
+    assert drivers == [False] * len(flip_timer.AUDIO_PROFILES)
+
+
+def test_latency_probe_uses_the_dummy_driver_unless_asked(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "no-such-driver")
+    latency = flip_timer.measure_mixer_latency(flip_timer.AUDIO_PROFILES["low-latency"], repeats=1)
+    assert latency is not None
+    assert flip_timer.os.environ["SDL_AUDIODRIVER"] == "no-such-driver" # Restored afterwards
+    assert flip_timer.measure_mixer_latency(flip_timer.AUDIO_PROFILES["low-latency"], repeats=1, device=True) is None
+
+
+@pytest.mark.parametrize("pattern, seconds", [("beep", 1.4), ("chirp", 1.4), ("escalating", 2.5)])
+def test_alarm_patterns(pattern, seconds):
+    stereo = flip_timer.synthesize_alarm(pattern, 22050, 2)
+    assert stereo.dtype.name == "int16" and stereo.shape[1] == 2
+    assert abs(len(stereo) - 22050 * seconds) < 20 # Each part is truncated to whole frames
+    assert (stereo[:, 0] == stereo[:, 1]).all()
+    assert not stereo.flags.writeable
+    mono = flip_timer.synthesize_alarm(pattern, 22050, 1)
+    assert mono.shape == (len(stereo),)
+    assert abs(int(mono.max())) <= int(0.8 * 32767) + 1
+    # Loops seamlessly: faded in and out, ends on silence
+    assert abs(int(mono[0])) < 200 and not mono[-100:].any()
+
+
+def test_escalating_gets_louder():
+    samples = flip_timer.synthesize_alarm("escalating", 8000, 1).astype(float)
+    beep = int(8000 * 0.25) # One beep plus its gap
+    peaks = [abs(samples[i * beep:(i + 1) * beep]).max() for i in range(8)]
+    assert peaks == sorted(peaks) and peaks[-1] > 3 * peaks[0]
+
+
+def test_alarm_tones_are_cached_and_validated():
+    assert flip_timer.synthesize_alarm("beep", 44100, 2) is flip_timer.synthesize_alarm("beep", 44100, 2)
+    with pytest.raises(ValueError):
+        flip_timer.synthesize_alarm("siren")
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+import flip_timer
+from flip_timer import CLOCK_STEP_TOLERANCE, ClockWatch
+
+
+class FakeClocks:
+    """Wall, monotonic and deadline clocks that only move when told to."""
+
+    def __init__(self):
+        self.wall = 1_700_000_000.0
+        self.monotonic_now = 1000.0
+        self.boot = 1000.0
+
+    def time(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.monotonic_now
+
+    def deadline(self):
+        return self.boot
+
+    def run(self, seconds):
+        self.wall += seconds
+        self.monotonic_now += seconds
+        self.boot += seconds
+
+
+@pytest.fixture
+def clocks(monkeypatch):
+    clocks = FakeClocks()
+    monkeypatch.setattr(flip_timer, "time", clocks)
+    monkeypatch.setattr(flip_timer, "deadline_clock", clocks.deadline)
+    return clocks
+
+
+def test_running_normally_reports_nothing(clocks):
+    watch = ClockWatch()
+    clocks.run(30.0)
+    assert watch.check() == (False, False)
+
+
+def test_wall_clock_step(clocks):
+    watch = ClockWatch()
+    clocks.run(1.0)
+    clocks.wall -= 3600.0 # DST or a manual change
+    assert watch.check() == (True, False)
+    assert watch.check() == (False, False) # Re-baselined
+
+
+def test_small_drift_is_tolerated(clocks):
+    watch = ClockWatch()
+    clocks.wall += CLOCK_STEP_TOLERANCE / 2 # NTP slew
+    assert watch.check() == (False, False)
+
+
+def test_suspend(clocks):
+    watch = ClockWatch()
+    # Asleep for ten minutes: wall and boot time move on, the monotonic clock does not
+    clocks.wall += 600.0
+    clocks.boot += 600.0
+    assert watch.check() == (False, True)
+    clocks.run(1.0)
+    assert watch.check() == (False, False)
+
+
+def test_deadline_clock_runs_with_the_monotonic_clock():
+    readings = [flip_timer.deadline_clock() for _ in range(1000)]
+    assert readings == sorted(readings)
+    start, monotonic_start = flip_timer.deadline_clock(), time.monotonic()
+    time.sleep(0.05)
+    elapsed = flip_timer.deadline_clock() - start
+    assert abs(elapsed - (time.monotonic() - monotonic_start)) < 0.01 # No suspend in between
+
+
+def test_tray_mode_rechecks_the_clock(timer_app, monkeypatch):
+    from PyQt5.QtCore import QTime
+
+    timer_app.time_picker_widget.set_time(QTime(0, 10, 0))
+    timer_app.toggle_timer()
+    # enter_tray_mode() needs a system tray, the offscreen platform has none
+    timer_app.ensure_tray_icon()
+    timer_app.tray_mode = True
+    timer_app.tray_clock_timer.start(flip_timer.TRAY_CLOCK_CHECK_MS)
+    timer_app.arm_seconds_timer()
+    assert not timer_app.seconds_timer.isActive() # Nothing else ticks in the tray
+
+    rearmed = []
+    monkeypatch.setattr(timer_app.clock_watch, "check", lambda: (False, True))
+    monkeypatch.setattr(timer_app, "arm_deadline_timer", lambda: rearmed.append(True))
+    timer_app.tray_clock_timer.timeout.emit()
+    assert rearmed == [True]
+    timer_app.exit_tray_mode()
+    assert not timer_app.tray_clock_timer.isActive()
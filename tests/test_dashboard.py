@@ -0,0 +1,98 @@
+import pytest
+
+import flip_timer
+from flip_timer import AnimationDriver, TimerDashboard
+
+
+class Clock:
+    def __init__(self):
+        self.now = 500.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(flip_timer, "deadline_clock", clock)
+    return clock
+
+
+@pytest.fixture
+def dashboard(qapp, clock):
+    dashboard = TimerDashboard()
+    dashboard.resize(400, 300)
+    dirty = []
+    dashboard.update = lambda *args: dirty.append(args[0] if args else None)
+    dashboard.dirty = dirty
+    yield dashboard
+    dashboard._wakeup.stop()
+
+
+def wake_at(dashboard, clock, now):
+    clock.now = now
+    dashboard.dirty.clear()
+    dashboard._on_wakeup()
+
+
+def test_bulk_add_builds_one_heap(dashboard, clock):
+    assert dashboard.add_timers([(f"t{i}", 120 + i) for i in range(6)]) == 6
+    assert sorted(index for _, index in dashboard._heap) == list(range(6))
+    assert dashboard._columns * dashboard._rows >= 6
+    assert dashboard.dirty == [None] # One repaint for the whole batch
+
+
+def test_only_changed_cells_are_repainted(dashboard, clock):
+    dashboard.add_timers([("tea", 120), ("eggs", 300)])
+    wake_at(dashboard, clock, 500.0)
+    assert [t.text for t in dashboard.timers] == ["02:00", "05:00"]
+    wake_at(dashboard, clock, 500.5) # Neither display changes before the next whole second
+    assert dashboard.dirty == []
+    wake_at(dashboard, clock, 501.0)
+    assert [t.text for t in dashboard.timers] == ["01:59", "04:59"]
+    region = dashboard.dirty[0]
+    assert region.contains(dashboard._cell_rect(0)) and region.contains(dashboard._cell_rect(1))
+    # Next wakeups are at each timer's next displayed second, not every frame
+    assert sorted(due for due, _ in dashboard._heap) == [501.0 + 1.0, 501.0 + 1.0]
+
+
+def test_final_minute_runs_at_the_frame_rate(dashboard, clock):
+    dashboard.add_timers([("tea", 30)])
+    wake_at(dashboard, clock, 500.0)
+    frame = AnimationDriver.instance().frame_interval() / 1000.0
+    assert dashboard._heap == [(500.0 + frame, 0)]
+
+
+def test_finished_timer_stops(dashboard, clock):
+    dashboard.add_timers([("tea", 2)])
+    wake_at(dashboard, clock, 503.0)
+    entry = dashboard.timers[0]
+    assert not entry.running and entry.remaining == 0.0 and entry.text == "00:00"
+    assert not dashboard._heap and not dashboard._wakeup.isActive()
+
+
+def test_pause_keeps_the_remaining_time(dashboard, clock):
+    dashboard.add_timer("tea", 120)
+    clock.now = 530.0
+    dashboard.pause_timer(0)
+    assert dashboard.timers[0].remaining == 90.0
+    wake_at(dashboard, clock, 600.0) # Its heap entry is stale now
+    assert dashboard.timers[0].text == "01:30"
+    dashboard.start_timer(0)
+    assert dashboard.timers[0].deadline == 690.0
+
+
+def test_rows_out_of_view_are_not_formatted(dashboard, clock):
+    dashboard.add_timers([(f"t{i}", 600) for i in range(200)])
+    assert dashboard._scroll.maximum() > 0 # Scrolls instead of shrinking the cells
+    first, last = dashboard._visible_rows()
+    visible = (last + 1) * dashboard._columns
+    wake_at(dashboard, clock, 501.0)
+    assert all(t.text == "09:59" for t in dashboard.timers[:visible])
+    assert all(t.text == "" for t in dashboard.timers[visible:])
+    assert all(t.due == t.deadline for t in dashboard.timers[visible:]) # One entry, at the deadline
+
+    dashboard._scroll.setValue(dashboard._scroll.maximum())
+    assert dashboard.timers[-1].text == "09:59"
+    assert dashboard.timers[-1].due < dashboard.timers[-1].deadline # Back on the per-second schedule
@@ -0,0 +1,61 @@
+from PyQt5.QtCore import QRect, QSize, Qt
+from PyQt5.QtGui import QImage
+
+from flip_timer import DigitLabel
+
+
+def label_with(text, size=QSize(300, 80)):
+    label = DigitLabel(text)
+    label.resize(size)
+    updates = []
+    label.update = lambda *args: updates.append(args[0] if args else None)
+    return label, updates
+
+
+def test_digit_change_repaints_only_its_cell(qapp):
+    label, updates = label_with("12:34")
+    label.setText("12:35")
+    assert updates == [label._cells[4]]
+
+
+def test_blinking_colon_repaints_one_cell(qapp):
+    label, updates = label_with("12:34")
+    label.setText("12 34")
+    assert updates == [label._cells[2]]
+
+
+def test_layout_is_stable_across_digits(qapp):
+    label, updates = label_with("10:00")
+    cells = list(label._cells)
+    hint = label.sizeHint()
+    for text in ("11:11", "88:88", "19 47"):
+        label.setText(text)
+        assert label._cells == cells and label.sizeHint() == hint
+    assert len({cell.width() for cell in cells[:2] + cells[3:]}) == 1
+    assert sum(cell.width() for cell in cells) + 4 == hint.width()
+
+
+def test_length_change_relayouts(qapp):
+    label, updates = label_with("59:59")
+    label.setText("1:00:00")
+    assert updates == [None] # One full repaint
+    assert len(label._cells) == 7
+    assert label._cells[0].left() == (300 - sum(cell.width() for cell in label._cells)) // 2
+
+
+def test_same_text_does_nothing(qapp):
+    label, updates = label_with("05:00")
+    label.setText("05:00")
+    assert updates == []
+
+
+def test_paints_the_digits(qapp):
+    label = DigitLabel("88:88")
+    label.resize(label.sizeHint())
+    image = QImage(label.size(), QImage.Format_ARGB32)
+    image.fill(Qt.black)
+    label.render(image) # White digits on black
+    lit = [image.pixelColor(x, y).lightness() > 128
+           for x in range(image.width()) for y in range(image.height())]
+    assert any(lit)
+    assert label._cells[0] == QRect(label._cells[0].left(), 0, label._digit_width, label.height())
@@ -0,0 +1,83 @@
+import csv
+import json
+import time
+from array import array
+
+import pytest
+
+import flip_timer
+from flip_timer import EXPORT_FIELDS, ExportWorker, iter_export_rows
+
+HISTORY = [("2024-05-03 08:00:00", 300, 300.0, "finished"), ('say "hi"', 60, 12.3456, "cancelled")]
+DURATIONS = array("d", [1.5, 2.25, 0.125])
+SPLITS = array("d", [1.5, 3.75, 3.875])
+
+
+def run_worker(path, fmt, rows=None, cancel_after=None):
+    rows = iter_export_rows(HISTORY, DURATIONS, SPLITS) if rows is None else rows
+    worker = ExportWorker(str(path), fmt, rows, len(HISTORY) + len(DURATIONS))
+    events = []
+    worker.progress.connect(lambda written, total: events.append(("progress", written, total)))
+    worker.finished.connect(lambda path: events.append(("finished", path)))
+    worker.failed.connect(lambda message: events.append(("failed", message)))
+    if cancel_after is not None:
+        worker.progress.connect(lambda written, total: written >= cancel_after and worker.cancel())
+    worker.run() # Synchronously, on this thread
+    return events
+
+
+def test_csv_export_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(flip_timer, "EXPORT_CHUNK_ROWS", 2)
+    path = tmp_path / "history.csv"
+    events = run_worker(path, "csv")
+    assert events == [("progress", 2, 5), ("progress", 4, 5), ("progress", 5, 5), ("finished", str(path))]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(EXPORT_FIELDS)
+    assert rows[2] == ["timer", "2", "12.346", "", "60", 'say "hi"', "cancelled"]
+    assert rows[3:] == [["lap", "1", "1.5", "1.5", "", "", ""], ["lap", "2", "2.25", "3.75", "", "", ""],
+                        ["lap", "3", "0.125", "3.875", "", "", ""]]
+
+
+def test_jsonl_export_leaves_out_empty_fields(tmp_path):
+    path = tmp_path / "history.jsonl"
+    run_worker(path, "jsonl")
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[1] == {"kind": "timer", "index": 2, "duration_s": 12.346, "set_s": 60,
+                          "started_at": 'say "hi"', "outcome": "cancelled"}
+    assert records[-1] == {"kind": "lap", "index": 3, "duration_s": 0.125, "split_s": 3.875}
+
+
+def test_cancel_stops_between_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(flip_timer, "EXPORT_CHUNK_ROWS", 2)
+    events = run_worker(tmp_path / "history.csv", "csv", cancel_after=2)
+    assert events == [("progress", 2, 5), ("failed", "Export cancelled.")]
+
+
+def test_errors_are_reported_not_raised(tmp_path):
+    events = run_worker(tmp_path / "missing" / "history.csv", "csv")
+    assert len(events) == 1 and events[0][0] == "failed" and "missing" in events[0][1]
+
+    def bad_rows():
+        yield ("timer", 1, 1.0, "", 1, "", "finished")
+        raise ValueError("broken row")
+
+    events = run_worker(tmp_path / "history.jsonl", "jsonl", rows=bad_rows())
+    assert events[-1][0] == "failed" and "broken row" in events[-1][1]
+
+
+def test_app_exports_on_a_worker_thread(timer_app, qapp, tmp_path):
+    timer_app.ensure_expandable_section() # Where the export buttons live
+    timer_app.timer_history.extend(HISTORY)
+    path = tmp_path / "history.csv"
+    timer_app.start_export(str(path), "csv")
+    assert not timer_app.export_csv_button.isEnabled()
+    end = time.monotonic() + 5.0
+    while timer_app._export_thread is not None:
+        assert time.monotonic() < end, "export did not finish"
+        qapp.processEvents()
+        time.sleep(0.005)
+    assert timer_app.export_csv_button.isEnabled() and timer_app.export_progress.isHidden()
+    with open(path, newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 1 + len(HISTORY)
@@ -0,0 +1,108 @@
+import socket
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+import flip_timer
+from flip_timer import MJPEG_BOUNDARY, RAW_FRAME_HEADER, RAW_FRAME_MAGIC, FrameServer, encode_frame_packet
+
+SIZE = (160, 90)
+
+
+def pump(qapp, predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def receive(qapp, sock, predicate):
+    """Reads from a non-blocking client socket while the Qt side runs, until predicate(data)."""
+    data = bytearray()
+
+    def more():
+        try:
+            data.extend(sock.recv(65536))
+        except BlockingIOError:
+            pass
+        return predicate(data)
+
+    pump(qapp, more)
+    return bytes(data)
+
+
+@pytest.fixture
+def server(timer_app):
+    server = FrameServer(timer_app, size=SIZE)
+    yield server
+    server.shutdown(wait_ms=5000)
+
+
+def test_raw_packet_is_straight_rgba(qapp):
+    image = QImage(4, 2, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    image.setPixelColor(0, 0, flip_timer.QColor(255, 0, 0, 128))
+    packet = bytes(encode_frame_packet(image, "raw", 7))
+    assert RAW_FRAME_HEADER.unpack_from(packet) == (RAW_FRAME_MAGIC, 4, 2, 7)
+    pixels = packet[RAW_FRAME_HEADER.size:]
+    assert len(pixels) == 4 * 2 * 4
+    assert pixels[:4] == bytes([255, 0, 0, 128]) # Not premultiplied
+
+
+def test_mjpeg_packet_is_one_multipart_part(qapp):
+    image = QImage(16, 16, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.white)
+    packet = bytes(encode_frame_packet(image, "mjpeg", 1))
+    head, jpeg = packet.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"--" + MJPEG_BOUNDARY)
+    length = int(head.rsplit(b"Content-Length: ", 1)[1])
+    assert len(jpeg) == length + 2 and jpeg.endswith(b"\r\n")
+    assert QImage.fromData(jpeg[:length], "JPEG").size().width() == 16
+
+
+def test_nothing_is_rendered_without_consumers(server):
+    server.poll()
+    assert server.frame_number == 0 and server._view is None
+
+
+def test_http_consumer_gets_an_mjpeg_stream(qapp, server):
+    port = server.listen_http(0)
+    with socket.create_connection(("127.0.0.1", port)) as client:
+        client.setblocking(False)
+        client.sendall(b"GET / HTTP/1.0\r\n\r\n")
+        data = receive(qapp, client, lambda data: data.count(b"Content-Type: image/jpeg") >= 1)
+    assert data.startswith(b"HTTP/1.0 200 OK\r\n")
+    assert b"multipart/x-mixed-replace; boundary=" + MJPEG_BOUNDARY in data
+    assert server.frame_number == 1
+
+
+def test_http_rejects_other_methods(qapp, server):
+    port = server.listen_http(0)
+    with socket.create_connection(("127.0.0.1", port)) as client:
+        client.setblocking(False)
+        client.sendall(b"POST / HTTP/1.0\r\n\r\n")
+        data = receive(qapp, client, lambda data: b"\r\n\r\n" in data)
+    assert data.startswith(b"HTTP/1.0 405")
+    assert not server.has_consumers()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_unix_consumer_gets_raw_frames_only_on_change(qapp, server, tmp_path):
+    path = server.listen_unix(str(tmp_path / "overlay.sock"))
+    frame_bytes = RAW_FRAME_HEADER.size + SIZE[0] * SIZE[1] * 4
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.setblocking(False)
+        data = receive(qapp, client, lambda data: len(data) >= frame_bytes)
+        assert RAW_FRAME_HEADER.unpack_from(data) == (RAW_FRAME_MAGIC, SIZE[0], SIZE[1], 1)
+
+        server.poll()
+        server.poll()
+        assert server.frame_number == 1 # Same digits, ring and alarm text: nothing re-rendered
+        server.app.timer_display_widget.update_time_display("00:42", "")
+        server.poll()
+        data = receive(qapp, client, lambda data: len(data) >= frame_bytes)
+        assert RAW_FRAME_HEADER.unpack_from(data)[3] == 2
@@ -0,0 +1,109 @@
+import os
+import socket
+
+import pytest
+
+from flip_timer import (HookDispatcher, TimerHook, TimerProgram, append_hook_line,
+                        hook_socket_address)
+
+
+def _recording(dispatcher):
+    fired = []
+    dispatcher._submit = lambda hook, payload: fired.append((hook.name, payload["elapsed"]))
+    return fired
+
+
+def test_tick_fires_once_per_interval(qapp):
+    dispatcher = HookDispatcher([TimerHook("every", "file", os.devnull, interval=10, name="ten")])
+    fired = _recording(dispatcher)
+    for elapsed in (0.5, 9.9, 10.0, 10.5, 19.0, 35.0):
+        dispatcher.tick(elapsed)
+    assert fired == [("ten", 10.0), ("ten", 35.0)] # A late tick catches up with one call
+    dispatcher.reset_intervals()
+    dispatcher.tick(12.0)
+    assert fired[-1] == ("ten", 12.0)
+
+
+def test_every_hooks_keep_firing_across_program_segments(timer_app):
+    timer_app.hooks.set_hooks([TimerHook("every", "file", os.devnull, interval=15, name="15s")])
+    fired = _recording(timer_app.hooks)
+    timer_app.start_program(TimerProgram("test", [("a", 10), ("b", 10), ("c", 20)]))
+    schedule = timer_app.schedule
+    for second in range(1, 40):
+        now = schedule.start + second + 0.01
+        index = schedule.segment_at(now)
+        if index != timer_app.segment_index:
+            timer_app._enter_segment(index, now)
+        timer_app.remaining_seconds = schedule.deadline(index) - now
+        assert timer_app.running_elapsed() == pytest.approx(second + 0.01)
+        timer_app.hooks.tick(timer_app.running_elapsed())
+    assert [round(elapsed) for _, elapsed in fired] == [15, 30]
+    timer_app.cancel_timer()
+
+
+@pytest.mark.parametrize("target, address", [
+    ("unix:/tmp/hook.sock", "/tmp/hook.sock"),
+    ("127.0.0.1:9000", ("127.0.0.1", 9000)),
+    ("localhost:9000", ("localhost", 9000)),
+    ("[::1]:9000", ("::1", 9000)),
+    (":9000", ("127.0.0.1", 9000)),
+])
+def test_local_socket_targets(target, address):
+    assert hook_socket_address(target)[1] == address
+
+
+@pytest.mark.parametrize("target", ["example.com:80", "10.0.0.2:9000", "0.0.0.0:9000", "127.0.0.1:http"])
+def test_remote_socket_targets_are_rejected(target):
+    with pytest.raises(ValueError):
+        TimerHook("finish", "socket", target)
+
+
+def test_file_hook_appends(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    append_hook_line(path, "one\n", 1.0)
+    append_hook_line(path, "two\n", 1.0)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "one\ntwo\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs FIFOs")
+def test_file_hook_does_not_block_on_a_fifo_without_reader(tmp_path):
+    path = str(tmp_path / "fifo")
+    os.mkfifo(path)
+    with pytest.raises(OSError):
+        append_hook_line(path, "event\n", 1.0)
+
+
+def test_socket_hook_reaches_a_unix_listener(tmp_path):
+    from flip_timer import run_hook_action
+    path = str(tmp_path / "hook.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen(1)
+        run_hook_action(TimerHook("finish", "socket", f"unix:{path}"), {"event": "finish"})
+        connection, _ = server.accept()
+        with connection:
+            assert connection.recv(1024) == b'{"event": "finish"}\n'
+
+
+def test_pool_reports_each_hook_on_the_gui_thread(qapp, tmp_path):
+    import threading
+    import time
+
+    path = str(tmp_path / "events.jsonl")
+    dispatcher = HookDispatcher([TimerHook("finish", "file", path, name="log"),
+                                 TimerHook("finish", "file", str(tmp_path / "missing" / "x"), name="broken")])
+    finished = []
+    dispatcher.hook_finished.connect(
+        lambda *result: finished.append(result + (threading.current_thread() is threading.main_thread(),)))
+    dispatcher.emit_event("finish", label="tea")
+    end = time.monotonic() + 5.0
+    while len(finished) < 2 and time.monotonic() < end:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert sorted(result[:3] + result[4:] for result in finished) == [
+        ("broken", "finish", False, True), ("log", "finish", True, True)]
+    assert not dispatcher._in_flight
+    with open(path, encoding="utf-8") as f:
+        assert '"label": "tea"' in f.read()
+    dispatcher.shutdown()
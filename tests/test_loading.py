@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from flip_timer import parse_duration, read_timer_specs
+
+
+@pytest.mark.parametrize("value, seconds", [
+    (90, 90.0),
+    (2.5, 2.5),
+    ("45", 45.0),
+    ("2:05", 125.0),
+    ("1:30:00", 5400.0),
+    ("125:00", 7500.0), # Only the leading field may exceed 59
+    ("0:00:59.5", 59.5),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize("value", [
+    0, -5, True, None, "", "abc", "1:2:3:4", "1:-30:00", "0:90", "1:00:60", "nan", "inf", float("nan"),
+])
+def test_parse_duration_rejects(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
+
+
+def test_read_timer_specs():
+    stream = io.StringIO(
+        '# comment\n'
+        '{"label": "Tea", "seconds": 180}\n'
+        '\n'
+        '{"duration": "1:-30:00"}\n'
+        '{"duration": "0:45"}\n'
+        'not json\n'
+        '[1, 2]\n'
+        '{"label": 7, "duration": 10}\n'
+        '{"label": "No time"}\n'
+    )
+    specs, errors = read_timer_specs(stream, first_index=5)
+    assert specs == [("Tea", 180.0), ("Timer 6", 45.0), ("7", 10.0)]
+    assert [number for number, _ in errors] == [4, 6, 7, 9]
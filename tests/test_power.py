@@ -0,0 +1,60 @@
+import pytest
+
+from flip_timer import (POWER_PROFILES, FakePowerSource, PowerGovernor, SysfsPowerSource,
+                        auto_power_profile)
+
+
+def _supply(root, name, **files):
+    folder = root / name
+    folder.mkdir()
+    for key, value in files.items():
+        (folder / key).write_text(f"{value}\n", encoding="ascii")
+
+
+def test_laptop_on_mains(tmp_path):
+    _supply(tmp_path, "AC", type="Mains", online=1)
+    _supply(tmp_path, "BAT0", type="Battery", status="Charging", capacity=80)
+    assert SysfsPowerSource(str(tmp_path)).read() == (False, 80)
+
+
+def test_laptop_on_battery(tmp_path):
+    _supply(tmp_path, "AC", type="Mains", online=0)
+    _supply(tmp_path, "BAT0", type="Battery", status="Discharging", capacity=15)
+    _supply(tmp_path, "BAT1", type="Battery", status="Discharging", capacity=40)
+    assert SysfsPowerSource(str(tmp_path)).read() == (True, 15) # Lowest battery counts
+
+
+def test_battery_without_mains_entry(tmp_path):
+    _supply(tmp_path, "BAT0", type="Battery", status="Discharging", capacity=55)
+    assert SysfsPowerSource(str(tmp_path)).read() == (True, 55)
+
+
+def test_desktop_and_missing_sysfs(tmp_path):
+    _supply(tmp_path, "ucsi-source-psy", type="USB", online=0)
+    assert SysfsPowerSource(str(tmp_path)).read() == (None, None)
+    assert SysfsPowerSource(str(tmp_path / "missing")).read() == (None, None)
+
+
+@pytest.mark.parametrize("on_battery, capacity, profile", [
+    (None, None, "performance"),
+    (False, 5, "performance"),
+    (True, None, "balanced"),
+    (True, 21, "balanced"),
+    (True, 20, "saver"),
+])
+def test_auto_power_profile(on_battery, capacity, profile):
+    assert auto_power_profile(on_battery, capacity) == profile
+
+
+def test_governor_follows_the_source(timer_app):
+    source = FakePowerSource(on_battery=True, capacity=10)
+    governor = PowerGovernor(timer_app, source)
+    assert governor.profile == "saver"
+    assert not timer_app.colon_blinking
+    assert timer_app.audio_profile == POWER_PROFILES["saver"]["audio"]
+
+    source.on_battery = False
+    governor.refresh()
+    assert governor.profile == "performance"
+    assert timer_app.colon_blinking
+    assert timer_app.audio_profile == timer_app.preferred_audio_profile
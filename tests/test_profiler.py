@@ -0,0 +1,86 @@
+import time
+
+from PyQt5.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+import flip_timer
+
+OUTER = QEvent.Type(QEvent.User)
+INNER = QEvent.Type(QEvent.User + 1)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class Receiver(QObject):
+    def event(self, event):
+        if event.type() == OUTER:
+            busy(0.15)
+            QApplication.sendEvent(self, QEvent(INNER))
+            busy(0.15)
+            return True
+        if event.type() == INNER:
+            busy(0.15)
+            return True
+        return super().event(event)
+
+
+def profile(qapp, action):
+    profiler = flip_timer.SamplingProfiler(rate_hz=500)
+    profiler.start()
+    try:
+        action()
+    finally:
+        profiler.stop()
+    return profiler
+
+
+def samples_under(profiler, root):
+    return sum(count for key, count in profiler.samples.items() if key[0] == root)
+
+
+def test_nested_event_gives_time_back_to_outer(qapp):
+    receiver = Receiver()
+    profiler = profile(qapp, lambda: QApplication.sendEvent(receiver, QEvent(OUTER)))
+    outer = samples_under(profiler, "User")
+    inner = samples_under(profiler, "Event 1001")
+    # Both halves of the outer handler count under the outer event
+    assert outer > inner > 0
+    assert outer > 1.3 * inner
+
+
+def test_profiler_frames_are_left_out(qapp):
+    receiver = Receiver()
+    profiler = profile(qapp, lambda: QApplication.sendEvent(receiver, QEvent(OUTER)))
+    labels = {label for key in profiler.samples for label in key[1:]}
+    assert any(label.startswith("event (") for label in labels)
+    assert not any(label.startswith(("eventFilter ", "_take_pending ")) for label in labels)
+
+
+def test_sleeping_loop_counts_as_idle(qapp):
+    def sleep_in_loop():
+        loop = QEventLoop()
+        QTimer.singleShot(300, loop.quit)
+        loop.exec_()
+
+    profiler = profile(qapp, sleep_in_loop)
+    assert samples_under(profiler, flip_timer.PROFILER_IDLE) > profiler.sample_count / 2
+
+
+def test_stop_drops_frame_references(qapp):
+    receiver = Receiver()
+    profiler = profile(qapp, lambda: QApplication.sendEvent(receiver, QEvent(INNER)))
+    assert profiler.sample_count > 0
+    assert not profiler._pending and not profiler._deliveries
+    assert not profiler.is_running()
+
+
+def test_write_collapsed(qapp, tmp_path):
+    profiler = flip_timer.SamplingProfiler()
+    profiler.samples = {("Paint", "paintEvent (flip_timer.py:1)"): 3, (flip_timer.PROFILER_IDLE,): 5}
+    path = profiler.write_collapsed(tmp_path / "profile.txt")
+    assert path.read_text(encoding="utf-8").splitlines() == ["Paint;paintEvent (flip_timer.py:1) 3", "idle 5"]
+    assert profiler.event_totals() == [(flip_timer.PROFILER_IDLE, 5), ("Paint", 3)]
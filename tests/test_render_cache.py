@@ -0,0 +1,67 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+
+from flip_timer import RenderCache, pixmap_bytes
+
+
+def _render(dpr):
+    pixmap = QPixmap(10, 10) # 400 bytes at 32 bpp
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.black)
+    return pixmap
+
+
+def test_lru_eviction_within_budget(qapp):
+    entry_bytes = pixmap_bytes(_render(1.0))
+    cache = RenderCache(budget=2 * entry_bytes)
+    first = cache.get("sprite", "a", 1.0, _render)
+    cache.get("sprite", "b", 1.0, _render)
+    assert cache.get("sprite", "a", 1.0, _render) is first # Hit: "a" is now most recent
+    cache.get("sprite", "c", 1.0, _render)
+
+    assert (cache.hits, cache.misses, cache.evicted) == (1, 3, 1)
+    assert set(key for _, _, key in cache._entries) == {"a", "c"}
+    assert cache.bytes_used == 2 * entry_bytes
+
+
+def test_an_oversized_entry_is_still_kept(qapp):
+    cache = RenderCache(budget=1)
+    value = cache.get("sprite", "big", 1.0, _render)
+    assert cache.get("sprite", "big", 1.0, _render) is value
+    assert len(cache._entries) == 1
+
+
+def test_pixel_ratio_buckets(qapp):
+    cache = RenderCache(screens=2)
+    cache.use_dpr(1.0)
+    cache.use_dpr(2.0)
+    for dpr in (1.0, 2.0, 1.2500001):
+        cache.get("sprite", "a", dpr, _render)
+    # An off-screen render at another ratio does not touch the screens' buckets
+    assert cache._recent_dprs == [2.0, 1.0]
+    assert {dpr for dpr, _, _ in cache._entries} == {1.0, 2.0, 1.25}
+
+    cache.use_dpr(1.5) # Window moved to a third screen: only the two recent screens stay warm
+    assert {dpr for dpr, _, _ in cache._entries} == {2.0}
+    cache.invalidate("sprite")
+    assert not cache._entries and cache.bytes_used == 0
+
+
+def test_watch_follows_each_window_once(qapp):
+    from PyQt5 import sip
+    from PyQt5.QtWidgets import QWidget
+
+    cache = RenderCache()
+    widget = QWidget()
+    widget.show()
+    cache.watch(widget)
+    cache.watch(widget)
+    assert cache._watched == [widget.windowHandle()]
+    assert cache._recent_dprs == [widget.windowHandle().devicePixelRatio()]
+
+    sip.delete(widget) # Takes its native window with it
+    other = QWidget()
+    other.show()
+    cache.watch(other)
+    assert cache._watched == [other.windowHandle()] # The deleted window was pruned
+    other.close()
@@ -0,0 +1,63 @@
+import pytest
+
+import flip_timer
+from flip_timer import ALARM_RESOURCE, FONT_RESOURCE, RESOURCE_PACK_NAME, ResourcePack, build_resource_pack
+
+
+@pytest.fixture
+def assets(tmp_path):
+    source = tmp_path / "assets"
+    source.mkdir()
+    (source / FONT_RESOURCE).write_bytes(b"font bytes")
+    (source / ALARM_RESOURCE).write_bytes(b"RIFF alarm")
+    return source
+
+
+def test_pack_round_trip(assets, tmp_path):
+    target = tmp_path / "app"
+    target.mkdir()
+    assert build_resource_pack(str(target / RESOURCE_PACK_NAME), str(assets)) == [FONT_RESOURCE, ALARM_RESOURCE]
+    resources = ResourcePack([str(target)])
+    assert FONT_RESOURCE in resources and ALARM_RESOURCE in resources
+    assert resources.data(FONT_RESOURCE) == b"font bytes"
+    assert resources.data(ALARM_RESOURCE) == b"RIFF alarm"
+    assert resources.path(ALARM_RESOURCE) is None # Packed, nothing on disk to hand out
+
+
+def test_missing_files_are_left_out_of_the_pack(assets, tmp_path, capsys):
+    (assets / ALARM_RESOURCE).unlink()
+    pack = tmp_path / RESOURCE_PACK_NAME
+    assert build_resource_pack(str(pack), str(assets)) == [FONT_RESOURCE]
+    assert ALARM_RESOURCE in capsys.readouterr().out
+    resources = ResourcePack([str(tmp_path)])
+    assert ALARM_RESOURCE not in resources and resources.data(ALARM_RESOURCE) is None
+
+
+def test_loose_files_without_a_pack(assets):
+    resources = ResourcePack([str(assets)])
+    assert resources.path(FONT_RESOURCE) == str(assets / FONT_RESOURCE)
+    assert resources.data(FONT_RESOURCE) == b"font bytes"
+
+
+def test_pack_wins_over_loose_files(assets, tmp_path):
+    build_resource_pack(str(tmp_path / RESOURCE_PACK_NAME), str(assets), names=[ALARM_RESOURCE])
+    (assets / ALARM_RESOURCE).write_bytes(b"stale loose copy")
+    resources = ResourcePack([str(tmp_path), str(assets)])
+    assert resources.data(ALARM_RESOURCE) == b"RIFF alarm"
+    assert resources.path(FONT_RESOURCE) == str(assets / FONT_RESOURCE) # Not packed, found loose
+
+
+def test_corrupt_pack_falls_back_to_loose_files(assets, capsys):
+    (assets / RESOURCE_PACK_NAME).write_bytes(b"not a pack at all")
+    resources = ResourcePack([str(assets)])
+    assert "Ignoring resource pack" in capsys.readouterr().out
+    assert resources.data(ALARM_RESOURCE) == b"RIFF alarm"
+
+
+def test_lookups_do_not_touch_the_filesystem(assets, tmp_path, monkeypatch):
+    build_resource_pack(str(tmp_path / RESOURCE_PACK_NAME), str(assets))
+    resources = ResourcePack([str(tmp_path)])
+    monkeypatch.setattr(flip_timer.os.path, "exists", lambda path: pytest.fail("probed " + path))
+    assert ALARM_RESOURCE in resources
+    assert resources.data(ALARM_RESOURCE) == b"RIFF alarm"
+
@@ -0,0 +1,37 @@
+import pytest
+
+from flip_timer import CompiledSchedule, TimerProgram
+
+
+@pytest.fixture
+def schedule():
+    return TimerProgram("test", [("Work", 10), ("Rest", 20), ("Cool-down", 5)]).compile(100.0)
+
+
+def test_segment_at_boundaries(schedule):
+    assert len(schedule) == 3
+    assert schedule.total == 35.0
+    assert schedule.segment_at(100.0) == 0
+    assert schedule.segment_at(109.999) == 0
+    assert schedule.segment_at(110.0) == 1 # A boundary belongs to the next segment
+    assert schedule.segment_at(129.999) == 1
+    assert schedule.segment_at(130.0) == 2
+    assert schedule.segment_at(135.0) == 3 # Finished
+
+
+def test_deadlines_and_starts(schedule):
+    assert [schedule.deadline(i) for i in range(3)] == [110.0, 130.0, 135.0]
+    assert [schedule.segment_start(i) for i in range(3)] == [100.0, 110.0, 130.0]
+
+
+def test_shift_moves_the_rest_of_the_program(schedule):
+    schedule.shift(7.5) # e.g. time spent paused
+    assert schedule.segment_at(110.0) == 0
+    assert schedule.segment_at(117.5) == 1
+    assert schedule.deadline(2) == 142.5
+
+
+def test_empty_program():
+    schedule = CompiledSchedule([], 0.0)
+    assert schedule.total == 0.0
+    assert schedule.segment_at(0.0) == 0
@@ -0,0 +1,73 @@
+import random
+import statistics
+
+import pytest
+
+import flip_timer
+from flip_timer import LapStore, Stopwatch
+
+
+def test_welford_matches_statistics():
+    rng = random.Random(1234)
+    durations = [rng.uniform(50.0, 70.0) for _ in range(1000)]
+    laps = LapStore()
+    split = 0.0
+    for duration in durations:
+        split += duration
+        laps.append(duration, split)
+
+    assert len(laps) == 1000
+    assert laps.mean == pytest.approx(statistics.fmean(durations))
+    assert laps.stdev == pytest.approx(statistics.stdev(durations))
+    assert laps.min == min(durations)
+    assert laps.max == max(durations)
+    assert laps.min_index == durations.index(min(durations))
+    assert laps.splits[-1] == pytest.approx(sum(durations))
+
+
+def test_empty_and_single_lap():
+    laps = LapStore()
+    assert (laps.min, laps.max, laps.stdev) == (0.0, 0.0, 0.0)
+    laps.append(12.5, 12.5)
+    assert (laps.min, laps.max, laps.mean, laps.stdev) == (12.5, 12.5, 12.5, 0.0)
+
+
+def test_clear_resets_the_statistics():
+    laps = LapStore()
+    for duration in (3.0, 1.0, 2.0):
+        laps.append(duration, 0.0)
+    laps.clear()
+    laps.append(5.0, 5.0)
+    assert (len(laps), laps.mean, laps.min_index, laps.max_index) == (1, 5.0, 0, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stopwatch_pauses_and_laps():
+    clock = FakeClock()
+    stopwatch = Stopwatch(clock)
+    stopwatch.start()
+    clock.now += 12.0
+    assert stopwatch.lap() == 12.0
+    clock.now += 3.0
+    stopwatch.pause()
+    clock.now += 100.0 # Paused time does not count
+    assert stopwatch.elapsed() == 15.0
+    stopwatch.start()
+    clock.now += 5.0
+    assert stopwatch.current_lap() == 8.0
+    assert stopwatch.lap() == 8.0
+    assert list(stopwatch.laps.splits) == [12.0, 20.0]
+    stopwatch.reset()
+    assert (stopwatch.elapsed(), len(stopwatch.laps), stopwatch.running) == (0.0, 0, False)
+
+
+def test_stopwatch_uses_the_deadline_clock():
+    # Same clock as the countdowns, so a suspend moves both alike
+    assert Stopwatch()._clock is flip_timer.deadline_clock